@@ -23,22 +23,63 @@ under the License.
 
 #%% Import required modules
 
+import os
+import time
+import random
+import argparse
+import numpy as np
 from stochastic_process import Stochastic_Process
+from stochastic_batch import Stochastic_Process_Batch
 from post_process import*
 
+#%% Headless generation
+def Generate_Profiles(input_files = range(1,9), num_profiles = 365, seed = None, processes = 1, batch = True, output = None, plot = False):
+    '''
+    Generates the profiles of the input files without asking anything, so that the jobs can be run unattended and timed
+    seed: seed of the random numbers (each input file gets its own stream), a new one if None
+    processes: number of worker processes of the batch engine, all the cores if None (the profiles do not depend on it)
+    batch: if True, all the users of a class are generated at once (stochastic_batch), otherwise with Stochastic_Process
+    output: folder where the profiles are exported as output_file_j.csv and output_file_j.npy, not exported if None
+    plot: if True, the profiles are also plotted (matplotlib is not imported otherwise)
+    returns a dictionary with the array of the profiles (one row of 1440 minutes per profile, memory-mapped from its npy file if exported)
+    and one with the run time in s of each input file
+    '''
+    Profiles, run_time = {}, {}
+    for j in input_files:
+        start = time.time()
+        stream = Profile_Stream(num_profiles, None if output is None else os.path.join(output, 'output_file_%d' % j)) #the profiles are exported as they are generated
+        if batch:
+            Stochastic_Process_Batch(j, num_profiles, None if seed is None else [seed, j], processes, stream)
+        else:
+            if seed is not None: #the loop draws from random, seeded for each input file from the same seed
+                random.seed(int(np.random.SeedSequence([seed, j]).generate_state(1)[0]))
+            Stochastic_Process(j, num_profiles, stream)
+        stream.close()
+        Profiles[j] = stream.series
+        run_time[j] = time.time() - start
+        print('input_file_%d: %d profiles generated in %.1f s' % (j, num_profiles, run_time[j]))
+
+        if plot: # Generates plots
+            Profile_series_plot(stream.series.ravel()) #by default, profiles are plotted as a series
+            if num_profiles > 1: #if more than one daily profile is generated, also cloud plots are shown
+                Profile_cloud_plot(stream.series, stream.mean)
+    return (Profiles, run_time)
+
 # Calls the stochastic process and saves the result in a list of stochastic profiles
-# In this default example, the model runs for 2 input files ("input_file_1", "input_file_2"),
-# but single or multiple files can be run restricting or enlarging the iteration range 
+# By default, the model runs for the 8 input files ("input_file_1" to "input_file_8"),
+# but single or multiple files can be run listing them on the command line
+# (e.g. python RAMP_run.py 1 2 --profiles 365 --seed 1 --plot)
 # and naming further input files with progressive numbering
-for j in range(1,9):
-    Profiles_list = Stochastic_Process(j)
-    
-# Post-processes the results and generates plots
-    Profiles_avg, Profiles_list_kW, Profiles_series = Profile_formatting(Profiles_list)
-    Profile_series_plot(Profiles_series) #by default, profiles are plotted as a series
-    
-    export_series(Profiles_series,j)
-
-    if len(Profiles_list) > 1: #if more than one daily profile is generated, also cloud plots are shown
-        Profile_cloud_plot(Profiles_list, Profiles_avg)
-
+if __name__ == '__main__': # the worker processes import this file again
+    parser = argparse.ArgumentParser(description = 'RAMP: stochastic generation of multi-energy load profiles')
+    parser.add_argument('input_files', nargs = '*', type = int, default = list(range(1,9)), help = 'numbers of the input files (input_file_j.py)')
+    parser.add_argument('--profiles', type = int, default = 365, help = 'number of profiles of each input file')
+    parser.add_argument('--seed', type = int, default = None, help = 'seed of the random numbers, a new one if not given')
+    parser.add_argument('--processes', type = int, default = None, help = 'number of worker processes of the batch engine, all the cores if not given')
+    parser.add_argument('--loop', action = 'store_true', help = 'generate the profiles with Stochastic_Process instead of the batch engine')
+    parser.add_argument('--output', default = 'results', help = 'folder of the exported profiles')
+    parser.add_argument('--plot', action = 'store_true', help = 'plot the profiles of each input file')
+    arguments = parser.parse_args()
+    if arguments.loop and arguments.processes is not None:
+        parser.error('--processes applies to the batch engine only, Stochastic_Process (--loop) runs in one process')
+    Generate_Profiles(arguments.input_files, arguments.profiles, arguments.seed, arguments.processes, not arguments.loop, arguments.output, arguments.plot)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+#%% Import required libraries
+import bisect
+import heapq
+import random
+import time
+import numpy as np
+import numpy.ma as ma
+
+#%% Free spots of an appliance in a day
+'''
+Index of the free minutes of the windows of an appliance in a day, used by Stochastic_Process in place of the masked
+copy of the daily use rebuilt and walked over the 1440 minutes at each switch-on event. The free minutes are kept as a
+sorted list of disjoint intervals [start, end) with a heap of their lengths (the max-gap summary): checking a minute
+and finding the next switch-on after it are bisections of the list, O(log n) in the number n of free intervals (a few
+tens at most), occupying a switch-on event is a bisection plus an O(n) splice of the list, and the max free spot is
+the top of the heap (amortized O(log n), the intervals occupied are dropped when they reach the top), instead of O(1440).
+Usage: python free_spots.py (microbenchmark on the dense-use appliances of input_file_5)
+'''
+
+class Free_Spots():
+
+    def __init__(self, daily_use):
+        free = np.concatenate(([0], daily_use == 0.001, [0])).astype(np.int8) #free minutes are marked with 0.001 in the daily use
+        edges = np.flatnonzero(np.diff(free))
+        self.starts = edges[0::2].tolist() #first minute of each free interval, sorted
+        self.ends = edges[1::2].tolist() #first minute after each free interval
+        self.gaps = [(s-e, s, e) for s, e in zip(self.starts, self.ends)] #heap of the free intervals, the longest first
+        heapq.heapify(self.gaps)
+
+    def find(self, minute):
+        '''
+        Position of the free interval of a minute in the list, -1 if the minute is not free
+        '''
+        i = bisect.bisect_right(self.starts, minute) - 1
+        return i if i >= 0 and minute < self.ends[i] else -1
+
+    def is_free(self, minute):
+        return self.find(minute) >= 0
+
+    def next_busy(self, minute):
+        '''
+        First minute from the given one on that is not free, i.e. the next switch-on event or the end of the windows (1440 if none)
+        '''
+        i = self.find(minute)
+        return self.ends[i] if i >= 0 else minute
+
+    def occupy(self, indexes, daily_use):
+        '''
+        Removes from the free intervals the minutes of a switch-on event, once written in the daily use
+        (an event written with an empty duty cycle leaves its minutes free, as np.put does)
+        '''
+        if indexes.size == 0 or daily_use[indexes[0]] == 0.001:
+            return
+        first, last = int(indexes[0]), int(indexes[-1]) + 1
+        i = bisect.bisect_right(self.starts, first) - 1
+        if i < 0 or self.ends[i] <= first:
+            i += 1
+        while i < len(self.starts) and self.starts[i] < last: #intervals overlapping the event, split around it
+            s, e = self.starts.pop(i), self.ends.pop(i)
+            for piece in ((s, min(first, e)), (max(last, s), e)):
+                if piece[0] < piece[1]:
+                    self.starts.insert(i, piece[0])
+                    self.ends.insert(i, piece[1])
+                    heapq.heappush(self.gaps, (piece[0]-piece[1],) + piece)
+                    i += 1
+
+    def max_free(self):
+        '''
+        Length of the longest free interval, 0 if none (the intervals occupied since they were pushed are dropped from the heap)
+        '''
+        while self.gaps:
+            length, s, e = self.gaps[0]
+            i = self.find(s)
+            if i >= 0 and self.starts[i] == s and self.ends[i] == e:
+                return -length
+            heapq.heappop(self.gaps)
+        return 0
+
+#%% Microbenchmark
+def Benchmark_Spots(App, days = 200, seed = 1):
+    '''
+    Fills the windows of an appliance with switch-on events of its minimum functioning cycle, as a dense-use day does,
+    and times the lookups and updates of each switch-on with the former masked copy of the daily use and with Free_Spots
+    (checking that they agree)
+    returns the time per switch-on event in microseconds of both
+    '''
+    random.seed(seed)
+    masked_time, spots_time, events = 0, 0, 0
+    for day in range(days):
+        daily_use = np.zeros(1440)
+        for w in (App.window_1, App.window_2, App.window_3):
+            daily_use[w[0]:w[1]] = 0.001
+        daily_use_masked = np.zeros_like(ma.masked_not_equal(daily_use,0.001))
+        spots = Free_Spots(daily_use)
+        max_free_spot = spots.max_free()
+        while max_free_spot > 0:
+            switch_on = random.choice(np.flatnonzero(daily_use == 0.001))
+            start = time.perf_counter()
+            busy = np.where(daily_use[switch_on:]!=0.001)[0]
+            next_switch = switch_on + busy[0] if busy.size else 1440
+            masked_time += time.perf_counter() - start
+            start = time.perf_counter()
+            next_busy = spots.next_busy(switch_on)
+            spots_time += time.perf_counter() - start
+            assert next_switch == next_busy, (next_switch, next_busy)
+
+            indexes = np.arange(switch_on, min(switch_on+max(App.func_cycle,1), next_busy))
+            daily_use[indexes] = App.POWER[day]
+            start = time.perf_counter()
+            np.put(daily_use_masked, indexes, App.POWER[day], mode='clip')
+            daily_use_masked = np.zeros_like(ma.masked_greater_equal(daily_use_masked,0.001))
+            free_spots = []
+            try:
+                for j in ma.notmasked_contiguous(daily_use_masked):
+                    free_spots.append(j.stop-j.start)
+            except TypeError:
+                free_spots = [0]
+            masked_time += time.perf_counter() - start
+            start = time.perf_counter()
+            spots.occupy(indexes, daily_use)
+            max_free_spot = spots.max_free()
+            spots_time += time.perf_counter() - start
+            assert max(free_spots, default = 0) == max_free_spot, (free_spots, max_free_spot)
+            events += 1
+    return (1e6*masked_time/events, 1e6*spots_time/events)
+
+
+if __name__ == '__main__':
+    import input_file_5
+    for name in ('Comm_standard_use', 'Comm_Noise'):
+        masked, indexed = Benchmark_Spots(getattr(input_file_5, name))
+        print('%s: %.1f us per switch-on with the masked daily use, %.1f us with Free_Spots (x%.0f)' %(name, masked, indexed, masked/indexed))
@@ -26,11 +26,13 @@ def user_defined_inputs(j):
     return(User_list)
 
 
-def Initialise_model():
+def Initialise_model(num_profiles = None):
     '''
     The model is ready to be initialised
+    num_profiles: number of profiles to be generated, asked to the user if None
     '''
-    num_profiles = int(input("please indicate the number of profiles to be generated: ")) #asks the user how many profiles (i.e. code runs) he wants
+    if num_profiles is None:
+        num_profiles = int(input("please indicate the number of profiles to be generated: ")) #asks the user how many profiles (i.e. code runs) he wants
     print('Please wait...') 
     Profile = [] #creates an empty list to store the results of each code run, i.e. each stochastically generated profile
     
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 #%% Import required libraries
-import matplotlib.pyplot as plt
+import os
 import numpy as np
 import pandas as pd
 
@@ -10,22 +10,118 @@ import pandas as pd
 Just some additional code lines to calculate useful indicators and generate plots
 '''
 def Profile_formatting(stoch_profiles):
-    Profile_avg = np.zeros(1440)
-    for pr in stoch_profiles:
-        Profile_avg = Profile_avg + pr
-    Profile_avg = Profile_avg/len(stoch_profiles)
+    Profile_avg = np.mean(stoch_profiles, axis = 0)
     
-    Profile_kW = []
-    for kW in stoch_profiles:
-        Profile_kW.append(kW/1000)
+    Profile_kW = [kW/1000 for kW in stoch_profiles]
     
-    Profile_series = np.array([])
-    for iii in stoch_profiles:
-        Profile_series = np.append(Profile_series,iii)
+    Profile_series = np.concatenate(stoch_profiles) #one copy of all the profiles, instead of one per profile appended
     
     return (Profile_avg, Profile_kW, Profile_series)
 
+#%% Streaming post-processing
+'''
+Each daily profile is processed as soon as it is generated: it is added to the running statistics of each minute
+(mean and standard deviation by Welford's method, minimum, maximum and percentiles by the P-square algorithm) and
+written at its place in the annual array, memory-mapped from a binary (.npy) file, and in the exported csv file.
+The memory used does not grow with the number of profiles.
+'''
+class P2_Quantile():
+    '''
+    Running estimate of a quantile of each minute over the profiles, with 5 markers per minute (P-square algorithm
+    of Jain and Chlamtac, 1985): the markers of the minimum, of the quantile and of the maximum are moved towards
+    their desired positions after each profile, with a parabolic interpolation of their heights
+    '''
+    def __init__(self, p, size = 1440):
+        self.p = p
+        self.count = 0
+        self.q = np.zeros((5,size)) #heights of the markers
+        self.n = np.tile(np.arange(5.)[:,None], (1,size)) #positions of the markers
+        self.desired = np.array([0, 2*p, 4*p, 2+2*p, 4])[:,None] #desired positions of the markers
+        self.increment = np.array([0, p/2, p, (1+p)/2, 1])[:,None]
+
+    def add(self, x):
+        if self.count < 5: #the first 5 profiles are the markers
+            self.q[self.count] = x
+            self.count += 1
+            if self.count == 5:
+                self.q.sort(axis = 0)
+            return
+        self.count += 1
+        q, n = self.q, self.n
+        k = (x >= q[1:4]).sum(axis = 0) #cell of the markers where x falls
+        q[0], q[4] = np.minimum(q[0],x), np.maximum(q[4],x)
+        n += np.arange(5)[:,None] > k
+        self.desired = self.desired + self.increment
+        for i in (1,2,3):
+            d = self.desired[i] - n[i]
+            move = ((d >= 1) & (n[i+1]-n[i] > 1)) | ((d <= -1) & (n[i-1]-n[i] < -1))
+            s = np.sign(d)
+            parabolic = q[i] + s/(n[i+1]-n[i-1])*((n[i]-n[i-1]+s)*(q[i+1]-q[i])/(n[i+1]-n[i]) + (n[i+1]-n[i]-s)*(q[i]-q[i-1])/(n[i]-n[i-1]))
+            linear = q[i] + s*(np.where(s > 0, q[i+1], q[i-1]) - q[i])/(np.where(s > 0, n[i+1], n[i-1]) - n[i])
+            q[i] = np.where(move, np.where((q[i-1] < parabolic) & (parabolic < q[i+1]), parabolic, linear), q[i])
+            n[i] = np.where(move, n[i]+s, n[i])
+
+    def value(self):
+        if self.count < 5:
+            return np.percentile(self.q[:self.count], 100*self.p, axis = 0)
+        return self.q[2].copy()
+
+
+class Profile_Stream():
+    '''
+    Streaming post-processing of the profiles of an input file
+    num_profiles: number of profiles, to allocate the annual array once
+    path: path of the output files without extension (path.npy with the annual array, path.csv with the series as
+          exported by export_series), the array is kept in memory if None
+    quantiles: quantiles of each minute estimated over the profiles
+    '''
+    def __init__(self, num_profiles, path = None, quantiles = (0.05,0.5,0.95)):
+        self.count = 0
+        self.csv = None
+        if path is None:
+            self.series = np.zeros((num_profiles,1440))
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+            self.series = np.lib.format.open_memmap(path+'.npy', mode = 'w+', dtype = 'float64', shape = (num_profiles,1440))
+            self.csv = open(path+'.csv', 'w')
+            self.csv.write(',0\n')
+        self.mean = np.zeros(1440)
+        self.m2 = np.zeros(1440) #sum of the squared deviations from the mean
+        self.min = np.full(1440, np.inf)
+        self.max = np.full(1440, -np.inf)
+        self.quantiles = {q: P2_Quantile(q) for q in quantiles}
+
+    def add(self, profile):
+        '''
+        Adds the next daily profile
+        '''
+        i = self.count
+        self.series[i] = profile
+        if self.csv is not None:
+            pd.DataFrame(profile, index = np.arange(i*1440,(i+1)*1440)).to_csv(self.csv, header = False)
+        self.count += 1
+        delta = profile - self.mean
+        self.mean += delta/self.count
+        self.m2 += delta*(profile - self.mean)
+        self.min = np.minimum(self.min, profile)
+        self.max = np.maximum(self.max, profile)
+        for quantile in self.quantiles.values():
+            quantile.add(profile)
+
+    def std(self):
+        return np.sqrt(self.m2/max(self.count,1))
+
+    def percentile(self, q):
+        return self.quantiles[q].value()
+
+    def close(self):
+        if self.csv is not None:
+            self.series.flush()
+            self.csv.close()
+            self.csv = None
+
 def Profile_cloud_plot(stoch_profiles,stoch_profiles_avg):
+    import matplotlib.pyplot as plt #imported only to plot, so that the profiles can be generated without a display
     #x = np.arange(0,1440,5)
     plt.figure(figsize=(10,5))
     for n in stoch_profiles:
@@ -43,6 +139,7 @@ def Profile_cloud_plot(stoch_profiles,stoch_profiles_avg):
 
 
 def Profile_series_plot(stoch_profiles_series):
+    import matplotlib.pyplot as plt
     #x = np.arange(0,1440,5)
     plt.figure(figsize=(10,5))
     plt.plot(np.arange(len(stoch_profiles_series)),stoch_profiles_series,'#4169e1')
@@ -64,6 +161,10 @@ for i in range (len(Profile)):
 
 # Export Profiles
 
-def export_series(stoch_profiles_series, j):
-    series_frame = pd.DataFrame(stoch_profiles_series)
-    series_frame.to_csv('results/output_file_%d.csv' % (j))
\ No newline at end of file
+def export_series(stoch_profiles_series, j, path = 'results'):
+    os.makedirs(path, exist_ok = True)
+    with open(os.path.join(path, 'output_file_%d.csv' % (j)), 'w') as file:
+        file.write(',0\n')
+        for first in range(0, len(stoch_profiles_series), 1440*7): #one week at a time, instead of a DataFrame of the whole series
+            week = stoch_profiles_series[first:first+1440*7]
+            pd.DataFrame(week, index = np.arange(first, first+len(week))).to_csv(file, header = False)
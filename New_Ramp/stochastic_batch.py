@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+
+#%% Import required libraries
+import numpy as np
+import math
+import random
+import time
+from multiprocessing import Pool
+from initialise import Initialise_model, Initialise_inputs
+
+#%% Batched stochastic process
+'''
+Same stochastic process as Stochastic_Process, but each appliance is generated at once for all the users of its
+class and all the profiles: the switch-on events are drawn in rounds, one event at each round for each (user, day)
+still below its total time of use, on arrays with one row for each (user, day) instead of the while cycle on a
+single daily profile. The switch-on times are drawn among the minutes where Stochastic_Process would accept them,
+instead of trying again until one is accepted. The profiles have the same statistics as the ones of Stochastic_Process,
+not the same values (the random numbers are drawn in another order).
+The profiles are generated in blocks of consecutive days, each one with its own random generator derived from the
+seed, so that the blocks can be split across processes and the profiles are the same for any number of processes.
+Usage: python stochastic_batch.py 1 2 --profiles 300 (equivalence check and throughput of the two engines)
+'''
+Batch_Rows = 4096 #number of (user, day) rows generated at a time for each appliance, i.e. about 50 MB of daily profiles per array
+Block_Profiles = 8 #number of profiles of each block, generated with the same random generator (changing it changes the profiles of a seed)
+
+def Uniform(rng, low, high, size):
+    '''
+    Uniform random numbers between low and high, also when high is lower than low (as random.uniform)
+    '''
+    return low + (high-low)*rng.random(size)
+
+
+def Window_Marks(App):
+    '''
+    Daily use of the appliance as defined by its windows, i.e. the one used by Stochastic_Process to find the peak time range
+    '''
+    marks = np.zeros(1440)
+    for w in (App.window_1, App.window_2, App.window_3):
+        marks[w[0]:w[1]] = 0.001
+    return(marks)
+
+
+def Peak_Time_Range(User_list, peak_enlarg, rng):
+    '''
+    Calculation of the peak time range as in Stochastic_Process, returned as its first and last (excluded) minute
+    '''
+    windows_curve = np.zeros(1440) #not emptied between the User classes, as in Stochastic_Process
+    Tot_curve = np.zeros(1440)
+    for Us in User_list:
+        for App in Us.App_list:
+            windows_curve = np.vstack([windows_curve, Window_Marks(App)*np.mean(App.POWER)*App.number])
+        Tot_curve = Tot_curve + np.sum(windows_curve, axis = 0)*Us.num_users
+    peak_window = np.flatnonzero(Tot_curve == np.amax(Tot_curve))
+    peak_time = round(rng.normal(round(np.average(peak_window)),1/3*(peak_window[-1]-peak_window[0])))
+    return (peak_time-round(math.fabs(peak_time-rng.normal(peak_time,peak_enlarg*peak_time))), peak_time+round(math.fabs(peak_time-rng.normal(peak_time,peak_enlarg*peak_time))))
+
+
+def Duty_Cycles(App, n, rng):
+    '''
+    Randomised duty cycles of n users: array with, for cycle 1, 2 and 3, the length and the power of the first and of the second part of the cycle of each user
+    '''
+    def cycle(P_a, t_a, P_b, t_b, r_c, swap):
+        p_a = P_a*rng.uniform(1-App.Thermal_P_var,1+App.Thermal_P_var,n) #randomly variates the power of thermal apps, otherwise variability is 0
+        p_b = P_b*rng.uniform(1-App.Thermal_P_var,1+App.Thermal_P_var,n)
+        l_a = np.trunc(t_a*rng.uniform(1-r_c,1+r_c,n)) #randomise also the fixed cycle
+        l_b = np.trunc(t_b*rng.uniform(1-r_c,1+r_c,n))
+        if swap: #the two parts are put in random order, to avoid that all cycles are sincronous
+            order = rng.random(n) < 0.5
+            l_a, p_a, l_b, p_b = np.where(order,l_b,l_a), np.where(order,p_b,p_a), np.where(order,l_a,l_b), np.where(order,p_a,p_b)
+        return np.array([l_a, p_a, l_b, p_b])
+
+    if App.activate == 1:
+        cycle1 = cycle(App.P_11, App.t_11, App.P_12, App.t_12, App.r_c1, False)
+        return np.array([cycle1, cycle1, cycle1])
+    elif App.activate == 2:
+        cycle1 = cycle(App.P_11, App.t_11, App.P_12, App.t_12, App.r_c1, False)
+        return np.array([cycle1, cycle(App.P_21, App.t_21, App.P_22, App.t_22, App.r_c2, False), cycle1])
+    else: #the first part of cycle 2 takes the power of P_12, as in Stochastic_Process
+        return np.array([cycle(App.P_11, App.t_11, App.P_12, App.t_12, App.r_c1, True), cycle(App.P_12, App.t_21, App.P_22, App.t_22, App.r_c2, True),
+                         cycle(App.P_31, App.t_31, App.P_32, App.t_32, App.r_c3, True)])
+
+
+def Appliance_Batch(App, days, prefs, Year_behaviour, peak, mu_peak, s_peak, rng):
+    '''
+    Daily use of an appliance for many (user, day) rows at once
+    days: day of the year of each row, prefs: randomised daily preference of the user of each row
+    returns an array with the daily use (1440 minutes) of each row
+    '''
+    load = np.zeros((len(days),1440))
+    on = rng.random(len(days)) <= App.occasional_use #evaluates if occasional use happens or not
+    if App.Pref_index != 0:
+        on &= prefs == App.Pref_index #evaluates if daily preference coincides with the randomised daily preference number
+    if App.wd_we != 2:
+        on &= Year_behaviour[days] == App.wd_we #checks if the app is allowed in the given yearly behaviour pattern
+    users = np.flatnonzero(on)
+    n = users.size
+    if n == 0:
+        return(load)
+    minutes = np.arange(1440, dtype = np.int16)
+
+    #recalculate windows start and ending times randomly, one row per user and one column per window
+    start = np.zeros((n,3), dtype = int)
+    end = np.zeros((n,3), dtype = int)
+    for k, (w, r_w) in enumerate(((App.window_1,App.random_var_1),(App.window_2,App.random_var_2),(App.window_3,App.random_var_3))):
+        start[:,k] = np.maximum(np.trunc(rng.uniform(w[0]-r_w,w[0]+r_w,n)),0)
+        end[:,k] = np.minimum(np.trunc(rng.uniform(w[1]-r_w,w[1]+r_w,n)),1440)
+    inside = (minutes >= start[:,:,None]) & (minutes < end[:,:,None])
+    free = inside.any(axis = 1) #minutes of the windows not yet used by a switch-on event
+    power = App.POWER[days[users]]
+    if App.flat == 'yes': #flat apps fill the windows without any further stochasticity
+        load[users] = free*(power*App.number)[:,None]
+        return(load)
+
+    #random variability is applied to the total functioning time and to the duration of the duty cycles, if they have been specified
+    random_var_t = rng.uniform(1-App.r_t,1+App.r_t,n)
+    rand_time = np.round(Uniform(rng,App.func_time,np.trunc(App.func_time*random_var_t),n))
+    space = (end-start).sum(axis = 1)
+    rand_time = np.where(rand_time > 0.99*space, np.trunc(0.99*space), rand_time).astype(int) #the total time of use does not exceed the space available in the windows
+    if App.activate > 0:
+        cycles = Duty_Cycles(App, n, rng)
+    #a switch-on is drawn in a random window, then at a random time within it: each minute has the probability of the windows it is in
+    weight = (inside[:,:App.num_windows]/np.maximum(end-start,1)[:,:App.num_windows,None]).sum(axis = 1).astype(np.float32)
+    window_end = np.where(inside[:,0], end[:,0,None], np.where(inside[:,1], end[:,1,None], end[:,2,None])).astype(np.int16) #end of the window of a switch-on at each minute
+    tot_time = np.zeros(n, dtype = int)
+    switch_ons = np.zeros(n, dtype = int)
+    use = np.zeros((n,1440))
+
+    while True: #each round draws one switch-on event for each user still below its total time of use
+        r = np.flatnonzero(tot_time < rand_time)
+        spots = free[r]
+        next_switch = np.minimum.accumulate(np.where(spots, 1440, minutes)[:,::-1], axis = 1)[:,::-1] #position of the next switch-on event (or end of the windows) after each minute
+        gap = next_switch - minutes
+        after = next_switch < window_end[r] #other switch-on events after the current one in its window
+        #free spots are used to detect if there's still space for switch_ons: before the first switch-on the max free spot is set equal to the entire randomised func_time
+        max_free_spot = np.where(switch_ons[r] > 0, np.where(spots, gap, 0).max(axis = 1), rand_time[r])
+        room = max_free_spot >= App.func_cycle #larger free spots are available for a minimum functioning cycle
+        #Stochastic_Process tries again when the app is already on at the switch-on time, or when the next switch-on does not allow for a
+        #minimum functioning cycle: the switch-on is drawn straight among the other minutes, with the same probabilities
+        allowed = np.cumsum(weight[r]*(spots & ~(after & room[:,None] & (gap < App.func_cycle))), axis = 1)
+        stuck = allowed[:,-1] <= 0 #no switch-on left (Stochastic_Process would try forever)
+        if stuck.any():
+            rand_time[r[stuck]] = tot_time[r[stuck]]
+            r, allowed, next_switch, gap, after, room = r[~stuck], allowed[~stuck], next_switch[~stuck], gap[~stuck], after[~stuck], room[~stuck]
+        if r.size == 0:
+            break
+        switch_on = np.minimum((allowed <= rng.random(r.size)[:,None]*allowed[:,-1:]).sum(axis = 1),1439)
+        pick = (np.arange(r.size),switch_on)
+        next_switch, gap, after = next_switch[pick], gap[pick], after[pick]
+        switch_ons[r] += 1
+
+        upper_limit = np.minimum(rand_time[r],window_end[r,switch_on]-switch_on)
+        upper_limit = np.where(after & room, np.minimum(gap,upper_limit), upper_limit)
+        upper_limit = np.where(after & ~room, gap, upper_limit) #empty spaces are filled without minimum cycle restrictions
+        duration = np.where(upper_limit >= App.func_cycle, np.trunc(Uniform(rng,App.func_cycle,upper_limit,r.size)), np.maximum(upper_limit,0)).astype(int)
+
+        tot_time[r] += duration
+        duration = np.maximum(duration - np.maximum(tot_time[r]-rand_time[r],0),0) #the last switch-on event is cut to the total functioning time
+        tot_time[r] = np.minimum(tot_time[r],rand_time[r])
+
+        #coincident switch-on, more likely within the peak time range
+        in_peak = (peak[1] > peak[0]) & (switch_on < peak[1]) & (switch_on+duration > peak[0]) & (duration > 0)
+        if App.fixed == 'no':
+            coincidence = np.where(in_peak, np.minimum(App.number,np.maximum(1,np.ceil(rng.normal(math.ceil(App.number*mu_peak),s_peak*App.number*mu_peak,r.size)))),
+                                   np.minimum(App.number,np.floor(rng.uniform(0,(App.number-1)/App.number,r.size)*App.number)+1))
+        else:
+            coincidence = np.full(r.size, App.number)
+
+        #minutes of the switch-on events, one after the other
+        events = np.repeat(np.arange(r.size), duration)
+        offset = np.arange(events.size) - np.repeat(np.cumsum(duration)-duration, duration)
+        row, minute = r[events], switch_on[events] + offset
+        if App.activate > 0: #selects the duty cycle from the mean time position of the event and repeats it over the event
+            evaluate = np.where(duration > 0, np.round(switch_on+(duration-1)/2), 0)
+            in_cycle = lambda w: (evaluate >= w[0]) & (evaluate < w[1])
+            c = np.where(in_cycle(App.cw11) | in_cycle(App.cw12), 0, np.where(in_cycle(App.cw21) | in_cycle(App.cw22), 1, 2))
+            l_a, p_a, l_b, p_b = cycles[c,:,r].T[:,events]
+            period = l_a + l_b
+            value = np.where(offset % np.maximum(period,1) < l_a, p_a, p_b)*coincidence[events]
+            written = period > 0 #an empty cycle leaves the minutes free, as np.put does in Stochastic_Process
+            row, minute, value = row[written], minute[written], value[written]
+        else:
+            value = (power[r]*rng.uniform(1-App.Thermal_P_var,1+App.Thermal_P_var,r.size)*coincidence)[events] #randomises also the App Power if Thermal_P_var is on
+        use[row,minute] = value
+        free[row,minute] = False
+
+    load[users] = np.where(free, 0.001, use) #the unused minutes of the windows keep their mark, as in Stochastic_Process
+    return(load)
+
+
+def Profile_Block(task):
+    '''
+    Generates a block of consecutive profiles of an input file with the random generator of the block
+    task: input file j, first day and number of days of the block, peak time range, seed of the block (numpy SeedSequence)
+    returns an array with the profile of each day of the block
+    '''
+    j, first_day, num_days, peak, seed = task
+    peak_enlarg, mu_peak, s_peak, Year_behaviour, User_list = Initialise_inputs(j)
+    rng = np.random.default_rng(seed)
+    Tot_Classes = np.zeros((num_days,1440))
+    for Us in User_list:
+        days = np.repeat(np.arange(first_day,first_day+num_days), Us.num_users) #one row for each user of each profile
+        if Us.user_preference == 0:
+            prefs = np.zeros(days.size, dtype = int)
+        else:
+            prefs = rng.integers(1,Us.user_preference+1,days.size) #the same daily preference for all the Apps of a user
+        for App in Us.App_list:
+            for first in range(0, days.size, Batch_Rows):
+                block = days[first:first+Batch_Rows]
+                load = Appliance_Batch(App, block, prefs[first:first+Batch_Rows], Year_behaviour, peak, mu_peak, s_peak, rng)
+                bounds = np.flatnonzero(np.r_[True, np.diff(block) != 0]) #rows of each profile are contiguous
+                Tot_Classes[block[bounds]-first_day] += np.add.reduceat(load, bounds, axis = 0)
+    return(Tot_Classes)
+
+
+def Stochastic_Process_Batch(j, num_profiles = None, seed = None, processes = 1, stream = None):
+    '''
+    Batched version of Stochastic_Process: returns the list of the num_profiles daily profiles of input file j
+    seed: seed of the random generators, an integer or a list of integers (a new one if None, printed to generate the same profiles again)
+    processes: number of worker processes the blocks of profiles are split across, all the cores if None
+    stream: if given (post_process.Profile_Stream), each block of profiles is added to it as soon as it is completed
+            and its annual array is returned instead of the list
+    '''
+    Profile, num_profiles = Initialise_model(num_profiles)
+    peak_enlarg, mu_peak, s_peak, Year_behaviour, User_list = Initialise_inputs(j)
+    seeds = np.random.SeedSequence(seed)
+    firsts = range(0, num_profiles, Block_Profiles)
+    peak_seed, *block_seeds = seeds.spawn(1+len(firsts)) #independent streams for the peak time range and for each block of profiles
+    peak = Peak_Time_Range(User_list, peak_enlarg, np.random.default_rng(peak_seed))
+
+    tasks = [(j, first, min(Block_Profiles,num_profiles-first), peak, block_seed) for first, block_seed in zip(firsts, block_seeds)]
+    def collect(blocks):
+        for block in blocks:
+            for profile in block:
+                if stream is None:
+                    Profile.append(profile)
+                else:
+                    stream.add(profile)
+    if processes == 1:
+        collect(map(Profile_Block, tasks))
+    else:
+        with Pool(processes) as pool:
+            collect(pool.imap(Profile_Block, tasks)) #the blocks are returned in order, as they are completed
+    print(num_profiles,'profiles completed (seed %s)' %seeds.entropy)
+    return(Profile if stream is None else stream.series)
+
+#%% Equivalence and throughput
+def Profile_Statistics(Profile):
+    '''
+    Daily energy (Wh), daily peak (W) and hourly average power (W) of a list of daily profiles
+    '''
+    profiles = np.array(Profile)
+    return (profiles.sum(axis = 1)/60, profiles.max(axis = 1), profiles.reshape(len(profiles),24,60).mean(axis = 2))
+
+
+def KS_Statistic(a, b):
+    '''
+    Two-sample Kolmogorov-Smirnov statistic, i.e. the largest distance between the empirical distributions of a and b
+    '''
+    values = np.sort(np.concatenate([a,b]))
+    return np.max(np.abs(np.searchsorted(np.sort(a),values,side = 'right')/len(a) - np.searchsorted(np.sort(b),values,side = 'right')/len(b)))
+
+
+def Equivalence_Check(j, num_profiles = 300, seed = 1, c_alpha = 1.628, z_max = 4):
+    '''
+    Generates num_profiles profiles of input file j with Stochastic_Process and Stochastic_Process_Batch and checks
+    that they have the same statistics: the distributions of the daily energy and of the daily peak (Kolmogorov-Smirnov
+    test, c_alpha = 1.628 is the 1% significance), the mean daily energy and the hourly average power (within z_max
+    standard errors); with a few profiles the Kolmogorov-Smirnov test is weak, use some hundreds of them
+    returns a dictionary with the statistics, the outcome of the tests and the throughput of both engines (profiles/s)
+    '''
+    from stochastic_process import Stochastic_Process
+
+    random.seed(seed)
+    start = time.time()
+    loop = Stochastic_Process(j, num_profiles)
+    loop_time = time.time() - start
+    start = time.time()
+    batch = Stochastic_Process_Batch(j, num_profiles, seed)
+    batch_time = time.time() - start
+
+    (E_l, P_l, H_l), (E_b, P_b, H_b) = Profile_Statistics(loop), Profile_Statistics(batch)
+    critical = c_alpha*math.sqrt(2/num_profiles)
+    z = np.abs(H_l.mean(axis = 0)-H_b.mean(axis = 0))/np.maximum(np.sqrt((H_l.var(axis = 0,ddof = 1)+H_b.var(axis = 0,ddof = 1))/num_profiles),1e-9)
+    z_energy = abs(E_l.mean()-E_b.mean())/max(math.sqrt((E_l.var(ddof = 1)+E_b.var(ddof = 1))/num_profiles),1e-9)
+    check = {'input_file': j, 'profiles': num_profiles,
+             'energy_Wh': (E_l.mean(), E_l.std(), E_b.mean(), E_b.std()), 'energy_KS': KS_Statistic(E_l,E_b), 'energy_z': z_energy,
+             'peak_W': (P_l.mean(), P_l.std(), P_b.mean(), P_b.std()), 'peak_KS': KS_Statistic(P_l,P_b),
+             'KS_critical': critical, 'hourly_z_max': z.max(),
+             'profiles_per_s': (num_profiles/loop_time, num_profiles/batch_time)}
+    check['equivalent'] = bool(check['energy_KS'] <= critical and check['peak_KS'] <= critical and check['energy_z'] <= z_max and check['hourly_z_max'] <= z_max)
+    return(check)
+
+
+def Throughput(j, num_profiles = 365, seed = None, processes = 1):
+    '''
+    Profiles per second of Stochastic_Process_Batch for input file j
+    '''
+    start = time.time()
+    Stochastic_Process_Batch(j, num_profiles, seed, processes)
+    return num_profiles/(time.time() - start)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input_files', nargs = '*', type = int, default = [1])
+    parser.add_argument('--profiles', default = 300, type = int)
+    parser.add_argument('--seed', default = 1, type = int)
+    arguments = parser.parse_args()
+    for j in arguments.input_files:
+        check = Equivalence_Check(j, arguments.profiles, arguments.seed)
+        print('input_file_%d: %d profiles' %(j, check['profiles']))
+        print('  daily energy [Wh]  loop %.0f (std %.0f), batch %.0f (std %.0f), KS %.3f' %(check['energy_Wh'] + (check['energy_KS'],)))
+        print('  daily peak [W]     loop %.0f (std %.0f), batch %.0f (std %.0f), KS %.3f' %(check['peak_W'] + (check['peak_KS'],)))
+        print('  KS critical value %.3f, mean energy difference %.2f and largest hourly difference %.2f standard errors' %(check['KS_critical'], check['energy_z'], check['hourly_z_max']))
+        print('  throughput [profiles/s]  loop %.2f, batch %.2f' %check['profiles_per_s'])
+        print('  equivalent:', check['equivalent'])
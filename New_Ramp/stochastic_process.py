@@ -2,15 +2,15 @@
 
 #%% Import required libraries
 import numpy as np
-import numpy.ma as ma
 import random 
 import math
 from initialise import Initialise_model, Initialise_inputs
+from free_spots import Free_Spots
 
 #%% Core model stochastic script
 
-def Stochastic_Process(j):
-    Profile, num_profiles = Initialise_model()
+def Stochastic_Process(j, num_profiles = None, stream = None):
+    Profile, num_profiles = Initialise_model(num_profiles)
     peak_enlarg, mu_peak, s_peak, Year_behaviour, User_list = Initialise_inputs(j)
     '''
     Calculation of the peak time range, which is used to discriminate between off-peak and on-peak coincident switch-on probability
@@ -99,7 +99,7 @@ def Stochastic_Process(j):
                         App.daily_use[rand_window_1[0]:rand_window_1[1]] = np.full(np.diff(rand_window_1),0.001)
                         App.daily_use[rand_window_2[0]:rand_window_2[1]] = np.full(np.diff(rand_window_2),0.001)
                         App.daily_use[rand_window_3[0]:rand_window_3[1]] = np.full(np.diff(rand_window_3),0.001)
-                    App.daily_use_masked = np.zeros_like(ma.masked_not_equal(App.daily_use,0.001))
+                    App.free_spots = Free_Spots(App.daily_use) #free intervals of the newly defined windows
                   
                     App.power = App.POWER[prof_i]
                     
@@ -148,14 +148,14 @@ def Stochastic_Process(j):
                             #Identifies a random switch on time within the available functioning windows
                             if App.daily_use[switch_on] == 0.001: #control to check if the app is not already on at the randomly selected switch-on time
                                 if switch_on in range(rand_window_1[0],rand_window_1[1]):
-                                    if np.any(App.daily_use[switch_on:rand_window_1[1]]!=0.001): #control to check if there are any other switch on times after the current one    
-                                        next_switch = [switch_on + k[0] for k in np.where(App.daily_use[switch_on:]!=0.001)] #identifies the position of next switch on time and sets it as a limit for the duration of the current switch on
-                                        if (next_switch[0] - switch_on) >= App.func_cycle and max_free_spot >= App.func_cycle:
-                                            upper_limit = min((next_switch[0]-switch_on),min(rand_time,rand_window_1[1]-switch_on))
-                                        elif (next_switch[0] - switch_on) < App.func_cycle and max_free_spot >= App.func_cycle: #if next switch_on event does not allow for a minimum functioning cycle without overlapping, but there are other larger free spots, the cycle tries again from the beginning
+                                    next_switch = App.free_spots.next_busy(switch_on)
+                                    if next_switch < rand_window_1[1]: #control to check if there are any other switch on times after the current one    
+                                        if (next_switch - switch_on) >= App.func_cycle and max_free_spot >= App.func_cycle:
+                                            upper_limit = min((next_switch-switch_on),min(rand_time,rand_window_1[1]-switch_on))
+                                        elif (next_switch - switch_on) < App.func_cycle and max_free_spot >= App.func_cycle: #if next switch_on event does not allow for a minimum functioning cycle without overlapping, but there are other larger free spots, the cycle tries again from the beginning
                                             continue
                                         else:
-                                            upper_limit = next_switch[0]-switch_on #if there are no other options to reach the total time of use, empty spaces are filled without minimum cycle restrictions until reaching the limit                                              
+                                            upper_limit = next_switch-switch_on #if there are no other options to reach the total time of use, empty spaces are filled without minimum cycle restrictions until reaching the limit                                              
                                     else:
                                         upper_limit = min(rand_time,rand_window_1[1]-switch_on) #if there are no other switch-on events after the current one, the upper duration limit is set this way
                                     
@@ -165,14 +165,14 @@ def Stochastic_Process(j):
                                         indexes = np.arange(switch_on,switch_on+upper_limit) #this is the case in which empty spaces need to be filled without constraints to reach the total time goal
                                         
                                 elif switch_on in range(rand_window_2[0],rand_window_2[1]): #if random switch_on happens in windows2, same code as above is repeated for windows2
-                                    if np.any(App.daily_use[switch_on:rand_window_2[1]]!=0.001):
-                                        next_switch = [switch_on + k[0] for k in np.where(App.daily_use[switch_on:]!=0.001)]
-                                        if (next_switch[0] - switch_on) >= App.func_cycle and max_free_spot >= App.func_cycle:
-                                            upper_limit = min((next_switch[0]-switch_on),min(rand_time,rand_window_2[1]-switch_on))
-                                        elif (next_switch[0] - switch_on) < App.func_cycle and max_free_spot >= App.func_cycle:
+                                    next_switch = App.free_spots.next_busy(switch_on)
+                                    if next_switch < rand_window_2[1]:
+                                        if (next_switch - switch_on) >= App.func_cycle and max_free_spot >= App.func_cycle:
+                                            upper_limit = min((next_switch-switch_on),min(rand_time,rand_window_2[1]-switch_on))
+                                        elif (next_switch - switch_on) < App.func_cycle and max_free_spot >= App.func_cycle:
                                             continue
                                         else:
-                                            upper_limit = next_switch[0]-switch_on
+                                            upper_limit = next_switch-switch_on
                                     
                                     else:
                                         upper_limit = min(rand_time,rand_window_2[1]-switch_on)
@@ -183,14 +183,14 @@ def Stochastic_Process(j):
                                         indexes = np.arange(switch_on,switch_on+upper_limit)
                                         
                                 else: #if switch_on is not in window1 nor in window2, it shall be in window3. Same code is repreated
-                                    if np.any(App.daily_use[switch_on:rand_window_3[1]]!=0.001):
-                                        next_switch = [switch_on + k[0] for k in np.where(App.daily_use[switch_on:]!=0.001)]
-                                        if (next_switch[0] - switch_on) >= App.func_cycle and max_free_spot >= App.func_cycle:
-                                            upper_limit = min((next_switch[0]-switch_on),min(rand_time,rand_window_3[1]-switch_on))
-                                        elif (next_switch[0] - switch_on) < App.func_cycle and max_free_spot >= App.func_cycle:
+                                    next_switch = App.free_spots.next_busy(switch_on)
+                                    if next_switch < rand_window_3[1]:
+                                        if (next_switch - switch_on) >= App.func_cycle and max_free_spot >= App.func_cycle:
+                                            upper_limit = min((next_switch-switch_on),min(rand_time,rand_window_3[1]-switch_on))
+                                        elif (next_switch - switch_on) < App.func_cycle and max_free_spot >= App.func_cycle:
                                             continue
                                         else:
-                                            upper_limit = next_switch[0]-switch_on
+                                            upper_limit = next_switch-switch_on
                                     
                                     else:
                                         upper_limit = min(rand_time,rand_window_3[1]-switch_on)
@@ -224,17 +224,14 @@ def Stochastic_Process(j):
                                         #based on the evaluate value, selects the proper duty cycle and puts the corresponding power values in the indexes range
                                         if evaluate in range(App.cw11[0],App.cw11[1]) or evaluate in range(App.cw12[0],App.cw12[1]):
                                             np.put(App.daily_use,indexes_adj,(random_cycle1*coincidence))
-                                            np.put(App.daily_use_masked,indexes_adj,(random_cycle1*coincidence),mode='clip')
                                         elif evaluate in range(App.cw21[0],App.cw21[1]) or evaluate in range(App.cw22[0],App.cw22[1]):
                                             np.put(App.daily_use,indexes_adj,(random_cycle2*coincidence))
-                                            np.put(App.daily_use_masked,indexes_adj,(random_cycle2*coincidence),mode='clip')
                                         else:
                                             np.put(App.daily_use,indexes_adj,(random_cycle3*coincidence))
-                                            np.put(App.daily_use_masked,indexes_adj,(random_cycle3*coincidence),mode='clip')
                                     else: #if no duty cycles are specififed, a regular switch_on event is modelled
                                         np.put(App.daily_use,indexes_adj,(App.power*(random.uniform((1-App.Thermal_P_var),(1+App.Thermal_P_var)))*coincidence)) #randomises also the App Power if Thermal_P_var is on
-                                        np.put(App.daily_use_masked,indexes_adj,(App.power*(random.uniform((1-App.Thermal_P_var),(1+App.Thermal_P_var)))*coincidence),mode='clip')
-                                    App.daily_use_masked = np.zeros_like(ma.masked_greater_equal(App.daily_use_masked,0.001)) #updates the mask excluding the current switch_on event to identify the free_spots for the next iteration
+                                        random.uniform((1-App.Thermal_P_var),(1+App.Thermal_P_var)) #draw of the power of the former masked copy of the daily use, kept so that seeded runs give the same profiles
+                                    App.free_spots.occupy(indexes_adj, App.daily_use) #updates the free spots excluding the current switch_on event for the next iteration
                                     tot_time = (tot_time - indexes.size) + indexes_adj.size #updates the total time correcting the previous value
                                     break #exit cycle and go to next App
                                 else: #if the tot_time has not yet exceeded the App total functioning time, the cycle does the same without applying corrections to indexes size
@@ -257,31 +254,25 @@ def Stochastic_Process(j):
                                             evaluate = 0
                                         if evaluate in range(App.cw11[0],App.cw11[1]) or evaluate in range(App.cw12[0],App.cw12[1]):
                                             np.put(App.daily_use,indexes,(random_cycle1*coincidence))
-                                            np.put(App.daily_use_masked,indexes,(random_cycle1*coincidence),mode='clip')
                                         elif evaluate in range(App.cw21[0],App.cw21[1]) or evaluate in range(App.cw22[0],App.cw22[1]):
                                             np.put(App.daily_use,indexes,(random_cycle2*coincidence))
-                                            np.put(App.daily_use_masked,indexes,(random_cycle2*coincidence),mode='clip')
                                         else:
                                             np.put(App.daily_use,indexes,(random_cycle3*coincidence))
-                                            np.put(App.daily_use_masked,indexes,(random_cycle3*coincidence),mode='clip')
                                     else:
                                         np.put(App.daily_use,indexes,(App.power*(random.uniform((1-App.Thermal_P_var),(1+App.Thermal_P_var)))*coincidence))
-                                        np.put(App.daily_use_masked,indexes,(App.power*(random.uniform((1-App.Thermal_P_var),(1+App.Thermal_P_var)))*coincidence),mode='clip')
-                                    App.daily_use_masked = np.zeros_like(ma.masked_greater_equal(App.daily_use_masked,0.001))
+                                        random.uniform((1-App.Thermal_P_var),(1+App.Thermal_P_var)) #draw of the power of the former masked copy of the daily use, kept so that seeded runs give the same profiles
+                                    App.free_spots.occupy(indexes, App.daily_use)
                                     tot_time = tot_time #no correction applied to previously calculated value
                                                     
-                                free_spots = [] #calculate how many free spots remain for further switch_ons
-                                try:
-                                    for j in ma.notmasked_contiguous(App.daily_use_masked):
-                                        free_spots.append(j.stop-j.start)
-                                except TypeError:
-                                    free_spots = [0]
-                                max_free_spot = max(free_spots) 
+                                max_free_spot = App.free_spots.max_free() #calculate the largest free spot remaining for further switch_ons
     
                             else:
                                 continue #if the random switch_on falls somewhere where the App has been already turned on, tries again from beginning of the while cycle
                     Us.load = Us.load + App.daily_use #adds the App profile to the User load
             Tot_Classes = Tot_Classes + Us.load #adds the User load to the total load of all User classes
-        Profile.append(Tot_Classes) #appends the total load to the list that will contain all the generated profiles
+        if stream is None:
+            Profile.append(Tot_Classes) #appends the total load to the list that will contain all the generated profiles
+        else:
+            stream.add(Tot_Classes) #or adds it to the streaming post-processing (post_process.Profile_Stream) as soon as it is completed
         print('Profile',prof_i+1,'/',num_profiles,'completed') #screen update about progress of computation
-    return(Profile)
+    return(Profile if stream is None else stream.series)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+#%% Tests of the batched stochastic process
+'''
+Statistical equivalence of Stochastic_Process_Batch and Stochastic_Process (Equivalence_Check) on small input files,
+with a fixed seed and enough profiles for the Kolmogorov-Smirnov test to reject a different distribution, and
+profiles of Stochastic_Process_Batch identical for any number of processes.
+The input files read their time series from the RAMP folder, which is the working directory of the tests.
+Usage: python -m pytest New_Ramp/tests
+'''
+
+import os
+import sys
+import pytest
+import numpy as np
+
+Ramp_Path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(Ramp_Path)
+from stochastic_batch import Equivalence_Check, Stochastic_Process_Batch, Block_Profiles
+
+Profiles = 365 #one year of profiles, KS critical distance 0.12 at the 1% significance (0.42 with 30 profiles)
+
+
+@pytest.fixture(autouse = True)
+def ramp_folder(monkeypatch):
+    monkeypatch.chdir(Ramp_Path)
+
+
+@pytest.mark.parametrize('j', [5, 7])
+def test_equivalence(j):
+    check = Equivalence_Check(j, Profiles, seed = 1)
+    assert check['equivalent'], check
+
+
+@pytest.mark.parametrize('processes', [2, 3])
+def test_processes(processes):
+    '''
+    The profiles of a seed are the same for any number of processes, with a last block shorter than Block_Profiles
+    '''
+    num_profiles = 2*Block_Profiles + 3
+    serial = np.array(Stochastic_Process_Batch(5, num_profiles, seed = 7, processes = 1))
+    parallel = np.array(Stochastic_Process_Batch(5, num_profiles, seed = 7, processes = processes))
+    assert serial.shape == (num_profiles, 1440)
+    assert np.array_equal(serial, parallel)
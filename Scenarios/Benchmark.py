@@ -0,0 +1,258 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Benchmark of the configurations on synthetic demand, PV and solar collector profiles of any length, number of
+scenarios and number of classes: each case is built, solved and exported (TimeSeries and EnergySystemInfo) in a
+separate process, with the time of each phase, the peak memory and the size of the model added to
+Benchmark/Benchmark.csv and compared with the baseline in Benchmark/Baseline.csv.
+Usage: python Benchmark.py [configurations] --days 1 7 30 --scenarios 1 --classes 4 --solver highs
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+import numpy as np
+import pandas as pd
+
+from Input_Store import Convert_Profile, Data_File
+
+configurations = ['a_Traditional-Energy-System',
+                  'b_Conventional-MicroGrid',
+                  'c_Multi-Good-MicroGrid',
+                  'd_Multi-Energy-System']
+
+Scenarios_Path = os.path.dirname(os.path.abspath(__file__))
+Benchmark_Table = os.path.join(Scenarios_Path, 'Benchmark', 'Benchmark.csv')     # Record of all the benchmarks
+Baseline_Table = os.path.join(Scenarios_Path, 'Benchmark', 'Baseline.csv')       # Reference for the regressions
+
+Case_Columns = ['Configuration', 'Days', 'Scenarios', 'Classes', 'Solver']
+Time_Columns = ['Build time [s]', 'Solve time [s]', 'Export time [s]', 'Peak memory [MB]']      # Compared with a tolerance
+Size_Columns = ['Rows', 'Columns', 'Nonzeros']                                                   # Compared exactly
+
+
+
+def Input_Files(configuration):
+    '''
+    This function returns the csv files of the time series read by a configuration, from the Input_Files of its
+    Initialize, loaded under another name since the configurations have modules with the same names.
+    :param configuration: Folder of the configuration.
+    :return: Dictionary {name: path of the csv file relative to the folder of the case}.
+    '''
+    spec = importlib.util.spec_from_file_location('Initialize_'+configuration.replace('-','_'), os.path.join(Scenarios_Path, configuration, 'Initialize.py'))
+    initialize = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(initialize)
+    return initialize.Input_Files
+
+
+#%% Synthetic profiles
+def Synthetic_Profiles(days, scenarios=1, classes=4, seed=0):
+    '''
+    This function generates one minute time series with the daily shape of the inputs of the model: an electric
+    demand with an evening peak, a thermal demand for each class with a morning and an evening peak, and the
+    production of a PV unit and of a solar collector unit, with a random variation from day to day.
+    :param days: Number of days of the time series (1 to 365).
+    :param scenarios: Number of scenarios.
+    :param classes: Number of classes of users.
+    :param seed: Seed of the random numbers, the same profiles for the same seed.
+    :return: Dictionary {name: DataFrame} with one row per minute and the columns read by Initialize (one for each
+             scenario, or one for each scenario and class).
+    '''
+    rng = np.random.default_rng(seed)
+    hour = np.arange(1440)/60
+    sun = np.clip(np.sin((hour-6)/12*np.pi), 0, None)
+    evening = np.exp(-0.5*((hour-20)/2)**2)
+    morning = np.exp(-0.5*((hour-7)/1.5)**2)
+
+    def Series(shape, base, peak, columns, noise=0.1):
+        daily = rng.uniform(1-noise, 1+noise, (days, 1, columns))
+        minute = rng.uniform(1-noise/2, 1+noise/2, (days, 1440, columns))
+        return ((base + peak*shape)[None,:,None]*daily*minute).reshape(days*1440, columns)
+
+    clouds = lambda columns: rng.uniform(0.3, 1, (days, 1, columns)).repeat(1440, 1).reshape(days*1440, columns)
+    profiles = {'Electric_Energy_Demand': Series(evening, 40e3, 120e3, scenarios),
+                'Thermal_Energy_Demand':  Series(morning+evening, 5e3, 30e3, scenarios*classes),
+                'RES_Energy_Output':      np.tile(250*sun, days)[:,None]*clouds(scenarios),
+                'SC_Energy_Output':       np.tile(700*sun, days)[:,None]*clouds(scenarios*classes)}
+    return {name: pd.DataFrame(profile.round(3), columns=range(1, profile.shape[1]+1)) for name, profile in profiles.items()}
+
+
+def Write_Case(configuration, path, days, scenarios=1, classes=4, solver='highs', seed=0):
+    '''
+    This function writes in a folder the inputs of a configuration for a benchmark case: the dat file of the
+    configuration with the periods, scenarios, classes and solver of the case, and the synthetic profiles read by the
+    configuration with their binary copy (see Input_Store).
+    :param configuration: Folder of the configuration.
+    :param path: Folder of the case.
+    :return: Path of the case.
+    '''
+    os.makedirs(os.path.join(path, 'Inputs'), exist_ok=True)
+    Data_File(os.path.join(Scenarios_Path, configuration, 'Inputs', 'data.dat'), os.path.join(path, 'Inputs', 'data.dat'),
+              Periods=days*1440, Scenarios=scenarios, Classes=classes, Solver="'"+solver+"'", Representative_Days=0, Time_Resolution=1,
+              Scenario_Weight={s: 1/scenarios for s in range(1, scenarios+1)})
+    files = Input_Files(configuration)
+    for name, profile in Synthetic_Profiles(days, scenarios, classes, seed).items():
+        if name in files:
+            profile.to_csv(os.path.join(path, files[name]), sep=';')
+            Convert_Profile(os.path.join(path, files[name]))    # Converted here, not within the build time of the case
+    return path
+
+
+#%% Run of a case
+def Run_Case(configuration, solver='highs'):
+    '''
+    This function builds, solves and exports the case in the working directory with the code of a configuration,
+    and writes the time of each phase, the peak memory and the size of the model in Benchmark.json.
+    It runs in the process started by Benchmark_Case, with the folder of the case as working directory.
+    '''
+    sys.path.insert(0, os.path.join(Scenarios_Path, configuration))
+    from pyomo.environ import AbstractModel, value
+    from Model_Creation import Model_Creation
+    from Model_Resolution import Model_Instance, Model_Size
+    from Matrix_Backend import Peak_Memory
+    from Results import TimeSeries, EnergySystemInfo
+    from Solvers import Solve_Instance
+
+    start = time.time()
+    model = AbstractModel()
+    Model_Creation(model)
+    instance = Model_Instance(model)
+    build = time.time()-start
+
+    start = time.time()
+    performance = Solve_Instance(instance, solver, tee=False, table=None)[1]
+    solve = time.time()-start
+
+    start = time.time()
+    TimeSeries(instance)
+    EnergySystemInfo(instance)
+    export = time.time()-start
+
+    rows, columns, nonzeros = Model_Size(instance)
+    result = {'Build time [s]': build, 'Solve time [s]': solve, 'Export time [s]': export, 'Peak memory [MB]': Peak_Memory(),
+              'Rows': rows, 'Columns': columns, 'Nonzeros': nonzeros, 'Iterations': performance['Iterations'][0],
+              'Objective [USD]': value(instance.ObjectiveFuntion), 'Status': performance['Status'][0]}
+    with open('Benchmark.json', 'w') as file:
+        json.dump(result, file, default=str)
+
+
+def Benchmark_Case(configuration, days, scenarios=1, classes=4, solver='highs', seed=0):
+    '''
+    This function runs a benchmark case in a separate process, in a temporary folder with its synthetic inputs.
+    :return: Dictionary with the case and its results, None if the run failed.
+    '''
+    case = dict(zip(Case_Columns, [configuration, days, scenarios, classes, solver]))
+    with tempfile.TemporaryDirectory(prefix='MESpy_Benchmark_') as path:
+        Write_Case(configuration, path, days, scenarios, classes, solver, seed)
+        command = [sys.executable, os.path.abspath(__file__), configuration, '--runCase', '--solver', solver]
+        with open(os.path.join(path, 'Run.log'), 'w') as log:
+            process = subprocess.run(command, cwd=path, stdout=log, stderr=subprocess.STDOUT)
+        if process.returncode != 0:
+            with open(os.path.join(path, 'Run.log')) as log:
+                print(log.read()[-2000:])
+            print('Benchmark:', configuration, days, 'days failed')
+            return None
+        with open(os.path.join(path, 'Benchmark.json')) as file:
+            result = json.load(file)
+    print('Benchmark:', configuration, days, 'days,', scenarios, 'scenarios,', classes, 'classes - build', round(result['Build time [s]'],1),
+          's, solve', round(result['Solve time [s]'],1), 's, export', round(result['Export time [s]'],1), 's,', result['Rows'], 'rows')
+    return dict(case, Date=time.strftime('%Y-%m-%d %H:%M:%S'), **result)
+
+
+#%% Regressions
+def Regressions(results, baseline=Baseline_Table, tolerance=0.25):
+    '''
+    This function compares the results of a benchmark with the baseline of the same cases: a time or the peak memory
+    larger than the baseline by more than the tolerance, a different size of the model or a different objective
+    function (by more than 0.1 %) is a regression.
+    :param results: DataFrame of the results, as returned by Benchmark.
+    :param baseline: Path of the csv file of the baseline.
+    :param tolerance: Relative increase of the times and of the memory allowed.
+    :return: DataFrame with one row for each regression (case, quantity, baseline, result).
+    '''
+    if not os.path.exists(baseline):
+        print('Benchmark: no baseline in', baseline)
+        return pd.DataFrame(columns=Case_Columns+['Quantity', 'Baseline', 'Result'])
+    reference = pd.read_csv(baseline).drop_duplicates(Case_Columns, keep='last').set_index(Case_Columns)
+    rows = []
+    for _, result in results.iterrows():
+        case = tuple(result[Case_Columns])
+        if case not in reference.index:
+            continue
+        base = reference.loc[case]
+        worse = [c for c in Time_Columns if result[c] > base[c]*(1+tolerance)]
+        worse += [c for c in Size_Columns if result[c] != base[c]]
+        worse += [c for c in ['Objective [USD]'] if abs(result[c]-base[c]) > 1e-3*abs(base[c])]
+        rows += [dict(zip(Case_Columns, case), Quantity=c, Baseline=base[c], Result=result[c]) for c in worse]
+    return pd.DataFrame(rows, columns=Case_Columns+['Quantity', 'Baseline', 'Result'])
+
+
+def Benchmark(configurations=configurations, days=(1,), scenarios=(1,), classes=(4,), solver='highs', seed=0,
+              table=Benchmark_Table, baseline=Baseline_Table, tolerance=0.25, update=False):
+    '''
+    This function runs the benchmark of the configurations on all the combinations of days, scenarios and classes,
+    adds the results to the benchmark table and compares them with the baseline.
+    :param configurations: Folders of the configurations.
+    :param days: Lengths of the time series in days (1 to 365).
+    :param scenarios: Numbers of scenarios.
+    :param classes: Numbers of classes of users.
+    :param solver: 'highs', 'cbc' or 'glpk' (open source), or 'gurobi'.
+    :param seed: Seed of the synthetic profiles.
+    :param table: Path of the csv file where the results are added, None to skip the record.
+    :param baseline: Path of the csv file of the baseline.
+    :param tolerance: Relative increase of the times and of the memory allowed before a regression is reported.
+    :param update: Write the results as the new baseline of their cases.
+    :return: DataFrame of the results and DataFrame of the regressions.
+    '''
+    results = [Benchmark_Case(c, d, s, n, solver, seed) for c in configurations for d in days for s in scenarios for n in classes]
+    results = pd.DataFrame([r for r in results if r is not None])
+    if results.empty:
+        raise RuntimeError('Benchmark: no case solved')
+    regressions = Regressions(results, baseline, tolerance)
+    for path in [table] + ([baseline] if update else []):
+        if path is not None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            results.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+    if len(regressions):
+        print('Benchmark: regressions against', baseline)
+        print(regressions.to_string(index=False))
+    else:
+        print('Benchmark:', len(results), 'cases, no regressions')
+    if update:
+        print('Benchmark: baseline updated in', baseline)
+    return results, regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('configurations', nargs='*', default=configurations)
+    parser.add_argument('--days', nargs='+', default=[1], type=int)
+    parser.add_argument('--scenarios', nargs='+', default=[1], type=int)
+    parser.add_argument('--classes', nargs='+', default=[4], type=int)
+    parser.add_argument('--solver', default='highs')
+    parser.add_argument('--seed', default=0, type=int)
+    parser.add_argument('--tolerance', default=0.25, type=float)
+    parser.add_argument('--updateBaseline', action='store_true')
+    parser.add_argument('--runCase', action='store_true')   # Run of a case in the process started by Benchmark_Case
+    arguments = parser.parse_args()
+    if arguments.runCase:
+        Run_Case(arguments.configurations[0], arguments.solver)
+    else:
+        regressions = Benchmark(arguments.configurations, arguments.days, arguments.scenarios, arguments.classes, arguments.solver,
+                                arguments.seed, tolerance=arguments.tolerance, update=arguments.updateBaseline)[1]
+        sys.exit(1 if len(regressions) else 0)
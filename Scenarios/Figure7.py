@@ -17,6 +17,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pylab
 import itertools
+from Results_Store import Store_Path, Read_TimeSeries, Read_Table
+from Input_Store import Load_Frame
     
 import warnings
 warnings.filterwarnings("ignore")
@@ -36,13 +38,11 @@ fontlegend = 20
 
 idx = pd.IndexSlice
 
-Electric_Energy_Demand = pd.read_csv('a_Traditional-Energy-System/Inputs/Electric_Demand.csv', sep=';', index_col=0) # Import electricity demand
-Electric_Energy_Demand = Electric_Energy_Demand.round(3)
-Thermal_Energy_Demand = pd.read_csv('a_Traditional-Energy-System/Inputs/Thermal_Demand.csv', sep=';',  index_col=0) # Import thermal energy demand
-Thermal_Energy_Demand = Thermal_Energy_Demand.round(3)
+Electric_Energy_Demand = Load_Frame('a_Traditional-Energy-System/Inputs/Electric_Demand.csv') # Import electricity demand
+Thermal_Energy_Demand = Load_Frame('a_Traditional-Energy-System/Inputs/Thermal_Demand.csv') # Import thermal energy demand
     
-Electric_Energy_Demand.index = pd.DatetimeIndex(start=StartDate, periods=525600, freq='1min')
-Thermal_Energy_Demand.index = pd.DatetimeIndex(start=StartDate, periods=525600, freq='1min')
+Electric_Energy_Demand.index = pd.date_range(start=StartDate, periods=len(Electric_Energy_Demand), freq='1min')
+Thermal_Energy_Demand.index = pd.date_range(start=StartDate, periods=len(Thermal_Energy_Demand), freq='1min')
 
 StartDatePlot = ['12/23/2017 00:00:00','03/23/2017 00:00:00','06/23/2017 00:00:00','09/23/2017 00:00:00'] # MM/DD/YY
 EndDatePlot   = ['12/23/2017 23:59:59','03/23/2017 23:59:59','06/23/2017 23:59:59','09/23/2017 23:59:59']
@@ -104,22 +104,22 @@ for c in configurations:
     TimeSeries[c[0]]['Th'] = {}
 
     for s in range(1,nS+1):
-        TimeSeries[c[0]]['EE']['Sc'+str(s)] = pd.read_csv(c+'/Results/TimeSeries/Sc'+str(s)+'/EE_TimeSeries.csv', index_col=[0])
+        TimeSeries[c[0]]['EE']['Sc'+str(s)] = Read_TimeSeries('EE', s, start=PlotStartDate, end=PlotEndDate, store=c+'/'+Store_Path)
 
 
 #%% Configuration A
 
     if c == configurations[0]:    
         "Series preparation"
-        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
         x_Plot = np.arange(len(y_Genset))
         y_Stacked = [y_Genset,
                      y_LostLoad,
                      y_Curtailment]
                         
-        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
+        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
         
         Colors = ['#8d99ae',
                   '#f72585',
@@ -165,15 +165,15 @@ for c in configurations:
 
 #%% Configuration B        
     if c == configurations[1]:
-        BESSNominalCapacity = pd.read_excel(c+'/Results/EnergySystemSize.xlsx','Size',index_col=[0,1]).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
+        BESSNominalCapacity = Read_Table('Size', ['Total'], store=c+'/'+Store_Path).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
 
         "Series preparation"
-        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,4].values
-        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,5].values
-        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,6].values
-        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,4].values
+        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,5].values
+        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,6].values
+        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
         x_Plot = np.arange(len(y_Genset))
         
         deltaBESS_pos = y_BESS_out + y_BESS_in
@@ -191,8 +191,8 @@ for c in configurations:
                      y_LostLoad,
                      y_Curtailment]
     
-        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
-        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,-1].values/BESSNominalCapacity*100
+        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
+        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,-1].values/BESSNominalCapacity*100
         
         Colors = ['#ffbe0b',
                   '#3a86ff',
@@ -254,16 +254,16 @@ for c in configurations:
 
 #%% Configuration C
     if c == configurations[2]:
-        BESSNominalCapacity = pd.read_excel(c+'/Results/EnergySystemSize.xlsx','Size',index_col=[0,1]).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
+        BESSNominalCapacity = Read_Table('Size', ['Total'], store=c+'/'+Store_Path).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
     
         "Series preparation"
-        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,4].values
-        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,5].values
-        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,6].values
-        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,7].values
-        y_ElResCons   = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,4].values
+        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,5].values
+        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,6].values
+        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,7].values
+        y_ElResCons   = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
         x_Plot = np.arange(len(y_Genset))
         
         deltaBESS_pos = y_BESS_out + y_BESS_in
@@ -284,8 +284,8 @@ for c in configurations:
         y_Stacked_neg = [deltaBESS_neg,
                          y_ElResCons]
         
-        y_Demand = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
-        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,-1].values/BESSNominalCapacity*100
+        y_Demand = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
+        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,-1].values/BESSNominalCapacity*100
         
         Colors_pos = ['#ffbe0b',
                   '#3a86ff',
@@ -356,16 +356,16 @@ for c in configurations:
 
 #%% Configuration D
     if c == configurations[3]:
-        BESSNominalCapacity = pd.read_excel(c+'/Results/EnergySystemSize.xlsx','Size',index_col=[0,1]).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
+        BESSNominalCapacity = Read_Table('Size', ['Total'], store=c+'/'+Store_Path).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
     
         "Series preparation"
-        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,4].values
-        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,5].values
-        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,6].values
-        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,7].values
-        y_ElResCons   = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,4].values
+        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,5].values
+        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,6].values
+        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,7].values
+        y_ElResCons   = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
         x_Plot = np.arange(len(y_Genset))
         
         deltaBESS_pos = y_BESS_out + y_BESS_in
@@ -386,8 +386,8 @@ for c in configurations:
         y_Stacked_neg = [deltaBESS_neg,
                          y_ElResCons]
         
-        y_Demand = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
-        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,-1].values/BESSNominalCapacity*100
+        y_Demand = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
+        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,-1].values/BESSNominalCapacity*100
         
         Colors_pos = ['#ffbe0b',
                   '#3a86ff',
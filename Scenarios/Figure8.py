@@ -17,6 +17,8 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pylab
 import itertools
+from Results_Store import Store_Path, Read_TimeSeries, Read_Table
+from Input_Store import Load_Frame
     
 import warnings
 warnings.filterwarnings("ignore")
@@ -36,13 +38,11 @@ fontlegend = 20
 
 idx = pd.IndexSlice
 
-Electric_Energy_Demand = pd.read_csv('a_Traditional-Energy-System/Inputs/Electric_Demand.csv', sep=';', index_col=0) # Import electricity demand
-Electric_Energy_Demand = Electric_Energy_Demand.round(3)
-Thermal_Energy_Demand = pd.read_csv('a_Traditional-Energy-System/Inputs/Thermal_Demand.csv', sep=';',  index_col=0) # Import thermal energy demand
-Thermal_Energy_Demand = Thermal_Energy_Demand.round(3)
+Electric_Energy_Demand = Load_Frame('a_Traditional-Energy-System/Inputs/Electric_Demand.csv') # Import electricity demand
+Thermal_Energy_Demand = Load_Frame('a_Traditional-Energy-System/Inputs/Thermal_Demand.csv') # Import thermal energy demand
     
-Electric_Energy_Demand.index = pd.DatetimeIndex(start=StartDate, periods=525600, freq='1min')
-Thermal_Energy_Demand.index = pd.DatetimeIndex(start=StartDate, periods=525600, freq='1min')
+Electric_Energy_Demand.index = pd.date_range(start=StartDate, periods=len(Electric_Energy_Demand), freq='1min')
+Thermal_Energy_Demand.index = pd.date_range(start=StartDate, periods=len(Thermal_Energy_Demand), freq='1min')
 
 StartDatePlot = ['12/23/2017 00:00:00','03/23/2017 00:00:00','06/23/2017 00:00:00','09/23/2017 00:00:00'] # MM/DD/YY
 EndDatePlot   = ['12/23/2017 23:59:59','03/23/2017 23:59:59','06/23/2017 23:59:59','09/23/2017 23:59:59']
@@ -101,20 +101,20 @@ for s in range(1,nS+1):
     TimeSeries['Th']['Sc'+str(s)] = {}
         
     for c in range(nC):
-        TimeSeries['Th']['Sc'+str(s)]['Class'+str(c+1)] = pd.read_csv('d_Multi-Energy-System/Results/TimeSeries/Sc'+str(s)+'/Th_TimeSeries_Class'+str(c+1)+'.csv', index_col=[0])
+        TimeSeries['Th']['Sc'+str(s)]['Class'+str(c+1)] = Read_TimeSeries('Th', s, c+1, start=PlotStartDate, end=PlotEndDate, store='d_Multi-Energy-System/'+Store_Path)
         
         "Series preparation"
-        TankNominalCapacity = pd.read_excel('d_Multi-Energy-System/Results/EnergySystemSize.xlsx','Size',index_col=[0,1]).loc[idx['Tank',:],'Class'+str(c+1)].to_frame().iloc[0,0]
+        TankNominalCapacity = Read_Table('Size', ['Class'+str(c+1)], store='d_Multi-Energy-System/'+Store_Path).loc[idx['Tank',:],'Class'+str(c+1)].to_frame().iloc[0,0]
 
         "Series preparation"
-        y_SC          = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[PlotStartDate:PlotEndDate,2].values
-        y_Boiler      = -1*TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[PlotStartDate:PlotEndDate,5].values
-        y_ElResProd   = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[PlotStartDate:PlotEndDate,6].values        
-        y_LostLoad    = -1*TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Tank_Out    = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[PlotStartDate:PlotEndDate,3].values     
-        y_Tank_In     = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[PlotStartDate:PlotEndDate,3].values             
-        y_Demand      = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[PlotStartDate:PlotEndDate,0].values
-        y_Tank_SOC    = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[PlotStartDate:PlotEndDate,-1].values/TankNominalCapacity*100   
+        y_SC          = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[:,2].values
+        y_Boiler      = -1*TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[:,5].values
+        y_ElResProd   = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[:,6].values        
+        y_LostLoad    = -1*TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[:,1].values
+        y_Tank_Out    = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[:,3].values     
+        y_Tank_In     = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[:,3].values             
+        y_Demand      = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[:,0].values
+        y_Tank_SOC    = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c+1)].iloc[:,-1].values/TankNominalCapacity*100   
         x_Plot = np.arange(len(y_Boiler))
                         
         y_Stacked_1 = [y_Demand,
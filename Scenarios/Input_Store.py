@@ -0,0 +1,367 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Binary copy of the input time series: each csv file is converted once to a NumPy (.npy) file next to it, with its
+metadata (start date, time step, unit, columns) in a json file, and then memory-mapped, so that the initialization
+of the model and the plots read the same pages of the file instead of parsing the csv file each one.
+The binary copy is converted again when the csv file changes.
+The demand profiles generated by RAMP are assembled by Assemble_Profile straight into the binary copy, streamed
+day by day into an array of the whole year allocated once, in the calendar order of the model.
+The parameters of the project are read from the dat file, and copies of it with some parameters changed are written,
+by the same parser of its statements (Read_Data and Data_File).
+Usage: python Input_Store.py [csv files] --start '01/07/2017 00:00:00' --step 1 --unit W
+"""
+
+
+import os
+import re
+import json
+import warnings
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from fractions import Fraction
+
+
+Decimals = 3            # Decimals of the values kept in the binary copy, as read by the model
+Chunk_Rows = 1440*7     # Rows of the RAMP profiles read and written at a time (one week of minutes)
+
+
+def Binary_Paths(csvpath):
+    '''
+    This function returns the paths of the binary copy of a csv file: the values and the metadata.
+    :param csvpath: Path of the csv file.
+    '''
+    root = os.path.splitext(csvpath)[0]
+    return root+'.npy', root+'.json'
+
+
+def Source_Stamp(csvpath):
+    '''
+    This function returns the size and the time of the last change of a csv file, to check if its binary copy is up to date.
+    '''
+    status = os.stat(csvpath)
+    return {'Size': status.st_size, 'Modified': status.st_mtime_ns}
+
+
+def Write_Atomic(path, write):
+    '''
+    This function writes a file through a temporary file in the same folder, so that a file read by another
+    process is never found half written.
+    :param write: Function that writes the file from its path.
+    '''
+    handle, temporary = tempfile.mkstemp(suffix=os.path.splitext(path)[1], dir=os.path.dirname(path) or '.')
+    os.close(handle)
+    try:
+        write(temporary)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def Index_Metadata(index):
+    '''
+    This function returns how the index of a csv file, other than a range of integers, is kept in the binary copy:
+    the start, the frequency and the length of the dates for a regular time index, rebuilt with pd.date_range,
+    otherwise 'index.npy' and the index as a fixed-width array (dates, numbers or strings), read without pickle.
+    :param index: Values of the index read from the csv file.
+    :return: Metadata of the index and the array to save in index.npy (None if not needed).
+    '''
+    if index.dtype.kind in 'iufmM':
+        return 'index.npy', index
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)     # Format of the dates inferred element by element
+            dates = pd.DatetimeIndex(pd.to_datetime(index))
+    except (ValueError, TypeError):
+        return 'index.npy', np.asarray(index, dtype=str)
+    steps = np.diff(dates.values.astype('datetime64[ns]'))
+    if len(dates) > 1 and steps[0] > np.timedelta64(0) and (steps == steps[0]).all():
+        frequency = pd.tseries.frequencies.to_offset(pd.Timedelta(steps[0])).freqstr
+        return {'Start': dates[0].isoformat(), 'Frequency': frequency, 'Periods': len(dates)}, None
+    return 'index.npy', dates.values
+
+
+def Convert_Profile(csvpath, start=None, step=1, unit='W'):
+    '''
+    This function converts a time series from its csv file (';' separated, first column as index) to its binary copy.
+    :param csvpath: Path of the csv file.
+    :param start: Start date of the time series, None if not known.
+    :param step: Time step of the time series in minutes.
+    :param unit: Unit of the values.
+    :return: Metadata of the binary copy.
+    '''
+    stamp = Source_Stamp(csvpath)
+    profile = pd.read_csv(csvpath, sep=';', index_col=0).round(Decimals)
+    npypath, metapath = Binary_Paths(csvpath)
+
+    index = profile.index.values
+    contiguous = index.dtype.kind in 'iu' and (len(index) == 0 or (index == np.arange(index[0], index[0]+len(index))).all())
+    if contiguous:
+        stored = [int(index[0]), int(index[0])+len(index)] if len(index) else None
+    else:
+        stored, index = Index_Metadata(index)
+    metadata = dict(stamp, Source=os.path.basename(csvpath), Start=start, Step=step, Unit=unit, Decimals=Decimals,
+                    Columns=[str(c) for c in profile.columns], Shape=list(profile.shape), Dtype='float64', Index=stored)
+
+    Write_Atomic(npypath, lambda path: np.save(path, np.ascontiguousarray(profile.values, dtype='float64')))
+    if stored == 'index.npy':
+        Write_Atomic(os.path.splitext(npypath)[0]+'.index.npy', lambda path: np.save(path, index, allow_pickle=False))
+    def Write_Metadata(path):
+        with open(path, 'w') as file:
+            json.dump(metadata, file, indent=1)
+    Write_Atomic(metapath, Write_Metadata)    # Written last: a binary copy without metadata is never taken as up to date
+    print('Input_Store:', csvpath, 'converted to', npypath)
+    return metadata
+
+
+def Profile_Metadata(csvpath):
+    '''
+    This function returns the metadata of the binary copy of a csv file, converting it first if it is missing or
+    older than the csv file (or its metadata if the csv file is not available).
+    :param csvpath: Path of the csv file.
+    '''
+    npypath, metapath = Binary_Paths(csvpath)
+    metadata = None
+    if os.path.exists(metapath) and os.path.exists(npypath):
+        with open(metapath) as file:
+            metadata = json.load(file)
+    if not os.path.exists(csvpath):
+        if metadata is None:
+            raise FileNotFoundError('Input_Store: neither ' + csvpath + ' nor its binary copy exist')
+        return metadata
+    if metadata is None or any(metadata.get(key) != value for key, value in Source_Stamp(csvpath).items()):
+        previous = metadata or {}
+        metadata = Convert_Profile(csvpath, previous.get('Start'), previous.get('Step', 1), previous.get('Unit', 'W'))
+    return metadata
+
+
+def Load_Profile(csvpath):
+    '''
+    This function returns a time series as a read-only array memory-mapped from its binary copy, shared with the
+    other readers of the same file.
+    :param csvpath: Path of the csv file.
+    :return: NumPy array with one row for each time step and one column for each column of the csv file.
+    '''
+    Profile_Metadata(csvpath)
+    return np.load(Binary_Paths(csvpath)[0], mmap_mode='r')
+
+
+def Load_Frame(csvpath):
+    '''
+    This function returns a time series as a DataFrame on the array memory-mapped from its binary copy, with the
+    index and the columns of the csv file.
+    :param csvpath: Path of the csv file.
+    '''
+    metadata = Profile_Metadata(csvpath)
+    values = np.load(Binary_Paths(csvpath)[0], mmap_mode='r')
+    if isinstance(metadata['Index'], dict):
+        index = pd.date_range(metadata['Index']['Start'], periods=metadata['Index']['Periods'], freq=metadata['Index']['Frequency'])
+    elif metadata['Index'] == 'index.npy':
+        index = pd.Index(np.load(os.path.splitext(Binary_Paths(csvpath)[0])[0]+'.index.npy'))
+    else:
+        index = pd.RangeIndex(*(metadata['Index'] or [0, 0]))
+    return pd.DataFrame(values, index=index, columns=metadata['Columns'], copy=False)
+
+
+#%% Profiles from RAMP
+def Source_Rows(source):
+    '''
+    This function returns the number of time steps of a RAMP profile, without reading its values.
+    :param source: Path of a csv file exported by RAMP (one header line, one row per time step), or list of the
+                   daily profiles returned by the stochastic process of RAMP.
+    '''
+    if not isinstance(source, str):
+        return sum(len(profile) for profile in source)
+    rows, last = 0, b'\n'
+    with open(source, 'rb') as file:
+        for block in iter(lambda: file.read(2**20), b''):
+            rows += block.count(b'\n')
+            last = block[-1:]
+    return rows + (last != b'\n') - 1
+
+
+def Source_Chunks(source, chunksize=Chunk_Rows):
+    '''
+    This function yields the values of a RAMP profile in consecutive chunks, so that the whole profile is never
+    held in memory.
+    :param source: Path of a csv file exported by RAMP, or list of the daily profiles returned by the stochastic process of RAMP.
+    :param chunksize: Number of rows of each chunk read from a csv file.
+    '''
+    if not isinstance(source, str):
+        yield from (np.asarray(profile, dtype='float64') for profile in source)
+        return
+    for chunk in pd.read_csv(source, header=0, index_col=0, chunksize=chunksize):
+        yield chunk.values[:,0]
+
+
+def Assemble_Profile(csvpath, sources, axis=0, rotation=0, start=None, step=1, unit='W', csv=True):
+    '''
+    This function writes the binary copy of a time series of the model from the profiles generated by RAMP. The
+    year is allocated once as a NumPy file mapped in memory and each chunk of the profiles is written at its place:
+    the profiles that follow each other in time (axis 0) one after the other, the profiles of different classes
+    (axis 1) in one column each. The rotation of the calendar (e.g. RAMP years starting in December) is a shift
+    of the rows where each chunk is written, not a copy of the year.
+    :param csvpath: Path of the csv file of the time series read by the model.
+    :param sources: List of the RAMP profiles (see Source_Chunks).
+    :param axis: 0 to put the profiles one after the other, 1 to put them side by side.
+    :param rotation: Number of rows of the RAMP profiles moved from the start to the end of the year.
+    :param start: Start date of the time series, None if not known.
+    :param step: Time step of the time series in minutes.
+    :param unit: Unit of the values.
+    :param csv: Write also the csv file, read by the model only to check that the binary copy is up to date.
+    :return: Metadata of the binary copy.
+    '''
+    lengths = [Source_Rows(source) for source in sources]
+    if axis == 1 and len(set(lengths)) > 1:
+        raise ValueError('Input_Store: the profiles of ' + csvpath + ' put side by side have different lengths ' + str(lengths))
+    rows = sum(lengths) if axis == 0 else lengths[0]
+    columns = 1 if axis == 0 else len(sources)
+    npypath, metapath = Binary_Paths(csvpath)
+    if not csv and os.path.exists(csvpath):
+        raise ValueError('Input_Store: ' + csvpath + ' would be converted again over the assembled profile, remove it or write it (csv=True)')
+
+    def Write_Values(path):
+        values = np.lib.format.open_memmap(path, mode='w+', dtype='float64', shape=(rows, columns))
+        for number, source in enumerate(sources):
+            first = sum(lengths[:number]) if axis == 0 else 0
+            column = 0 if axis == 0 else number
+            for chunk in Source_Chunks(source):
+                values[(first - rotation + np.arange(len(chunk))) % rows, column] = np.round(chunk, Decimals)
+                first += len(chunk)
+        values.flush()
+        del values
+    Write_Atomic(npypath, Write_Values)
+
+    metadata = dict(Source=os.path.basename(csvpath), Start=start, Step=step, Unit=unit, Decimals=Decimals,
+                    Columns=[str(c) for c in range(columns)], Shape=[rows, columns], Dtype='float64', Index=[1, rows+1])
+    if csv:
+        def Write_Csv(path):
+            values = np.load(npypath, mmap_mode='r')
+            with open(path, 'w') as file:
+                file.write(';'.join([''] + metadata['Columns']) + '\n')
+                for first in range(0, rows, Chunk_Rows):
+                    chunk = pd.DataFrame(values[first:first+Chunk_Rows], index=np.arange(first+1, min(first+Chunk_Rows, rows)+1))
+                    chunk.to_csv(file, sep=';', header=False)
+        Write_Atomic(csvpath, Write_Csv)
+        metadata.update(Source_Stamp(csvpath))
+    def Write_Metadata(path):
+        with open(path, 'w') as file:
+            json.dump(metadata, file, indent=1)
+    Write_Atomic(metapath, Write_Metadata)
+    print('Input_Store:', len(sources), 'RAMP profiles assembled in', npypath)
+    return metadata
+
+
+#%% Parameters of the project
+Param_Pattern = re.compile(r'^\s*param\s*:?\s*(\w+)\s*:=')    # First line of the statement of a parameter in the dat file
+
+
+def Value(text):
+    '''
+    This function converts a value written in the dat file.
+    :param text: Value as written in the dat file.
+    :return: Integer or float for numbers (fractions as 1/60 included), string otherwise.
+    '''
+    try:
+        value = Fraction(text)
+    except ValueError:
+        return text.strip("'\"")
+    return int(value) if value.denominator == 1 else float(value)
+
+
+def Data_Statements(lines):
+    '''
+    This function splits the lines of a dat file in statements: the lines of each parameter, from "param" to the
+    semicolon (indexed parameters span several lines), and each other line (comments, blank lines) on its own.
+    :param lines: Lines of the dat file.
+    :return: List of (name of the parameter or None, lines of the statement).
+    '''
+    statements = []
+    for line in lines:
+        match = Param_Pattern.match(line)
+        if statements and statements[-1][0] is not None and not statements[-1][2]:
+            name, block, closed = statements.pop()
+            statements.append((name, block+[line], ';' in line.split('#')[0]))
+        elif match:
+            statements.append((match.group(1), [line], ';' in line.split('#')[0]))
+        else:
+            statements.append((None, [line], True))
+    return [(name, block) for name, block, closed in statements]
+
+
+def Data_Statement(name, value):
+    '''
+    This function writes the statement of a parameter in the dat file.
+    :param value: Value of the parameter, or dictionary {index: value} of an indexed parameter.
+    '''
+    if isinstance(value, dict):
+        return ['param: '+name+' :=\n'] + [str(i)+' '+str(v)+'\n' for i,v in value.items()] + [';\n']
+    return ['param: '+name+' := '+str(value)+';\n']
+
+
+def Read_Data(datapath="Inputs/data.dat"):
+    '''
+    This function reads the parameters of the project from the dat file.
+    :param datapath: Path of the dat file.
+    :return: Dictionary {name: value}, with {index: value} as value of the indexed parameters.
+    '''
+    with open(datapath) as datafile:
+        statements = Data_Statements(datafile.readlines())
+    data = {}
+    for name, block in statements:
+        if name is None:
+            continue
+        values = ' '.join(line.split('#')[0] for line in block).split(':=', 1)[1].replace(';', ' ').strip()
+        if values[0] in "'\"" or len(values.split()) == 1:
+            data[name] = Value(values)
+        else:
+            values = values.split()
+            data[name] = {Value(i): Value(v) for i,v in zip(values[0::2], values[1::2])}
+    return data
+
+
+def Data_File(datapath, copypath=None, **values):
+    '''
+    This function writes a copy of the dat file with some of the parameters changed, to run variants of the same project.
+    :param datapath: Path of the dat file.
+    :param copypath: Path of the copy, a new file in the same folder of the dat file if None.
+    :param values: New value of each parameter to be changed (or added), a dictionary {index: value} for the indexed ones.
+    :return: Path of the copy, to be removed once used.
+    '''
+    with open(datapath) as datafile:
+        statements = Data_Statements(datafile.readlines())
+    lines = []
+    for name, block in statements:
+        lines += Data_Statement(name, values.pop(name)) if name in values else block
+    for name, value in values.items():
+        lines += Data_Statement(name, value)
+    if copypath is None:
+        copyfile, copypath = tempfile.mkstemp(suffix='.dat', dir=os.path.dirname(datapath))
+        os.close(copyfile)
+    with open(copypath, 'w') as datafile:
+        datafile.writelines(lines)
+    return copypath
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('csvfiles', nargs='+')
+    parser.add_argument('--start', default=None)
+    parser.add_argument('--step', default=1, type=int)
+    parser.add_argument('--unit', default='W')
+    arguments = parser.parse_args()
+    for csvfile in arguments.csvfiles:
+        Convert_Profile(csvfile, arguments.start, arguments.step, arguments.unit)
@@ -17,6 +17,7 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import pylab
+from Input_Store import Load_Frame
     
 import warnings
 warnings.filterwarnings("ignore")
@@ -35,13 +36,11 @@ fontlegend = 20
 
 idx = pd.IndexSlice
 
-Electric_Energy_Demand = pd.read_csv('a_Traditional-Energy-System/Inputs/Electric_Demand.csv', sep=';', index_col=0) # Import electricity demand
-Electric_Energy_Demand = Electric_Energy_Demand.round(3)
-Thermal_Energy_Demand = pd.read_csv('a_Traditional-Energy-System/Inputs/Thermal_Demand.csv', sep=';',  index_col=0) # Import thermal energy demand
-Thermal_Energy_Demand = Thermal_Energy_Demand.round(3)
+Electric_Energy_Demand = Load_Frame('a_Traditional-Energy-System/Inputs/Electric_Demand.csv') # Import electricity demand
+Thermal_Energy_Demand = Load_Frame('a_Traditional-Energy-System/Inputs/Thermal_Demand.csv') # Import thermal energy demand
     
-Electric_Energy_Demand.index = pd.DatetimeIndex(start=StartDate, periods=525600, freq='1min')
-Thermal_Energy_Demand.index = pd.DatetimeIndex(start=StartDate, periods=525600, freq='1min')
+Electric_Energy_Demand.index = pd.date_range(start=StartDate, periods=len(Electric_Energy_Demand), freq='1min')
+Thermal_Energy_Demand.index = pd.date_range(start=StartDate, periods=len(Thermal_Energy_Demand), freq='1min')
 
 StartDatePlot = ['12/23/2017 00:00:00','03/23/2017 00:00:00','06/23/2017 00:00:00','09/23/2017 00:00:00'] # MM/DD/YY
 EndDatePlot   = ['12/23/2017 23:59:59','03/23/2017 23:59:59','06/23/2017 23:59:59','09/23/2017 23:59:59']
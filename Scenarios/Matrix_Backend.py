@@ -0,0 +1,435 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Backend of Model_Matrix shared by the configurations: the linear program assembled directly as a sparse matrix with
+NumPy/SciPy and passed to the solver API, without building the Pyomo instance, its solution with the components of
+the Pyomo instance read by Results and Plots, and the parity check against the Pyomo backend. The constraints of each
+configuration are written by Matrix_Creation in its own Model_Matrix, passed here as the configuration module
+together with its Initialize.
+"""
+
+
+import os
+import time
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import spsolve
+from itertools import product
+from multiprocessing import Pool
+
+from Solvers import Solver_Options, Solve_Instance
+from Model_Cache import Model_Key, Cache_Load, Cache_Store
+from Input_Store import Value, Read_Data, Data_File
+
+
+#%% Input data
+Time_Series = {'Electric_Energy_Demand':     ('Electric_Energy_Demand', False),
+               'Thermal_Energy_Demand':      ('Thermal_Energy_Demand', True),
+               'RES_Unit_Energy_Production': ('RES_Energy_Output', False),
+               'SC_Unit_Energy_Production':  ('SC_Energy_Output', True)}     # Parameter of the model: (time series in Initialize.Input_Files, one column for each class)
+
+
+def Load_Profiles(data, initialize):
+    '''
+    This function returns the time series of the project as arrays indexed as the Pyomo parameters.
+    :param data: Dictionary of the parameters as returned by Read_Data.
+    :param initialize: Initialize module of the configuration, with the input files of its time series.
+    :return: Dictionary {parameter name: array}, resampled at the time resolution of the model and with the periods
+             of the representative days only if they are optimized.
+    '''
+    nP, nS, nC = data['Periods'], data['Scenarios'], data['Classes']
+    resolution = data.get('Time_Resolution', 1)
+    nT = initialize.Day_Periods(resolution)
+    rows, weight = np.arange(nP//resolution), np.ones(nP//resolution)
+    if data.get('Representative_Days', 0) != 0:
+        days, weights = initialize.Cluster_Days(data['Representative_Days'], nP, nS, nC, resolution)
+        rows = (days[:,None]*nT + np.arange(nT)).ravel()
+        weight = np.repeat(weights, nT).astype(float)
+    nP = len(rows)
+    profiles = {parameter: initialize.Profile_Array(initialize.Resample(initialize.Input_Profile(name), resolution)[rows], nP, nS, *([nC] if classes else []))
+                for parameter, (name, classes) in Time_Series.items() if name in initialize.Input_Files}
+    return dict(profiles, Period_Weight=weight, Model_Periods=nP, Day_Periods=nT, Delta_Time=resolution/60)
+
+
+#%% Sparse linear program
+class MatrixModel:
+    '''
+    Linear program with non negative variables, stored as blocks of variables and blocks of constraint rows
+    in coordinate format.
+    '''
+    def __init__(self):
+        self.nV = 0                         # Number of variables
+        self.nR = 0                         # Number of constraint rows
+        self.variables = {}                 # Column indices of each block of variables
+        self.constraints = {}               # Row indices of each block of constraints
+        self.cost = np.zeros(0)             # Objective function coefficients
+        self.rows, self.cols, self.coefs = [], [], []
+        self.sense, self.rhs = [], []
+        self.A = None                       # Constraint matrix, built when needed
+        self.status = None                  # Status of the last resolution ('optimal', 'infeasible', ...)
+
+    def __getstate__(self):
+        '''
+        The model is pickled (e.g. in Model_Cache) with the constraint matrix already built, in place of the blocks
+        of its entries, so that it goes straight to the solver when it is read.
+        '''
+        state = dict(self.__dict__, A=self.Matrix(), rows=[], cols=[], coefs=[])
+        state['sense'], state['rhs'] = [np.concatenate(self.sense)], [np.concatenate(self.rhs)]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        entries = self.A.tocoo()
+        self.rows, self.cols, self.coefs = [entries.row], [entries.col], [entries.data]
+
+    def Var(self, name, *shape):
+        '''
+        This function adds a block of non negative variables.
+        :param name: Name of the variable, as in Model_Creation.
+        :param shape: Size of each index of the variable.
+        :return: Array with the column of each element of the variable.
+        '''
+        index = self.nV + np.arange(int(np.prod(shape))).reshape(shape)
+        self.nV += index.size
+        self.variables[name] = index
+        return index
+
+    def Constraint(self, name, shape, terms, sense, rhs=0):
+        '''
+        This function adds a block of constraints sum(coef*variable) sense rhs.
+        Each term is (coef, columns) or (coef, columns, rows), where rows selects the constraints the term
+        belongs to (all of them if omitted). Coefficients and columns are broadcast against the constraint rows,
+        so the indices summed up within a constraint go in front.
+        :param name: Name of the constraint, as in Model_Resolution.
+        :param shape: Size of each index of the constraint.
+        :param terms: List of terms of the left hand side.
+        :param sense: '==', '<=' or '>='.
+        :param rhs: Right hand side, scalar or array of the given shape.
+        '''
+        rows = self.nR + np.arange(int(np.prod(shape))).reshape(shape)
+        self.nR += rows.size
+        for term in terms:
+            coef, cols = term[0], term[1]
+            termrows = rows[term[2]] if len(term) > 2 else rows
+            termrows, cols, coef = np.broadcast_arrays(termrows, cols, coef)
+            nonzero = coef != 0
+            self.rows.append(termrows[nonzero])
+            self.cols.append(cols[nonzero])
+            self.coefs.append(coef[nonzero])
+        self.sense.append(np.full(rows.size, {'==': '=', '<=': '<', '>=': '>'}[sense]))
+        self.rhs.append(np.broadcast_to(np.asarray(rhs, dtype=float), shape).ravel())
+        self.constraints[name] = rows
+
+    def Fix(self, name, values, sense='==', constraint=None):
+        '''
+        This function adds a block of constraints variable sense values on all the elements of a variable.
+        :param name: Name of the variable.
+        :param values: Values of the variable, scalar or array of its shape.
+        :param sense: '==' to fix the variable, '>=' or '<=' to bound it.
+        :param constraint: Name of the block of constraints, 'Fixed_' and the name of the variable if None.
+        '''
+        index = self.variables[name]
+        if constraint is None:
+            constraint = 'Fixed_'+name
+        self.Constraint(constraint, index.shape, [(1, index)], sense, values)
+
+    def Relax(self, name, penalty):
+        '''
+        This function adds to each row of a block of constraints non negative slack variables paid with a penalty in
+        the objective function, so that the constraints can be violated at a cost (set the objective first): one that
+        lowers the left hand side of the '<=' rows, one that raises it for the '>=' rows and both for the '==' rows.
+        :param name: Name of the constraint.
+        :param penalty: Cost of a unit of slack, scalar or array of the shape of the constraint.
+        :return: Array (2, shape of the constraint) with the column of the slack that lowers and the one that raises each row.
+        '''
+        rows = self.constraints[name]
+        sense = np.concatenate(self.sense)[rows]
+        slack = self.Var('Slack_'+name, 2, *rows.shape)
+        for side, coef, senses in ((0, -1.0, '<='), (1, 1.0, '>=')):
+            used = np.isin(sense, list(senses))
+            self.rows.append(rows[used])
+            self.cols.append(slack[side][used])
+            self.coefs.append(np.full(used.sum(), coef))
+        self.cost = np.concatenate([self.cost, np.tile(np.broadcast_to(np.asarray(penalty, dtype=float), rows.shape).ravel(), 2)])
+        return slack
+
+    def Objective(self, terms):
+        '''
+        This function sets the objective function to be minimized.
+        :param terms: List of (coef, columns) of the objective function.
+        '''
+        self.cost = np.zeros(self.nV)
+        for coef, cols in terms:
+            cols, coef = np.broadcast_arrays(cols, coef)
+            np.add.at(self.cost, cols.ravel(), coef.ravel())
+
+    def Matrix(self):
+        '''
+        This function returns the matrix of the constraints, built again only when variables or constraints have been added.
+        :return: Constraint matrix in compressed sparse row format, with the repeated entries summed up.
+        '''
+        if self.A is None or self.A.shape != (self.nR, self.nV):
+            self.A = sp.csr_matrix((np.concatenate(self.coefs), (np.concatenate(self.rows), np.concatenate(self.cols))), shape=(self.nR, self.nV))
+        return self.A
+
+    def Solve(self, solver='gurobi', options=None, mpsfile=None, tee=True, duals=False):
+        '''
+        This function solves the linear program through the API of the solver.
+        :param solver: 'gurobi' (gurobipy) or 'highs' (highspy).
+        :param options: Solver options as 'Name=value Name=value', Solver_Options if None.
+        :param mpsfile: If given, the linear program is also written in this MPS file.
+        :param tee: Print the solver log.
+        :param duals: Return also the duals of the constraints (change of the objective function for a unit
+                      increase of the right hand side of each row).
+        :return: Value of the variables and of the objective function (and duals of the constraints).
+        '''
+        A = self.Matrix()
+        sense = np.concatenate(self.sense)
+        rhs = np.concatenate(self.rhs)
+        if options is None:
+            options = Solver_Options(solver)    # Same profile of Model_Resolution
+        options = dict(option.split('=') for option in options.split())
+
+        if solver == 'gurobi':
+            import gurobipy as gp
+            opt = gp.Model()
+            opt.setParam('OutputFlag', int(tee))
+            for name, value in options.items():
+                opt.setParam(name, Value(value))
+            x = opt.addMVar(self.nV, obj=self.cost)
+            constraints = opt.addMConstr(A, x, sense, rhs)
+            if mpsfile is not None:
+                opt.write(mpsfile)
+            opt.optimize()
+            self.status = {gp.GRB.OPTIMAL: 'optimal', gp.GRB.INFEASIBLE: 'infeasible', gp.GRB.UNBOUNDED: 'unbounded'}.get(opt.Status, str(opt.Status))
+            values, objective = (x.X, opt.ObjVal) if opt.SolCount > 0 else (np.full(self.nV, np.nan), np.nan)   # No solution of an infeasible model
+            if duals:
+                return values, objective, np.array(constraints.Pi) if self.status == 'optimal' else np.full(self.nR, np.nan)
+            return values, objective
+
+        elif solver == 'highs':
+            import highspy
+            A = A.tocsc()
+            lp = highspy.HighsLp()
+            lp.num_col_ = self.nV
+            lp.num_row_ = self.nR
+            lp.col_cost_ = self.cost
+            lp.col_lower_ = np.zeros(self.nV)
+            lp.col_upper_ = np.full(self.nV, highspy.kHighsInf)
+            lp.row_lower_ = np.where(sense == '<', -highspy.kHighsInf, rhs)
+            lp.row_upper_ = np.where(sense == '>', highspy.kHighsInf, rhs)
+            lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+            lp.a_matrix_.start_ = A.indptr
+            lp.a_matrix_.index_ = A.indices
+            lp.a_matrix_.value_ = A.data
+            opt = highspy.Highs()
+            opt.setOptionValue('output_flag', tee)
+            for name, value in options.items():
+                opt.setOptionValue(name, Value(value))
+            opt.passModel(lp)
+            if mpsfile is not None:
+                opt.writeModel(mpsfile)
+            opt.run()
+            self.status = {highspy.HighsModelStatus.kOptimal: 'optimal', highspy.HighsModelStatus.kInfeasible: 'infeasible',
+                           highspy.HighsModelStatus.kUnbounded: 'unbounded'}.get(opt.getModelStatus(), opt.modelStatusToString(opt.getModelStatus()))
+            if duals:
+                return np.array(opt.getSolution().col_value), opt.getInfo().objective_function_value, np.array(opt.getSolution().row_dual)
+            return np.array(opt.getSolution().col_value), opt.getInfo().objective_function_value
+
+        raise ValueError('Matrix_Backend: solver ' + str(solver) + ' not available')
+
+    def Recompute(self, values, names):
+        '''
+        This function recomputes some variables from the value of all the others, solving the equality constraints
+        that define them (as the costs from the energy flows, after the weights of the periods have changed).
+        :param values: Value of all the variables.
+        :param names: Names of the variables to be recomputed, each element defined by one equality constraint.
+        :return: Value of the variables with the given ones recomputed, and value of the objective function.
+        '''
+        A = self.Matrix().tocsc()
+        sense = np.concatenate(self.sense)
+        rhs = np.concatenate(self.rhs)
+        unknown = np.concatenate([self.variables[name].ravel() for name in names])
+        known = np.setdiff1d(np.arange(self.nV), unknown)
+        rows = np.flatnonzero(np.diff(A[:,unknown].tocsr().indptr))
+        if len(rows) != len(unknown) or (sense[rows] != '=').any():
+            raise ValueError('Matrix_Backend: the variables to be recomputed are not defined by one equality constraint each')
+        values = values.copy()
+        values[unknown] = spsolve(A[rows][:,unknown].tocsc(), rhs[rows] - A[rows][:,known].dot(values[known]))
+        return values, self.cost.dot(values)
+
+
+#%% Solution
+class Component:
+    '''
+    Values of a parameter or of a variable of the solved model, with the methods of the Pyomo components
+    used in Results and Plots.
+    '''
+    def __init__(self, values):
+        self.array = None if isinstance(values, dict) else np.asarray(values)  # Values in the order of the index, read by Results.Values_Array
+        self._values = values if isinstance(values, dict) else None
+
+    @property
+    def values(self):
+        '''
+        Dictionary {index: value} as in Pyomo, built only when needed.
+        '''
+        if self._values is None:
+            if self.array.ndim == 0:
+                self._values = {None: self.array.item()}
+            elif self.array.ndim == 1:
+                self._values = dict(zip(range(1, self.array.size+1), self.array.tolist()))
+            else:
+                self._values = dict(zip(product(*(range(1, n+1) for n in self.array.shape)), self.array.ravel().tolist()))
+        return self._values
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def get_values(self):
+        return self.values
+
+    def extract_values(self):
+        return self.values
+
+
+class Objective:
+    '''
+    Value of the objective function of the solved model.
+    '''
+    def __init__(self, value):
+        self.value = value
+
+    def expr(self):
+        return self.value
+
+
+class Solution:
+    '''
+    Solved model, with the parameters, the variables and the objective function as attributes named as
+    in the Pyomo instance, so that it can be passed to Results and Plots in place of the instance.
+    '''
+    def __init__(self, model, values, objective, parameters):
+        for name, value in parameters.items():
+            setattr(self, name, Component(value))
+        for name, index in model.variables.items():
+            setattr(self, name, Component(values[index]))
+        self.ObjectiveFuntion = Objective(objective)
+
+
+#%% Resolution
+def Matrix_Resolution(configuration, datapath="Inputs/data.dat", solver=None, options=None, mpsfile=None, threads=None, cache=True):
+    '''
+    This function builds the model as a sparse matrix and solves it, in place of Model_Creation and Model_Resolution.
+    :param configuration: Model_Matrix module of the configuration, with its Matrix_Creation and its Initialize.
+    :param datapath: Path of the dat file with the parameters of the project.
+    :param solver: 'gurobi' or 'highs', the solver of the dat file if None.
+    :param options: Solver options as 'Name=value Name=value', Solver_Options if None.
+    :param mpsfile: If given, the linear program is also written in this MPS file.
+    :param threads: Number of threads of the solver, the default of the solver if None.
+    :param cache: Take the model from Model_Cache if the project has not changed, and store it there otherwise.
+    :return: The solved model, with the same components of the Pyomo instance used in Results and Plots.
+    '''
+    start = time.time()
+    key = Model_Key(configuration.Initialize, datapath) if cache else None
+    cached = Cache_Load(key) if cache else None
+    if cached is None:
+        data = Read_Data(datapath)
+        profiles = Load_Profiles(data, configuration.Initialize)
+        model = configuration.Matrix_Creation(data, profiles)
+        print('Model_Matrix: Matrix created in', round(time.time()-start,1), 's (', model.nV, 'variables,', model.nR, 'constraints )')
+        if cache:
+            Cache_Store(key, (model, data, profiles))
+    else:
+        model, data, profiles = cached
+        print('Model_Matrix: Matrix loaded from the cache in', round(time.time()-start,1), 's (', model.nV, 'variables,', model.nR, 'constraints )')
+
+    if solver is None:
+        solver = data.get('Solver', 'gurobi')
+    if options is None:
+        options = Solver_Options(solver, threads)
+
+    print('Model_Matrix: Solver called')
+    values, objective = model.Solve(solver, options, mpsfile)
+    print('Model_Matrix: instance solved')
+
+    return Solution(model, values, objective, {**data, **profiles})
+
+
+#%% Parity check
+def Peak_Memory():
+    '''
+    This function returns the peak resident memory of the current process in MB (None where not available).
+    '''
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024
+
+
+def Build_And_Solve(backend, datapath, solver):
+    '''
+    This function builds and solves the model with the Pyomo or the matrix backend, in a separate process, with the
+    modules of the configuration in the working directory.
+    :return: Build time in s, peak memory in MB after the build, number of variables and constraints, objective function.
+    '''
+    start = time.time()
+    if backend == 'Pyomo':
+        from pyomo.environ import AbstractModel
+        from Model_Creation import Model_Creation
+        from Model_Resolution import Model_Instance
+        model = AbstractModel()
+        Model_Creation(model)
+        instance = Model_Instance(model, datapath)
+        build, memory, size = time.time()-start, Peak_Memory(), (instance.nvariables(), instance.nconstraints())
+        Solve_Instance(instance, solver, tee=False, table=None)
+        objective = instance.ObjectiveFuntion.expr()
+    else:
+        import Model_Matrix
+        data = Read_Data(datapath)
+        model = Model_Matrix.Matrix_Creation(data, Load_Profiles(data, Model_Matrix.Initialize))
+        build, memory, size = time.time()-start, Peak_Memory(), (model.nV, model.nR)
+        objective = model.Solve(solver, tee=False)[1]
+    return build, memory, size, objective
+
+
+def Matrix_Check(datapath="Inputs/data.dat", periods=1440, solver='highs', tolerance=1e-4):
+    '''
+    This function solves the project on a reduced number of periods with both the Pyomo and the matrix backend of the
+    configuration in the working directory, and compares the size of the linear programs, their optimal net present
+    cost, the build time and the peak memory.
+    :param datapath: Path of the dat file with the parameters of the project.
+    :param periods: Number of periods of the reduced project.
+    :param solver: 'gurobi' or 'highs'.
+    :param tolerance: Maximum relative difference between the two net present costs.
+    :return: True if the two backends give the same linear program and net present cost.
+    '''
+    checkpath = Data_File(datapath, Periods=periods)
+
+    results = {}
+    try:
+        for backend in ['Pyomo', 'Matrix']:
+            with Pool(1) as pool:   # a new process for each backend, to measure its own peak memory
+                results[backend] = pool.apply(Build_And_Solve, (backend, checkpath, solver))
+    finally:
+        os.remove(checkpath)
+
+    for backend, (build, memory, size, objective) in results.items():
+        print('Model_Matrix:', backend, 'backend -', size[0], 'variables,', size[1], 'constraints, built in', round(build,2), 's,',
+              'peak memory', 'n/a' if memory is None else str(round(memory))+' MB,', 'NPC', objective)
+
+    same_size = results['Pyomo'][2] == results['Matrix'][2]
+    same_cost = abs(results['Pyomo'][3]-results['Matrix'][3]) <= tolerance*abs(results['Pyomo'][3])
+    print('Model_Matrix: parity', 'passed' if same_size and same_cost else 'FAILED')
+    return same_size and same_cost
@@ -0,0 +1,114 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Cache of the models built by Model_Matrix, keyed on the content of the dat file, of the input time series and of
+the code that reads the time series and builds the constraints, so that a project that has not changed goes straight
+to the solver.
+The least recently used models are removed when the cache exceeds its size.
+"""
+
+
+import os
+import pickle
+import hashlib
+import tempfile
+
+import Input_Store
+
+
+Cache_Path = 'Cache'            # Folder of the cache, relative to the folder of the configuration
+Cache_Size = 4*1024**3          # Maximum size of the cache in bytes
+Configuration_Sources = ['Initialize.py', 'Model_Matrix.py']    # Code of the configuration that reads the time series and builds the constraints
+Shared_Sources = [os.path.abspath(Input_Store.__file__), os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Matrix_Backend.py'), os.path.abspath(__file__)]     # Code shared by the configurations, and the cache itself
+
+
+def Fingerprint(paths):
+    '''
+    This function returns the SHA-256 hash of the content of some files.
+    :param paths: List of the paths of the files.
+    :return: Hexadecimal string of the hash.
+    '''
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def Model_Sources(initialize):
+    '''
+    This function returns the paths of the code that builds the model of a configuration.
+    :param initialize: Initialize module of the configuration.
+    '''
+    folder = os.path.dirname(os.path.abspath(initialize.__file__))
+    return [os.path.join(folder, source) for source in Configuration_Sources] + Shared_Sources
+
+
+def Model_Key(initialize, datapath="Inputs/data.dat"):
+    '''
+    This function returns the key of the model of a project in the cache.
+    :param initialize: Initialize module of the configuration, with the Input_Files of its time series.
+    :param datapath: Path of the dat file with the parameters of the project.
+    '''
+    return Fingerprint([datapath] + list(initialize.Input_Files.values()) + Model_Sources(initialize))
+
+
+def Cache_Load(key, path=Cache_Path):
+    '''
+    This function reads a model from the cache and marks it as the most recently used.
+    :param key: Key of the model, as returned by Model_Key.
+    :param path: Folder of the cache.
+    :return: The content stored with the key, None if not in the cache.
+    '''
+    file = os.path.join(path, key+'.pkl')
+    try:
+        with open(file, 'rb') as cached:
+            content = pickle.load(cached)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    os.utime(file)
+    return content
+
+
+def Cache_Evict(path=Cache_Path, size=Cache_Size):
+    '''
+    This function removes the least recently used models until the cache is not bigger than its size.
+    :param path: Folder of the cache.
+    :param size: Maximum size of the cache in bytes (the last model used is kept even if bigger).
+    '''
+    files = sorted((os.path.join(path, name) for name in os.listdir(path) if name.endswith('.pkl')), key=os.path.getmtime)
+    total = sum(os.path.getsize(file) for file in files)
+    for file in files[:-1]:
+        if total <= size:
+            break
+        total -= os.path.getsize(file)
+        os.remove(file)
+        print('Model_Cache: model', os.path.basename(file)[:12], 'removed from the cache')
+
+
+def Cache_Store(key, content, path=Cache_Path, size=Cache_Size):
+    '''
+    This function writes a model in the cache, then removes the least recently used ones above the size of the cache.
+    :param key: Key of the model, as returned by Model_Key.
+    :param content: Object to be stored (the model and its data).
+    :param path: Folder of the cache.
+    :param size: Maximum size of the cache in bytes.
+    '''
+    os.makedirs(path, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=path, suffix='.tmp')   # written under another name, so that a model is never read half written
+    with os.fdopen(descriptor, 'wb') as cached:
+        pickle.dump(content, cached, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, os.path.join(path, key+'.pkl'))
+    Cache_Evict(path, size)
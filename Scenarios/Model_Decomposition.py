@@ -0,0 +1,257 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Decomposition of the year-long model: the system is sized on a reduced model (coarser time resolution or
+representative days), then the dispatch of the whole year is solved in overlapping windows in parallel processes,
+with the sizes fixed and the state of charge of the storages handed over from each window to the next one. The
+sizes grow only when a window cannot be supplied with them.
+Usage: python ../Model_Decomposition.py [--solver highs] [--processes 4] [--monolithic], from the folder of a configuration
+"""
+
+
+import os
+import sys
+import time
+import argparse
+import warnings
+import numpy as np
+from multiprocessing import Pool
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.getcwd())     # Modules of the configuration, in the working directory
+import Initialize
+from Model_Matrix import Matrix_Creation
+from Matrix_Backend import Read_Data, Load_Profiles
+
+
+Matrix_Solvers = ['gurobi', 'highs']     # Solvers with an API in MatrixModel.Solve
+Storage = {'BESS_State_of_Charge': ('BESS_Nominal_Capacity', 'BESS_Initial_Charge', 'BESS_Depth_of_Discharge'),   # State of charge: (capacity, initial state of charge of a window, depth of discharge)
+           'Tank_State_of_Charge': ('Tank_Nominal_Capacity', 'Tank_Initial_Charge', 'Tank_Depth_of_Discharge')}
+
+
+#%% Sizing
+def Sizing_Variables(model):
+    '''
+    This function returns the names of the variables of the size of the components (units and nominal capacities).
+    :param model: MatrixModel of the energy system.
+    '''
+    return [name for name in model.variables if 'Units' in name or 'Nominal' in name]
+
+
+def Initial_Charge(outer, outer_values, sizes, minute, nS):
+    '''
+    This function returns the first guess of the state of charge of the storages at a given minute of the year,
+    from the solution of the reduced model if it covers the whole year, or the storages full otherwise.
+    :param outer: Tuple (MatrixModel, data, profiles) of the reduced model.
+    :param outer_values: Value of the variables of the reduced model.
+    :param sizes: Dictionary {name: value} of the size of the components.
+    :param minute: Minute of the year.
+    :param nS: Number of scenarios.
+    :return: Dictionary {initial state of charge name: array}.
+    '''
+    model, data, profiles = outer
+    period = minute//data.get('Time_Resolution', 1) - 1
+    charge = {}
+    for name, (capacity, initial, depth) in Storage.items():
+        if name not in model.variables:
+            continue
+        if data.get('Representative_Days', 0) == 0 and 0 <= period < profiles['Model_Periods']:
+            charge[initial] = outer_values[model.variables[name][...,period]]
+        else:
+            charge[initial] = np.broadcast_to(sizes[capacity], model.variables[name].shape[:-1]).copy()
+    return charge
+
+
+#%% Dispatch windows
+def Window_Profiles(profiles, start, end):
+    '''
+    This function returns the time series of a window of periods of the year.
+    :param profiles: Dictionary of the time series as returned by Load_Profiles.
+    :param start: First period of the window (from 0).
+    :param end: Period after the last one of the window.
+    :return: Dictionary of the time series of the window.
+    '''
+    window = {}
+    for name, value in profiles.items():
+        window[name] = value[...,start:end] if isinstance(value, np.ndarray) else value
+    window['Model_Periods'] = end-start
+    return window
+
+
+def Window_Dispatch(task):
+    '''
+    This function solves the dispatch of a window with the size of the components fixed, and computes the costs of
+    the periods of the window that are not overlapped by the next one. If the window cannot be supplied with these
+    sizes, it is solved again with the sizes as lower bounds (feasibility step): the components grow only as much
+    as the window needs, since its investment cost is paid in full against the operating costs of the window only.
+    The lost load is bounded by the tolerance of the demand of the window, not of the year (see Decomposed_Resolution).
+    :param task: Tuple (data, profiles, sizes, core, solver, options), where core is the number of periods of the
+                 window not overlapped by the next one.
+    :return: Size of the components, True if the window was supplied with the sizes given (False after the
+             feasibility step), state of charge of the storages at the end of the core periods, variable costs and
+             net present cost of each scenario over the core periods.
+    '''
+    data, profiles, sizes, core, solver, options = task
+    for name, (capacity, initial, depth) in Storage.items():
+        if initial in profiles:     # State of charge handed over, brought within the limits of the storage
+            profiles = dict(profiles, **{initial: np.clip(profiles[initial], data[depth]*sizes[capacity], sizes[capacity])})
+    for sense in ('==', '>='):
+        model = Matrix_Creation(data, profiles)
+        for name, value in sizes.items():
+            model.Fix(name, value, sense)
+        values = model.Solve(solver, options, tee=False)[0]
+        if model.status == 'optimal':
+            break
+    if model.status != 'optimal':
+        raise RuntimeError('Model_Decomposition: dispatch of a window ' + str(model.status) + ' even with the sizes as lower bounds')
+
+    weight = profiles['Period_Weight']*(np.arange(profiles['Model_Periods']) < core)
+    core_model = Matrix_Creation(data, dict(profiles, Period_Weight=weight))
+    values = core_model.Recompute(values, [name for name in core_model.variables if 'Cost' in name])[0]
+
+    window_sizes = {name: values[model.variables[name]] for name in sizes}
+    charge = {initial: values[model.variables[name][...,core-1]] for name, (capacity, initial, depth) in Storage.items() if name in model.variables}
+    return window_sizes, sense == '==', charge, values[model.variables['Variable_Costs']], values[model.variables['Scenario_Net_Present_Cost']]
+
+
+#%% Resolution
+def Reduced_Sizing(data, profiles, bounds, solver, options):
+    '''
+    This function sizes the system on the reduced model, with the sizes found by the feasibility steps of the
+    windows as lower bounds.
+    :param data: Parameters of the reduced model.
+    :param profiles: Time series of the reduced model.
+    :param bounds: Dictionary {name: array} of the lower bounds of the sizes.
+    :return: MatrixModel of the reduced model, value of its variables and its net present cost.
+    '''
+    model = Matrix_Creation(data, profiles)
+    for name, value in bounds.items():
+        model.Fix(name, value, '>=')
+    values, NPC = model.Solve(solver, options, tee=False)
+    if model.status != 'optimal':
+        raise RuntimeError('Model_Decomposition: sizing on the reduced model ' + str(model.status))
+    return model, values, NPC
+
+
+def Decomposed_Resolution(datapath="Inputs/data.dat", outer=None, window_days=7, overlap_days=1, iterations=10,
+                          tolerance=1e-3, processes=None, solver=None, options=None, monolithic=False):
+    '''
+    This function sizes the system on a reduced model, then solves the dispatch of the year in overlapping windows
+    in parallel with the sizes fixed, iterating until the state of charge handed over between the windows does not
+    change. The components grown by the windows that cannot be supplied (see Window_Dispatch) become lower bounds
+    of the sizes, and the system is sized again on the reduced model so that the other components follow them.
+    The result is a feasible sizing of the whole year, not the optimal one: monolithic=True reports the gap.
+    The tolerance of the lost load is enforced over the year only in the reduced model, while each window keeps
+    its lost load within the tolerance of its own demand: this is a deliberate approximation on the safe side, since
+    a window cannot make up for the lost load of another one, and it may grow the sizes more than the year needs.
+    :param datapath: Path of the dat file with the parameters of the project.
+    :param outer: Parameters of the reduced model used for the sizing (Time_Resolution, Representative_Days),
+                  hourly resolution if None.
+    :param window_days: Days of each window.
+    :param overlap_days: Days of each window overlapped by the next one, optimized but with the costs counted in the next window.
+    :param iterations: Maximum number of iterations over the windows.
+    :param tolerance: Maximum change of the state of charge handed over, as a fraction of the capacity of the storage.
+    :param processes: Number of worker processes, all the cores if None.
+    :param solver: 'gurobi' or 'highs', the solver of the dat file if None.
+    :param options: Solver options as 'Name=value Name=value', Solver_Options if None.
+    :param monolithic: Solve also the model of the whole year in one piece, to report the gap of the decomposition.
+    :return: Net present cost of the decomposed solution and size of the components.
+    '''
+    start = time.time()
+    if outer is None:
+        outer = {'Time_Resolution': 60}
+    data = Read_Data(datapath)
+    if solver is None:
+        solver = data.get('Solver', 'gurobi')
+    if solver not in Matrix_Solvers:
+        raise ValueError('Model_Decomposition: solver ' + str(solver) + ' not available, choose among ' + ', '.join(Matrix_Solvers))
+    data['Representative_Days'] = data.get('Representative_Days', 0)
+    nS = data['Scenarios']
+    Scenario_Weight = np.array([data['Scenario_Weight'][s] for s in range(1,nS+1)])
+    outer_data = dict(data, **outer)
+    outer_profiles = Load_Profiles(outer_data, Initialize)
+
+    "Windows of the year"
+    data['Representative_Days'] = 0
+    profiles = Load_Profiles(data, Initialize)
+    nP, nT, resolution = profiles['Model_Periods'], profiles['Day_Periods'], data.get('Time_Resolution', 1)
+    starts = list(range(0, nP, window_days*nT))
+    ends = [min(first+window_days*nT, nP) for first in starts]
+
+    bounds, unsupplied, converged = {}, None, False
+    with Pool(processes) as pool:
+        for iteration in range(1, iterations+1):
+            if unsupplied is None or unsupplied:
+                "Sizing on the reduced model"
+                outer_model, outer_values, outer_NPC = Reduced_Sizing(outer_data, outer_profiles, bounds, solver, options)
+                sizes = {name: outer_values[outer_model.variables[name]] for name in Sizing_Variables(outer_model)}
+                charges = [{}] + [Initial_Charge((outer_model, outer_data, outer_profiles), outer_values, sizes, first*resolution, nS) for first in starts[1:]]
+                print('Model_Decomposition: system sized on the reduced model', outer, 'with', len(bounds), 'sizes bounded - NPC', round(outer_NPC), 'USD')
+
+            tasks = []
+            for first, last, charge in zip(starts, ends, charges):
+                end = min(last+overlap_days*nT, nP)
+                tasks.append((data, dict(Window_Profiles(profiles, first, end), **charge), sizes, last-first, solver, options))
+            results = pool.map(Window_Dispatch, tasks)
+
+            unsupplied = [result[0] for result in results if not result[1]]
+            for window_sizes in unsupplied:     # Components grown by the feasibility step, all of them if none grew beyond the tolerance
+                grown = {name: window_sizes[name] > sizes[name]*(1+tolerance)+tolerance for name in sizes}
+                if not any(np.any(value) for value in grown.values()):
+                    grown = {name: np.ones(np.shape(sizes[name]), bool) for name in sizes}
+                for name in sizes:
+                    if np.any(grown[name]):
+                        bounds[name] = np.maximum(bounds.get(name, 0), np.where(grown[name], window_sizes[name], 0))
+            new_charges = [{}] + [result[2] for result in results[:-1]]
+            change = 0
+            for charge, new_charge in zip(charges[1:], new_charges[1:]):
+                for name, (capacity, initial, depth) in Storage.items():
+                    if initial in new_charge:
+                        scale = np.maximum(np.broadcast_to(sizes[capacity], new_charge[initial].shape), 1e-9)
+                        change = max(change, np.max(abs(new_charge[initial]-charge.get(initial, 0))/scale))
+            charges = new_charges
+            print('Model_Decomposition: iteration', iteration, '-', len(tasks), 'windows,', len(unsupplied), 'not supplied with the sizes,',
+                  'maximum change of the state of charge handed over', round(100*change,3), '%')
+            if not unsupplied and change <= tolerance:
+                converged = True
+                break
+
+    if unsupplied:
+        raise RuntimeError('Model_Decomposition: ' + str(len(unsupplied)) + ' windows still not supplied after ' + str(iterations) + ' iterations')
+    if not converged:
+        warnings.warn('Model_Decomposition: the state of charge handed over between the windows has not converged after ' + str(iterations) +
+                      ' iterations (change ' + str(round(100*change,3)) + ' %)')
+
+    "Net present cost of the year"
+    Variable_Costs = sum(result[3] for result in results)
+    Net_Present_Cost = results[0][4] - results[0][3] + Variable_Costs   # investment and fixed costs, the same in all the windows
+    NPC = Scenario_Weight.dot(Net_Present_Cost)
+    print('Model_Decomposition: NPC of the decomposed solution', round(NPC), 'USD, solved in', round(time.time()-start,1), 's')
+
+    if monolithic:
+        start = time.time()
+        model = Matrix_Creation(data, profiles)
+        monolithic_NPC = model.Solve(solver, options, tee=False)[1]
+        print('Model_Decomposition: NPC of the monolithic model', round(monolithic_NPC), 'USD, solved in', round(time.time()-start,1), 's',
+              '- gap of the decomposition', round(100*(NPC-monolithic_NPC)/monolithic_NPC,3), '%')
+
+    return NPC, sizes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--solver', default=None)
+    parser.add_argument('--processes', default=None, type=int)
+    parser.add_argument('--monolithic', action='store_true')     # Solve also the whole year in one piece to report the gap, with the memory of the whole model
+    arguments = parser.parse_args()
+    Decomposed_Resolution(processes=arguments.processes, solver=arguments.solver, monolithic=arguments.monolithic)
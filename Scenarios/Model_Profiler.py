@@ -0,0 +1,204 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Profile of the creation of the Pyomo instance: time of construction, size (rows, columns, nonzeros) and memory of
+each component, and time spent by the solver interface to write the model, to solve it and to load the solution
+back, saved in a json report with a summary table of the components that take longest.
+The times are taken by wrapping private methods of Pyomo (Model._initialize_component and the methods of the solver
+interfaces in Solver_Methods), checked with Pyomo 6.x up to 6.10: where a method is missing in another version, the
+profile goes on without the times it measures and a warning is raised.
+"""
+
+
+import os
+import json
+import time
+import warnings
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+Profile_Report = 'Results/Build_Profile.json'     # Report of the last profiled resolution
+
+Solver_Methods = {'Write': ['_presolve', 'set_instance', 'update'],    # Methods of the solver interfaces timed in each phase: the shell
+                  'Solve': ['_apply_solver', '_solve'],                # solvers (_presolve, _apply_solver, _postsolve) and the persistent
+                  'Load':  ['_postsolve']}                             # ones (set_instance or update, _solve that calls _postsolve)
+
+
+def Memory_Usage():
+    '''
+    This function returns the resident memory of the current process in MB (the peak one where the current one is
+    not available, None if neither is).
+    '''
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1])*os.sysconf('SC_PAGE_SIZE')/1024**2
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss/1024**2
+    except ImportError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024
+
+
+def Component_Size(component):
+    '''
+    This function returns the size of a component of an instance in the linear program sent to the solver.
+    :param component: Constrained component (Constraint, Objective, Expression), Var or Param of the instance.
+    :return: Number of rows, columns (variables referenced) and nonzeros of the component, and number of its elements.
+    '''
+    from pyomo.environ import Constraint, Objective, Expression, Var
+    from pyomo.repn.standard_repn import generate_standard_repn
+
+    if component.ctype is Var:
+        return 0, len(component), 0, len(component)
+    if component.ctype not in (Constraint, Objective, Expression):
+        return 0, 0, 0, len(component)
+    rows, nonzeros, columns = 0, 0, set()
+    for data in component.values():
+        if component.ctype is not Expression and not data.active:
+            continue
+        repn = generate_standard_repn(data.body if component.ctype is Constraint else data.expr, quadratic=False)
+        rows += component.ctype is Constraint
+        nonzeros += len(repn.linear_vars)
+        columns.update(id(var) for var in repn.linear_vars)
+    return rows, len(columns), nonzeros, len(component)
+
+
+class Build_Profiler:
+    '''
+    Record of the profile of the creation and resolution of an instance: Construction times the components while
+    create_instance builds them, Solver_Phases the phases of the solver interface, Report saves and prints them.
+    '''
+    def __init__(self):
+        self.components = []
+        self.solver = dict.fromkeys(Solver_Methods, 0.0)
+        self.durations = {}
+
+    @contextmanager
+    def Construction(self):
+        '''
+        Context in which each component constructed by create_instance is timed, with the resident memory
+        before and after its construction.
+        '''
+        from pyomo.core.base.PyomoModel import Model
+
+        if not callable(getattr(Model, '_initialize_component', None)):
+            warnings.warn('Model_Profiler: Model._initialize_component not found in this version of Pyomo, the construction of the components is not timed')
+            yield self
+            return
+        initialize = Model._initialize_component
+
+        def Timed_Initialize(model, modeldata, namespaces, name, *args, **kwargs):
+            memory, start = Memory_Usage(), time.perf_counter()
+            initialize(model, modeldata, namespaces, name, *args, **kwargs)
+            elapsed = time.perf_counter()-start
+            component = model.component(name)
+            self.components.append({'Component': name, 'Type': component.ctype.__name__, 'Construction time [s]': elapsed,
+                                    'Memory [MB]': None if memory is None else Memory_Usage()-memory})
+
+        Model._initialize_component = Timed_Initialize
+        try:
+            yield self
+        finally:
+            Model._initialize_component = initialize
+
+    def Solver_Phases(self, opt):
+        '''
+        This function times the methods of a solver interface in the phases of Solver_Methods, for the next resolutions.
+        :param opt: Solver created by SolverFactory.
+        '''
+        if getattr(opt, 'profiler', None) is self:
+            return opt
+        durations = self.durations
+
+        def Timed_Method(name, method):
+            def Timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    durations[name] = durations.get(name, 0) + time.perf_counter()-start
+            return Timed
+
+        for phase, names in Solver_Methods.items():
+            timed = [name for name in names if callable(getattr(opt, name, None))]
+            if not timed:
+                warnings.warn('Model_Profiler: none of the methods ' + ', '.join(names) + ' found in the solver interface ' + type(opt).__name__ +
+                              ', the ' + phase + ' phase is not timed')
+            for name in timed:
+                setattr(opt, name, Timed_Method(name, getattr(opt, name)))
+        opt.profiler = self
+        return opt
+
+    def Solver_Time(self, load=0.0):
+        '''
+        This function adds the time of the phases of the last resolution to the record of the solver.
+        :param load: Time spent to load the solution into the instance after the resolution, in s.
+        '''
+        durations = self.durations
+        phases = {phase: sum(durations.get(name, 0) for name in names) for phase, names in Solver_Methods.items()}
+        if '_solve' in durations:
+            phases['Solve'] -= durations.get('_postsolve', 0)    # _postsolve is called by _solve of the persistent solvers
+        phases['Load'] += load
+        for phase, elapsed in phases.items():
+            self.solver[phase] += elapsed
+        durations.clear()
+
+    def Table(self, instance):
+        '''
+        This function returns the profile of the components, with their size in the instance.
+        :param instance: Pyomo instance created within Construction.
+        :return: DataFrame with one row for each component, sorted by construction time.
+        '''
+        table = pd.DataFrame(self.components, columns=['Component', 'Type', 'Construction time [s]', 'Memory [MB]'])
+        size = [Component_Size(instance.component(name)) for name in table['Component']]
+        table[['Rows', 'Columns', 'Nonzeros', 'Elements']] = pd.DataFrame(size, index=table.index, columns=['Rows', 'Columns', 'Nonzeros', 'Elements'], dtype=int)
+        table['Share [%]'] = 100*table['Construction time [s]']/max(table['Construction time [s]'].sum(), 1e-12)
+        return table.sort_values('Construction time [s]', ascending=False).reset_index(drop=True)
+
+    def Report(self, instance, path=Profile_Report, top=15):
+        '''
+        This function saves the profile of the creation and resolution of an instance in a json file and prints
+        the components that take longest to construct.
+        :param instance: Pyomo instance created within Construction.
+        :param path: Path of the json report, None to skip the file.
+        :param top: Number of components in the summary table.
+        :return: DataFrame of the profile of the components.
+        '''
+        table = self.Table(instance)
+        report = {'Date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                  'Construction time [s]': table['Construction time [s]'].sum(),
+                  'Rows': int(table['Rows'].sum()), 'Columns': int(table.loc[table['Type'] == 'Var', 'Columns'].sum()),
+                  'Nonzeros': int(table.loc[table['Type'] == 'Constraint', 'Nonzeros'].sum()), 'Memory [MB]': Memory_Usage(),   # Terms of the expressions counted in the constraints that use them
+                  'Solver [s]': self.solver,
+                  'Components': json.loads(table.to_json(orient='records'))}
+        if path is not None:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w') as file:
+                json.dump(report, file, indent=1)
+
+        by_type = table.groupby('Type')[['Construction time [s]', 'Rows', 'Nonzeros']].sum()
+        print(table.head(top).to_string(float_format=lambda x: '%.3f' % x))
+        print(by_type.to_string(float_format=lambda x: '%.3f' % x))
+        print('Model_Profiler: construction', round(report['Construction time [s]'],2), 's,', report['Rows'], 'rows,', report['Columns'],
+              'columns,', report['Nonzeros'], 'nonzeros - solver write', round(self.solver['Write'],2), 's, solve', round(self.solver['Solve'],2),
+              's, load', round(self.solver['Load'],2), 's' + ('' if path is None else ' - report saved in ' + path))
+        return table
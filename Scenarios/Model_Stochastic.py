@@ -0,0 +1,239 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Scenario decomposition of the stochastic sizing (multi-cut L-shaped method): the dispatch of each scenario is
+solved in its own worker process with the size of the components fixed, and returns its net present cost with
+its sensitivity to the sizes; a master problem on the sizes only collects these cuts and proposes the next sizes
+within a box around the best ones found (trust region), until the lower and the upper bound of the net present
+cost meet. Each worker holds the model of one scenario,
+so the memory of a worker does not grow with the number of scenarios.
+Usage: python ../Model_Stochastic.py [--solver highs] [--processes 4] [--monolithic], from the folder of a configuration
+"""
+
+
+import os
+import sys
+import time
+import argparse
+import warnings
+import numpy as np
+from multiprocessing import Pool
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.getcwd())     # Modules of the configuration, in the working directory
+import Initialize
+from Model_Matrix import Matrix_Creation
+from Matrix_Backend import MatrixModel, Read_Data, Load_Profiles
+from Model_Decomposition import Matrix_Solvers, Sizing_Variables
+
+
+Size_Bound = 2          # Upper bound of the size of each component, as a multiple of the largest size of the scenarios solved alone
+Violation_Cost = 1e4    # Cost of a unit of violation of the constraints of a scenario that cannot be supplied, above their duals
+Master_Options = {'gurobi': 'Method=1', 'highs': 'solver=simplex'}     # Master problem by simplex, to get a vertex and not the centre of an optimal face
+
+
+#%% Scenario subproblems
+def Scenario_Profiles(profiles, s):
+    '''
+    This function returns the time series of one scenario, with the scenario index kept (of size 1).
+    :param profiles: Dictionary of the time series as returned by Load_Profiles.
+    :param s: Scenario (from 0).
+    '''
+    return {name: value[s:s+1] if isinstance(value, np.ndarray) and value.ndim > 1 else value for name, value in profiles.items()}
+
+
+def Expected_Profiles(profiles, Scenario_Weight):
+    '''
+    This function returns the time series of the expected scenario, the average of the scenarios with their weights,
+    with the scenario index kept (of size 1).
+    :param profiles: Dictionary of the time series as returned by Load_Profiles.
+    :param Scenario_Weight: Array of the weight of each scenario.
+    '''
+    return {name: np.tensordot(Scenario_Weight, value, 1)[None] if isinstance(value, np.ndarray) and value.ndim > 1 else value for name, value in profiles.items()}
+
+
+def Scenario_Dispatch(task):
+    '''
+    This function solves the model of one scenario, alone (sizes is None) or with the size of the components fixed.
+    When the scenario cannot be supplied with the given sizes (e.g. the heat of the solar collectors exceeds the
+    tank), it is solved again with the constraints that can be violated at Violation_Cost (each row scaled by its
+    largest coefficient): the net present cost with the violation paid is a lower bound of the one of the scenario,
+    and its derivative tells the master problem how to change the sizes, where a cut of the violation only
+    would cut off one point at a time.
+    :param task: Tuple (data, profiles, sizes, solver, options) of the scenario.
+    :return: True if the scenario is supplied with the sizes, size of the components, objective function (net
+             present cost, with the violation paid if not supplied), its derivative with respect to the sizes (in the
+             order of Sizing_Variables).
+    '''
+    data, profiles, sizes, solver, options = task
+    model = Matrix_Creation(data, profiles)
+    names = Sizing_Variables(model)
+    if sizes is None:
+        values, objective = model.Solve(solver, options, tee=False)
+        return True, {name: values[model.variables[name]] for name in names}, objective, None
+
+    for name in names:
+        model.Fix(name, sizes[name], '==')
+    supplied = True
+    values, objective, duals = model.Solve(solver, options, tee=False, duals=True)
+    if model.status != 'optimal':
+        supplied = False
+        scale = abs(model.Matrix()).max(axis=1).toarray().ravel()   # Violation of each row in units of its variables
+        for name, rows in list(model.constraints.items()):
+            if not name.startswith('Fixed_'):
+                model.Relax(name, Violation_Cost/np.maximum(scale[rows], 1e-12))
+        values, objective, duals = model.Solve(solver, options, tee=False, duals=True)
+        if model.status != 'optimal':
+            raise RuntimeError('Model_Stochastic: the dispatch of a scenario could not be solved (' + str(model.status) + ')')
+    gradient = np.concatenate([duals[model.constraints['Fixed_'+name].ravel()] for name in names])
+    return supplied, sizes, objective, gradient
+
+
+#%% Master problem
+def Master_Problem(Scenario_Weight, alone, lower, upper, cuts):
+    '''
+    This function creates the master problem: the sizes within their bounds and the net present cost of each
+    scenario, bounded from below by the cost of the scenario solved alone and by the cuts of the iterations,
+    Theta[s] >= objective[s] + gradient[s]*(Sizes - point).
+    :param Scenario_Weight: Array of the weight of each scenario.
+    :param alone: Array of the net present cost of each scenario solved alone.
+    :param lower: Array of the lower bound of each size.
+    :param upper: Array of the upper bound of each size.
+    :param cuts: List of (point, results) of each iteration, with the sizes where the scenarios have been solved
+                 and the results of Scenario_Dispatch of each scenario.
+    :return: The MatrixModel of the master problem.
+    '''
+    master = MatrixModel()
+    Sizes = master.Var('Sizes', len(upper))
+    Theta = master.Var('Theta', len(Scenario_Weight))
+    master.Objective([(Scenario_Weight, Theta)])
+    master.Fix('Sizes', lower, '>=', 'Lower_Sizes')
+    master.Fix('Sizes', upper, '<=', 'Upper_Sizes')
+    master.Fix('Theta', alone, '>=')
+    for iteration, (point, results) in enumerate(cuts):
+        objectives = np.array([result[2] for result in results])
+        gradients = np.array([result[3] for result in results])
+        master.Constraint('Cut_'+str(iteration), (len(results),), [(1, Theta), (-gradients.T, Sizes[:,None])], '>=', objectives - gradients.dot(point))
+    return master
+
+
+#%% Resolution
+def Stochastic_Resolution(datapath="Inputs/data.dat", iterations=50, tolerance=1e-3, radius=0.25, processes=None, solver=None, options=None, monolithic=False):
+    '''
+    This function sizes the system on all the scenarios by the L-shaped method with a trust region: the scenarios
+    and the expected scenario are first solved alone (the largest sizes are the first guess and bound the sizes, the
+    largest size of all the components for the ones not installed in any of them), then at each iteration the
+    dispatch of each scenario is solved in parallel with the sizes of the master problem, which gets a cut from each
+    scenario. The master problem looks for the next sizes in a box around the best sizes found so far (the centre),
+    which moves when the new sizes lower the cost enough and shrinks otherwise, and gives the lower bound of the net
+    present cost without the box. The iterations stop when the gap between the best net present cost of sizes that
+    supply all the scenarios (upper bound) and the lower bound is small; a warning is raised otherwise.
+    :param datapath: Path of the dat file with the parameters of the project.
+    :param iterations: Maximum number of iterations.
+    :param tolerance: Maximum gap between the upper and the lower bound, as a fraction of the upper bound.
+    :param radius: Half side of the first box, as a fraction of the largest size of the scenarios solved alone.
+    :param processes: Number of worker processes, all the cores if None.
+    :param solver: 'gurobi' or 'highs', the solver of the dat file if None.
+    :param options: Solver options as 'Name=value Name=value', Solver_Options if None.
+    :param monolithic: Solve also the model with all the scenarios in one piece, to report the gap of the decomposition.
+    :return: Net present cost of the best sizes, sizes of the components and net present cost of each scenario.
+    '''
+    start = time.time()
+    data = Read_Data(datapath)
+    if solver is None:
+        solver = data.get('Solver', 'gurobi')
+    if solver not in Matrix_Solvers:
+        raise ValueError('Model_Stochastic: solver ' + str(solver) + ' not available, choose among ' + ', '.join(Matrix_Solvers))
+    nS = data['Scenarios']
+    Scenario_Weight = np.array([data['Scenario_Weight'][s] for s in range(1,nS+1)])
+    profiles = Load_Profiles(data, Initialize)
+    scenario_data = dict(data, Scenarios=1, Scenario_Weight={1: 1})
+    scenarios = [Scenario_Profiles(profiles, s) for s in range(nS)]
+
+    with Pool(processes) as pool:
+        "Scenarios solved alone"
+        results = pool.map(Scenario_Dispatch, [(scenario_data, scenario, None, solver, options) for scenario in scenarios + [Expected_Profiles(profiles, Scenario_Weight)]])
+        names = list(results[0][1])
+        shapes = {name: np.shape(results[0][1][name]) for name in names}
+        alone = np.array([np.concatenate([np.ravel(result[1][name]) for name in names]) for result in results])
+        Alone_NPC = np.array([result[2] for result in results[:nS]])
+        scale = alone.max(axis=0)
+        if not scale.any():
+            raise RuntimeError('Model_Stochastic: no component installed in any scenario solved alone')
+        scale = np.where(scale > 0, scale, scale.max())     # Floor of the components not installed in any scenario, which may be in the stochastic sizing
+        upper_size = Size_Bound*scale
+        lower = Scenario_Weight.dot(Alone_NPC)
+        print('Model_Stochastic:', nS, 'scenarios solved alone - expected NPC', round(lower), 'USD (lower bound)')
+
+        "L-shaped iterations"
+        point, cuts = alone.max(axis=0), []
+        upper, best, gap = np.inf, None, np.inf
+        center, center_cost, predicted = None, np.inf, None
+        for iteration in range(1, iterations+1):
+            sizes, first = {}, 0
+            for name in names:
+                sizes[name] = point[first:first+int(np.prod(shapes[name]))].reshape(shapes[name])
+                first += sizes[name].size
+            results = pool.map(Scenario_Dispatch, [(scenario_data, scenario, sizes, solver, options) for scenario in scenarios])
+            cuts.append((point, results))
+            supplied = sum(result[0] for result in results)
+            objectives = np.array([result[2] for result in results])
+            cost = Scenario_Weight.dot(objectives)
+            if supplied == nS and cost < upper:
+                upper, best = cost, (sizes, objectives)
+
+            "Trust region"
+            if center is None or cost <= center_cost - 0.1*(center_cost-predicted):     # The cost fell by at least a tenth of the one expected by the master problem
+                if center is not None and cost <= center_cost - 0.5*(center_cost-predicted):
+                    radius = min(2*radius, Size_Bound)
+                center, center_cost = point, cost
+            else:
+                radius = radius/2
+
+            values, bound = Master_Problem(Scenario_Weight, Alone_NPC, np.zeros(len(scale)), upper_size, cuts).Solve(solver, Master_Options[solver], tee=False)
+            lower = max(lower, bound)
+            master = Master_Problem(Scenario_Weight, Alone_NPC, np.maximum(center-radius*scale, 0), np.minimum(center+radius*scale, upper_size), cuts)
+            values, predicted = master.Solve(solver, Master_Options[solver], tee=False)
+            point = np.clip(values[master.variables['Sizes']], 0, upper_size)
+            if best is not None:
+                gap = (upper-lower)/abs(upper)
+            print('Model_Stochastic: iteration', iteration, '-', nS-supplied, 'scenarios not supplied, upper bound', round(upper) if best is not None else None,
+                  'USD, lower bound', round(lower), 'USD, gap', round(100*gap,3), '%, box', round(100*radius,3), '% of the sizes')
+            if gap <= tolerance:
+                break
+
+    if best is None:
+        raise RuntimeError('Model_Stochastic: no sizes supply all the scenarios within the bounds of the sizes')
+    if gap > tolerance:
+        warnings.warn('Model_Stochastic: the gap ' + str(round(100*gap,3)) + ' % is still above the tolerance after ' + str(iterations) + ' iterations')
+    sizes, Net_Present_Cost = best
+    NPC = Scenario_Weight.dot(Net_Present_Cost)
+    print('Model_Stochastic: NPC of the stochastic sizing', round(NPC), 'USD, gap', round(100*gap,3), '%, solved in', round(time.time()-start,1), 's')
+
+    if monolithic:
+        start = time.time()
+        model = Matrix_Creation(data, profiles)
+        monolithic_NPC = model.Solve(solver, options, tee=False)[1]
+        print('Model_Stochastic: NPC of the monolithic model', round(monolithic_NPC), 'USD, solved in', round(time.time()-start,1), 's',
+              '- gap of the decomposition', round(100*(NPC-monolithic_NPC)/monolithic_NPC,3), '%')
+
+    return NPC, sizes, Net_Present_Cost
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--solver', default=None)
+    parser.add_argument('--processes', default=None, type=int)
+    parser.add_argument('--monolithic', action='store_true')     # Solve also all the scenarios in one piece to report the gap, with the memory of the whole model
+    arguments = parser.parse_args()
+    Stochastic_Resolution(processes=arguments.processes, solver=arguments.solver, monolithic=arguments.monolithic)
@@ -17,6 +17,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pylab
 import itertools
+from Results_Store import Store_Path, Read_TimeSeries, Read_Table
     
 import warnings
 warnings.filterwarnings("ignore")
@@ -59,22 +60,22 @@ for c in configurations:
     TimeSeries[c[0]]['Th'] = {}
 
     for s in range(1,nS+1):
-        TimeSeries[c[0]]['EE']['Sc'+str(s)] = pd.read_csv(c+'/Results/TimeSeries/Sc'+str(s)+'/EE_TimeSeries.csv', index_col=[0])
+        TimeSeries[c[0]]['EE']['Sc'+str(s)] = Read_TimeSeries('EE', s, start=PlotStartDate, end=PlotEndDate, store=c+'/'+Store_Path)
 
 
 #%% Configuration A
 
     if c == configurations[0]:    
         "Series preparation"
-        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
         x_Plot = np.arange(len(y_Genset))
         y_Stacked = [y_Genset,
                      y_LostLoad,
                      y_Curtailment]
                         
-        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
+        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
         
         Colors = ['#8d99ae',
                   '#f72585',
@@ -118,15 +119,15 @@ for c in configurations:
 
 #%% Configuration B        
     if c == configurations[1]:
-        BESSNominalCapacity = pd.read_excel(c+'/Results/EnergySystemSize.xlsx','Size',index_col=[0,1]).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
+        BESSNominalCapacity = Read_Table('Size', ['Total'], store=c+'/'+Store_Path).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
 
         "Series preparation"
-        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,4].values
-        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,5].values
-        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,6].values
-        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,4].values
+        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,5].values
+        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,6].values
+        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
         x_Plot = np.arange(len(y_Genset))
         
         deltaBESS_pos = y_BESS_out + y_BESS_in
@@ -144,8 +145,8 @@ for c in configurations:
                      y_LostLoad,
                      y_Curtailment]
     
-        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
-        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,-1].values/BESSNominalCapacity*100
+        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
+        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,-1].values/BESSNominalCapacity*100
         
         Colors = ['#ffbe0b',
                   '#3a86ff',
@@ -205,16 +206,16 @@ for c in configurations:
 
 #%% Configuration C
     if c == configurations[2]:
-        BESSNominalCapacity = pd.read_excel(c+'/Results/EnergySystemSize.xlsx','Size',index_col=[0,1]).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
+        BESSNominalCapacity = Read_Table('Size', ['Total'], store=c+'/'+Store_Path).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
     
         "Series preparation"
-        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,4].values
-        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,5].values
-        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,6].values
-        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,7].values
-        y_ElResCons   = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,4].values
+        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,5].values
+        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,6].values
+        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,7].values
+        y_ElResCons   = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
         x_Plot = np.arange(len(y_Genset))
         
         deltaBESS_pos = y_BESS_out + y_BESS_in
@@ -235,8 +236,8 @@ for c in configurations:
         y_Stacked_neg = [deltaBESS_neg,
                          y_ElResCons]
         
-        y_Demand = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
-        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,-1].values/BESSNominalCapacity*100
+        y_Demand = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
+        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,-1].values/BESSNominalCapacity*100
         
         Colors_pos = ['#ffbe0b',
                   '#3a86ff',
@@ -305,16 +306,16 @@ for c in configurations:
 
 #%% Configuration D
     if c == configurations[3]:
-        BESSNominalCapacity = pd.read_excel(c+'/Results/EnergySystemSize.xlsx','Size',index_col=[0,1]).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
+        BESSNominalCapacity = Read_Table('Size', ['Total'], store=c+'/'+Store_Path).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
     
         "Series preparation"
-        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,4].values
-        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,5].values
-        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,6].values
-        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,7].values
-        y_ElResCons   = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,4].values
+        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,5].values
+        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,6].values
+        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,7].values
+        y_ElResCons   = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
         x_Plot = np.arange(len(y_Genset))
         
         deltaBESS_pos = y_BESS_out + y_BESS_in
@@ -335,8 +336,8 @@ for c in configurations:
         y_Stacked_neg = [deltaBESS_neg,
                          y_ElResCons]
         
-        y_Demand = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
-        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,-1].values/BESSNominalCapacity*100
+        y_Demand = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
+        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,-1].values/BESSNominalCapacity*100
         
         Colors_pos = ['#ffbe0b',
                   '#3a86ff',
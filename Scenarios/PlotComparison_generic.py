@@ -17,6 +17,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 import pylab
 import itertools
+from Results_Store import Store_Path, Read_TimeSeries, Read_Table
     
 import warnings
 warnings.filterwarnings("ignore")
@@ -55,19 +56,19 @@ for c in configurations:
     TimeSeries[c[0]]['Th'] = {}
 
     for s in range(1,nS+1):
-        TimeSeries[c[0]]['EE']['Sc'+str(s)] = pd.read_csv(c+'/Results/TimeSeries/Sc'+str(s)+'/EE_TimeSeries.csv', index_col=[0])
+        TimeSeries[c[0]]['EE']['Sc'+str(s)] = Read_TimeSeries('EE', s, start=PlotStartDate, end=PlotEndDate, store=c+'/'+Store_Path)
     
     if c == configurations[0]:    
         "Series preparation"
-        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
         x_Plot = np.arange(len(y_Genset))
         y_Stacked = [y_Genset,
                      y_LostLoad,
                      y_Curtailment]
                         
-        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
+        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
         
         Colors = ['#8d99ae',
                   '#f72585',
@@ -109,15 +110,15 @@ for c in configurations:
         k+=1
         
     if c == configurations[1]:
-        BESSNominalCapacity = pd.read_excel(c+'/Results/EnergySystemSize.xlsx','Size',index_col=[0,1]).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
+        BESSNominalCapacity = Read_Table('Size', ['Total'], store=c+'/'+Store_Path).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
 
         "Series preparation"
-        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,4].values
-        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,5].values
-        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,6].values
-        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,4].values
+        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,5].values
+        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,6].values
+        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
         x_Plot = np.arange(len(y_Genset))
         
         deltaBESS_pos = y_BESS_out + y_BESS_in
@@ -135,8 +136,8 @@ for c in configurations:
                      y_LostLoad,
                      y_Curtailment]
     
-        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
-        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,-1].values/BESSNominalCapacity*100
+        y_Demand   = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
+        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,-1].values/BESSNominalCapacity*100
         
         Colors = ['#ffbe0b',
                   '#3a86ff',
@@ -195,16 +196,16 @@ for c in configurations:
         k+=1
     
     if c == configurations[2] or c == configurations[3]:
-        BESSNominalCapacity = pd.read_excel(c+'/Results/EnergySystemSize.xlsx','Size',index_col=[0,1]).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
+        BESSNominalCapacity = Read_Table('Size', ['Total'], store=c+'/'+Store_Path).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
     
         "Series preparation"
-        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,4].values
-        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,5].values
-        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,6].values
-        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,7].values
-        y_ElResCons   = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+        y_RES         = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,4].values
+        y_BESS_out    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,5].values
+        y_BESS_in     = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,6].values
+        y_Genset      = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,7].values
+        y_ElResCons   = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+        y_LostLoad    = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
         x_Plot = np.arange(len(y_Genset))
         
         deltaBESS_pos = y_BESS_out + y_BESS_in
@@ -222,8 +223,8 @@ for c in configurations:
                      y_LostLoad,
                      y_Curtailment]
     
-        y_Demand = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
-        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,-1].values/BESSNominalCapacity*100
+        y_Demand = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
+        y_BESS_SOC = TimeSeries[c[0]]['EE']['Sc'+str(PlotScenario)].iloc[:,-1].values/BESSNominalCapacity*100
         
         Colors = ['#ffbe0b',
                   '#3a86ff',
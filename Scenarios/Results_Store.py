@@ -0,0 +1,151 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Store of the results of a run in compressed columnar (Parquet) files: the time series in a single table with a
+column for each carrier/scenario/class/variable and a row group for each day, so that a plot reads only the columns
+and the days it needs, and the size, cost and indicators of the energy system in a table each. The results of the runs before the store
+(EnergySystemSize.xlsx and the csv files of the time series, in the folder of the results that contains the store)
+are read when the store has not been written.
+"""
+
+
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+Store_Path = 'Results/Store'            # Folder of the store, relative to the folder of the configuration
+Time_Series = 'TimeSeries.parquet'
+Tables = ['Size', 'Cost', 'Indicators']
+Compression = 'zstd'
+Legacy_Tables = 'EnergySystemSize.xlsx'         # Results before the store, in the folder of the results (e.g. 'Results - Battery10')
+Legacy_Levels = {'Size': 2, 'Cost': 4, 'Indicators': 2}    # Columns of the index of each sheet
+
+
+def Series_Name(carrier, scenario, variable, c=None):
+    '''
+    This function returns the name of the column of a time series in the store, e.g. 'Th/Sc1/Class2/Demand'.
+    :param carrier: 'EE' or 'Th'.
+    :param scenario: Number of the scenario (from 1).
+    :param variable: Name of the variable, as in the columns of the DataFrames of Results.TimeSeries.
+    :param c: Number of the class (from 1), None for the electricity.
+    '''
+    return '/'.join([carrier, 'Sc'+str(scenario)] + ([] if c is None else ['Class'+str(c)]) + [variable])
+
+
+#%% Export
+def Write_TimeSeries(TimeSeries, day_periods, store=Store_Path):
+    '''
+    This function writes the time series of a run in the store, one row group for each day.
+    :param TimeSeries: Dictionary {'EE': {scenario: DataFrame}, 'Th': {scenario: {class: DataFrame}}} as returned by Results.TimeSeries.
+    :param day_periods: Number of periods in a day.
+    :param store: Folder of the store.
+    '''
+    columns = {}
+    for scenario, frame in TimeSeries['EE'].items():
+        columns['Date'] = frame.index.values
+        for variable in frame:
+            columns['EE/'+scenario+'/'+variable] = frame[variable].values
+    for scenario, classes in TimeSeries['Th'].items():
+        for c, frame in classes.items():
+            for variable in frame:
+                columns['Th/'+scenario+'/'+c+'/'+variable] = frame[variable].values
+
+    os.makedirs(store, exist_ok=True)
+    pq.write_table(pa.table(columns), os.path.join(store, Time_Series), row_group_size=int(day_periods), compression=Compression)
+
+
+def Write_Tables(tables, store=Store_Path):
+    '''
+    This function writes the tables of the energy system in the store, with the '-' of the cells without a value as NaN.
+    :param tables: Dictionary {name: DataFrame}, with the names in Tables.
+    :param store: Folder of the store.
+    '''
+    os.makedirs(store, exist_ok=True)
+    for name, table in tables.items():
+        table = table.apply(pd.to_numeric, errors='coerce')
+        table.columns = table.columns.astype(str)
+        table.to_parquet(os.path.join(store, name+'.parquet'), compression=Compression)
+
+
+#%% Import
+def Legacy_Path(store, *names):
+    '''
+    This function returns the path of a file of the results before the store, in the folder that contains the store.
+    :param store: Folder of the store.
+    :param names: Path of the file, relative to the folder of the results.
+    '''
+    return os.path.join(os.path.dirname(os.path.normpath(store)), *names)
+
+
+def Read_TimeSeries(carrier, scenario, c=None, variables=None, start=0, end=None, store=Store_Path):
+    '''
+    This function reads from the store some time series of a scenario (and class) over a range of periods, reading
+    only their columns and the days that contain the periods.
+    :param carrier: 'EE' or 'Th'.
+    :param scenario: Number of the scenario (from 1).
+    :param c: Number of the class (from 1), None for the electricity.
+    :param variables: List of the names of the variables, all the variables of the scenario (and class) if None.
+    :param start: First period (from 0).
+    :param end: Period after the last one, the end of the year if None.
+    :param store: Folder of the store, read from the csv files of the time series if it has not been written.
+    :return: DataFrame with the dates as index and the variables as columns.
+    '''
+    if not os.path.exists(os.path.join(store, Time_Series)):
+        path = Legacy_Path(store, 'TimeSeries', 'Sc'+str(scenario), 'EE_TimeSeries.csv' if c is None else 'Th_TimeSeries_Class'+str(c)+'.csv')
+        if not os.path.exists(path):
+            raise FileNotFoundError('Results_Store: neither ' + os.path.join(store, Time_Series) + ' nor ' + path + ' found')
+        table = pd.read_csv(path, index_col=0, parse_dates=True, usecols=None if variables is None else lambda name: name in variables or name.startswith('Unnamed'))
+        table.index.name = 'Date'
+        return table.iloc[start:end]
+
+    file = pq.ParquetFile(os.path.join(store, Time_Series))
+    prefix = Series_Name(carrier, scenario, '', c)
+    if variables is None:
+        names = [name for name in file.schema_arrow.names if name.startswith(prefix)]
+    else:
+        names = [prefix+variable for variable in variables]
+
+    rows = file.metadata.num_rows
+    end = rows if end is None else min(end, rows)
+    group_rows = file.metadata.row_group(0).num_rows
+    groups = list(range(start//group_rows, (end-1)//group_rows+1)) if end > start else []
+    first = groups[0]*group_rows if groups else 0
+
+    table = file.read_row_groups(groups, columns=['Date']+names).to_pandas().set_index('Date')
+    table = table.iloc[start-first:end-first]
+    table.columns = [name[len(prefix):] for name in names]
+    return table
+
+
+def Read_Table(name, columns=None, store=Store_Path):
+    '''
+    This function reads from the store a table of the energy system.
+    :param name: 'Size', 'Cost' or 'Indicators'.
+    :param columns: List of the columns to read, all the columns if None.
+    :param store: Folder of the store, read from the sheet of EnergySystemSize.xlsx if it has not been written.
+    :return: DataFrame with the index of the table of Results.EnergySystemInfo.
+    '''
+    if os.path.exists(os.path.join(store, name+'.parquet')):
+        return pd.read_parquet(os.path.join(store, name+'.parquet'), columns=columns)
+
+    path = Legacy_Path(store, Legacy_Tables)
+    if not os.path.exists(path):
+        raise FileNotFoundError('Results_Store: neither ' + os.path.join(store, name+'.parquet') + ' nor ' + path + ' found')
+    table = pd.read_excel(path, name, header=0)
+    levels = list(table.columns[:Legacy_Levels[name]])
+    table[levels[0]] = table[levels[0]].ffill()     # Cells merged over the rows of the same item
+    table = table.set_index(levels).rename_axis([None if str(level).startswith('Unnamed') else level for level in levels])
+    table = table.apply(pd.to_numeric, errors='coerce')     # '-' of the cells without a value as NaN, as in the store
+    return table if columns is None else table[columns]
@@ -0,0 +1,118 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Runs the configurations in parallel, each one with Micro_Energy_System in a separate process with the folder of the
+configuration as working directory, and collects their sizing, cost and indicators from the store of the results of
+each configuration in Results_comparison_run.xlsx (Results_comparison.xlsx holds the results of the paper).
+Usage: python Run_Configurations.py [configurations] --solver highs --processes 4
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import pandas as pd
+from multiprocessing.pool import ThreadPool
+
+from Results_Store import Store_Path, Tables, Read_Table
+
+
+configurations = ['a_Traditional-Energy-System',
+                  'b_Conventional-MicroGrid',
+                  'c_Multi-Good-MicroGrid',
+                  'd_Multi-Energy-System']
+
+Thread_Variables = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS']  # Threads of the numerical libraries in each process
+
+Scenarios_Path = os.path.dirname(os.path.abspath(__file__))
+
+
+def Run_Configuration(task):
+    '''
+    This function runs Micro_Energy_System in the folder of a configuration without the plots, with the log written
+    in Results/Run.log. The configuration is solved if the run has exited without errors and has written the tables of the store.
+    :param task: Tuple (configuration, solver, threads).
+    :return: True if the configuration has been solved.
+    '''
+    configuration, solver, threads = task
+    path = os.path.join(Scenarios_Path, configuration)
+    command = [sys.executable, 'Micro_Energy_System.py', '--plotMode', 'Off', '--skipPlots', '--threads', str(threads)]
+    if solver is not None:
+        command += ['--solver', solver]
+    environment = dict(os.environ, **dict.fromkeys(Thread_Variables, str(threads)))
+
+    start = time.time()
+    os.makedirs(os.path.join(path, 'Results'), exist_ok=True)
+    with open(os.path.join(path, 'Results', 'Run.log'), 'w') as log:
+        process = subprocess.run(command, cwd=path, env=environment, stdout=log, stderr=subprocess.STDOUT)
+    tables = [os.path.join(path, Store_Path, name+'.parquet') for name in Tables]
+    solved = process.returncode == 0 and all(os.path.exists(table) and os.path.getmtime(table) >= start for table in tables)
+    status = 'solved' if solved else 'failed'
+    if process.returncode != 0:
+        status += ' (exit code ' + str(process.returncode) + ', see Results/Run.log)'
+    print('Run_Configurations:', configuration, status, 'in', round(time.time()-start), 's')
+    return solved
+
+
+def Collect_Results(configurations=configurations, store='Results_comparison_run.xlsx'):
+    '''
+    This function collects the total size, cost and indicators of the configurations in a single file, with one
+    column for each configuration (A, B, C, D).
+    :param configurations: Folders of the configurations.
+    :param store: Path of the Excel file of the comparison, relative to the Scenarios folder.
+    :return: Dictionary {sheet: DataFrame}.
+    '''
+    results = {}
+    for sheet in Tables:
+        results[sheet] = pd.concat({c[0].upper(): Read_Table(sheet, ['Total'], store=os.path.join(Scenarios_Path, c, Store_Path))['Total']
+                                    for c in configurations}, axis=1)
+    with pd.ExcelWriter(os.path.join(Scenarios_Path, store)) as writer:
+        for sheet, table in results.items():
+            table.to_excel(writer, sheet_name=sheet)
+    print('Run_Configurations: results of', len(configurations), 'configurations collected in', store)
+    return results
+
+
+def Run_Configurations(configurations=configurations, solver=None, processes=None, store='Results_comparison_run.xlsx'):
+    '''
+    This function solves the configurations in parallel processes, sharing the cores among them so that the
+    threads of the solvers do not exceed the cores, and collects their results.
+    :param configurations: Folders of the configurations.
+    :param solver: 'gurobi', 'highs', 'cbc' or 'glpk', the solver of the dat file of each configuration if None.
+    :param processes: Number of configurations solved at the same time, all of them (up to the number of cores) if None.
+    :param store: Path of the Excel file of the comparison, relative to the Scenarios folder.
+    :return: Dictionary {sheet: DataFrame} of the configurations solved.
+    '''
+    cores = os.cpu_count()
+    processes = max(1, min(processes or len(configurations), len(configurations), cores))
+    threads = max(1, cores//processes)
+    print('Run_Configurations:', len(configurations), 'configurations,', processes, 'at the same time with', threads, 'threads each')
+
+    with ThreadPool(processes) as pool:
+        solved = pool.map(Run_Configuration, [(c, solver, threads) for c in configurations])
+
+    solved = [c for c, success in zip(configurations, solved) if success]
+    if not solved:
+        raise RuntimeError('Run_Configurations: no configuration solved')
+    return Collect_Results(solved, store)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('configurations', nargs='*', default=configurations)
+    parser.add_argument('--solver', default=None)
+    parser.add_argument('--processes', default=None, type=int)
+    parser.add_argument('--store', default='Results_comparison_run.xlsx')
+    arguments = parser.parse_args()
+    Run_Configurations(arguments.configurations, arguments.solver, arguments.processes, arguments.store)
@@ -0,0 +1,189 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Telemetry of the solver: the log of each resolution is parsed into a record (presolve reductions, barrier
+iterations with the primal and dual residuals, crossover, final gap and termination) appended to a json lines
+file next to the results, so that the options of the solvers can be compared across runs and the stalls of the
+barrier found without reading the logs again.
+Usage: python ../Solver_Telemetry.py, from the folder of a configuration (table of its recorded resolutions)
+"""
+
+
+import os
+import re
+import json
+import time
+import pandas as pd
+
+
+Telemetry_Log = 'Results/Solver_Telemetry.jsonl'     # One record for each resolution
+
+Number = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+
+Log_Patterns = {     # Regular expressions of the log of each solver (the iteration lines: iteration, primal and dual objective, primal and dual residual, gap or complementarity, time)
+    'gurobi': {'presolve':   r'Presolve removed (\d+) rows and (\d+) columns',
+               'presolved':  r'Presolved: (\d+) rows, (\d+) columns, (\d+) nonzeros',
+               'iteration':  r'^\s*(\d+)\*?\s+({0})\s+({0})\s+({0})\s+({0})\s+({0})\s+(\d+)s\s*$'.format(Number),
+               'crossover':  r'^(Crossover log\.\.\.|Push phase complete)',
+               'termination': r'^(Optimal objective|Infeasible model|Unbounded model|Infeasible or unbounded model|Iteration limit reached|Time limit reached|Numerical trouble encountered|Sub-optimal termination).*$'},
+    'highs':  {'presolve':   r'Presolve reductions: rows (\d+)\(-(\d+)\); columns (\d+)\(-(\d+)\); nonzeros (\d+)\(-(\d+)\)',
+               'iteration':  r'^\s*(\d+)\*?\s+({0})\s+({0})\s+({0})\s+({0})\s+({0})\s+({0})\s*$'.format(Number),
+               'crossover':  r'Status crossover:\s+(.+?)\s*$',
+               'gap':        r'objective gap \(abs/rel\):\s+\S+ / ({0})'.format(Number),
+               'termination': r'Model status\s+:\s+(.+?)\s*$'},
+    'cbc':    {'termination': r'^Result - (.+?)\s*$'},
+    'glpk':   {'termination': r'^(OPTIMAL .*|PROBLEM HAS NO .*|EXCEEDED .*|TIME LIMIT .*)$'}}
+
+Iteration_Columns = ['Iteration', 'Primal objective', 'Dual objective', 'Primal residual', 'Dual residual', 'Gap', 'Time [s]']
+
+
+def Parse_Log(solver, text):
+    '''
+    This function parses the log of a resolution into the telemetry of the solver.
+    :param solver: 'gurobi', 'highs', 'cbc' or 'glpk'.
+    :param text: Text of the log.
+    :return: Dictionary with the presolve reductions, the barrier iterations (one dictionary per iteration with
+             Iteration_Columns), the status of the crossover, the final gap and the termination in the log.
+    '''
+    patterns = Log_Patterns.get(solver, {})
+    telemetry = {'Presolve': {}, 'Iterations': [], 'Crossover': None, 'Gap': None, 'Termination': None}
+
+    if 'presolve' in patterns:
+        found = re.findall(patterns['presolve'], text)
+        if found and solver == 'highs':
+            rows, removed_rows, columns, removed_columns, nonzeros, removed_nonzeros = map(int, found[-1])
+            telemetry['Presolve'] = {'Rows removed': removed_rows, 'Columns removed': removed_columns, 'Nonzeros removed': removed_nonzeros,
+                                     'Rows': rows, 'Columns': columns, 'Nonzeros': nonzeros}
+        elif found:
+            telemetry['Presolve'] = {'Rows removed': int(found[-1][0]), 'Columns removed': int(found[-1][1])}
+    if 'presolved' in patterns:
+        found = re.findall(patterns['presolved'], text)
+        if found:
+            telemetry['Presolve'].update(zip(['Rows', 'Columns', 'Nonzeros'], map(int, found[-1])))
+
+    if 'iteration' in patterns:
+        for line in re.findall(patterns['iteration'], text, re.MULTILINE):
+            telemetry['Iterations'].append(dict(zip(Iteration_Columns, [int(line[0])] + [float(value) for value in line[1:]])))
+        if solver == 'gurobi':    # The barrier log of Gurobi has the complementarity in place of the relative gap
+            for iteration in telemetry['Iterations']:
+                iteration['Gap'] = abs(iteration['Primal objective']-iteration['Dual objective'])/(1+abs(iteration['Primal objective']))
+
+    if 'crossover' in patterns:
+        found = re.findall(patterns['crossover'], text, re.MULTILINE)
+        telemetry['Crossover'] = found[-1] if solver == 'highs' and found else ('run' if found else 'not run')
+    if 'gap' in patterns and re.findall(patterns['gap'], text):
+        telemetry['Gap'] = float(re.findall(patterns['gap'], text)[-1])
+    elif telemetry['Iterations']:
+        telemetry['Gap'] = telemetry['Iterations'][-1]['Gap']
+    if 'termination' in patterns:
+        found = re.findall(patterns['termination'], text, re.MULTILINE)
+        telemetry['Termination'] = found[-1] if found else None
+    return telemetry
+
+
+def Barrier_Stalls(iterations, window=10, factor=0.5):
+    '''
+    This function finds the stalls of the barrier: the iterations where neither the residuals nor the gap have
+    decreased below a fraction of their value some iterations before.
+    :param iterations: List of the barrier iterations as returned by Parse_Log.
+    :param window: Number of iterations compared.
+    :param factor: Fraction of the previous value the residuals or the gap should have gone below.
+    :return: List of the iterations in a stall.
+    '''
+    stalls = []
+    for now, before in zip(iterations[window:], iterations):
+        compared = [now[name] > factor*before[name] for name in ('Primal residual', 'Dual residual', 'Gap') if before[name] > 0]
+        if compared and all(compared):     # Not a stall when all the quantities were already zero
+            stalls.append(now['Iteration'])
+    return stalls
+
+
+def Telemetry_Record(solver, options, text, wall_time, objective, status):
+    '''
+    This function returns the record of the telemetry of a resolution.
+    :param solver: 'gurobi', 'highs', 'cbc' or 'glpk'.
+    :param options: Dictionary of the options of the solver.
+    :param text: Text of the log of the solver.
+    :param wall_time: Wall time of the resolution in s.
+    :param objective: Value of the objective function.
+    :param status: Termination condition returned by the solver interface.
+    '''
+    telemetry = Parse_Log(solver, text)
+    return dict({'Date': time.strftime('%Y-%m-%d %H:%M:%S'), 'Solver': solver, 'Options': {name: str(value) for name, value in options.items()},
+                 'Wall time [s]': round(wall_time, 3), 'Objective [USD]': objective, 'Status': status},
+                **telemetry, Stalls=Barrier_Stalls(telemetry['Iterations']))
+
+
+def Barrier_Iterations(record):
+    '''
+    This function returns the number of barrier iterations of a record (the last one, counted from 0).
+    '''
+    return record['Iterations'][-1]['Iteration'] if record['Iterations'] else 0
+
+
+def Save_Telemetry(record, path=Telemetry_Log):
+    '''
+    This function appends the record of a resolution to the telemetry file and prints its summary.
+    :param path: Path of the json lines file.
+    '''
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as file:
+        file.write(json.dumps(record) + '\n')
+    presolve, summary = record['Presolve'], []     # Only the fields found in the log (e.g. no barrier iterations in a simplex log)
+    if 'Rows removed' in presolve:
+        summary.append('presolve removed ' + str(presolve['Rows removed']) + ' rows and ' + str(presolve['Columns removed']) + ' columns')
+    if record['Iterations']:
+        summary.append(str(Barrier_Iterations(record)) + ' barrier iterations, ' + str(len(record['Stalls'])) + ' in a stall')
+    if record['Gap'] is not None:
+        summary.append('gap ' + str(record['Gap']))
+    if record['Iterations'] or record['Crossover'] not in (None, 'not run'):
+        summary.append('crossover ' + record['Crossover'])
+    if record['Termination'] is not None:
+        summary.append('termination ' + record['Termination'])
+    print('Solver_Telemetry:', ' - '.join(summary + ['saved in ' + path]))
+
+
+def Read_Telemetry(path=Telemetry_Log):
+    '''
+    This function reads the records of the telemetry file.
+    :return: List of the records, the oldest first.
+    '''
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def Telemetry_Table(path=Telemetry_Log):
+    '''
+    This function returns the summary of the recorded resolutions, to compare the options of the solvers.
+    :return: DataFrame with one row for each resolution and one column for each option.
+    '''
+    rows = []
+    for record in Read_Telemetry(path):
+        row = {name: record[name] for name in ('Date', 'Solver', 'Wall time [s]', 'Objective [USD]', 'Status', 'Termination', 'Crossover', 'Gap')}
+        row.update({'Iterations': Barrier_Iterations(record), 'Stalled iterations': len(record['Stalls']),
+                    'Presolve rows removed': record['Presolve'].get('Rows removed')})
+        row.update(record['Options'])
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def Iteration_Table(record):
+    '''
+    This function returns the barrier iterations of a record, to plot the residuals over time.
+    :return: DataFrame with one row for each iteration and Iteration_Columns.
+    '''
+    return pd.DataFrame(record['Iterations'], columns=Iteration_Columns).set_index('Iteration')
+
+
+if __name__ == '__main__':
+    print(Telemetry_Table().to_string())
@@ -0,0 +1,211 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Solvers of the optimization: the same profile (barrier without crossover, 1e-4 tolerances, 1000 iterations)
+written with the options of each solver, and the record of the performance of each resolution.
+"""
+
+
+import os
+import re
+import time
+import tempfile
+import pandas as pd
+
+from Solver_Telemetry import Telemetry_Log, Telemetry_Record, Save_Telemetry
+
+
+Solver_Profiles = {
+    'gurobi': {'factory': 'gurobi',
+               'options': {'Method': 2, 'Crossover': 0, 'BarConvTol': 1e-4, 'OptimalityTol': 1e-4, 'FeasibilityTol': 1e-4, 'IterationLimit': 1000},
+               'iterations': r'in (\d+) iterations'},
+    'highs':  {'factory': 'appsi_highs',
+               'options': {'solver': 'ipm', 'run_crossover': 'off', 'ipm_optimality_tolerance': 1e-4, 'optimality_tolerance': 1e-4,
+                           'primal_feasibility_tolerance': 1e-4, 'dual_feasibility_tolerance': 1e-4, 'ipm_iteration_limit': 1000},
+               'iterations': r'(?:IPM|Simplex)\s+iterations:\s*(\d+)'},
+    'cbc':    {'factory': 'cbc',
+               'options': {'crossover': 'off', 'primalTolerance': 1e-4, 'dualTolerance': 1e-4, 'maxIterations': 1000, 'barrier': ''},
+               'iterations': r'^\s*(\d+) Primal \S+ Dual \S+ Complementarity|Iters:\s*(\d+)|(\d+) iterations'},   # Barrier, simplex (and older versions of CBC)
+    'glpk':   {'factory': 'glpk',
+               'options': {'interior': ''},      # glpsol has no options for the tolerances and the iterations of the interior point method
+               'iterations': r'^\s*(\d+): obj'}}
+
+Sweep_Profiles = {     # Persistent interfaces for the warm sweeps: the first point by barrier with crossover, to get a basis,
+                       # the next ones by dual simplex from the basis of the previous point
+    'gurobi': {'factory': 'appsi_gurobi',
+               'options': [{'Method': 2, 'BarConvTol': 1e-4, 'OptimalityTol': 1e-4, 'FeasibilityTol': 1e-4},
+                           {'Method': 1, 'OptimalityTol': 1e-4, 'FeasibilityTol': 1e-4}]},
+    'highs':  {'factory': 'appsi_highs',
+               'options': [{'solver': 'ipm', 'run_crossover': 'on', 'ipm_optimality_tolerance': 1e-4, 'primal_feasibility_tolerance': 1e-4,
+                            'dual_feasibility_tolerance': 1e-4},
+                           {'solver': 'simplex', 'simplex_strategy': 1, 'primal_feasibility_tolerance': 1e-4, 'dual_feasibility_tolerance': 1e-4}]}}
+
+Thread_Options = {'gurobi': 'Threads', 'highs': 'threads', 'cbc': 'threads'}   # glpsol runs on a single thread
+
+Log_Options = {'gurobi': 'LogFile', 'highs': 'log_file'}   # The persistent interfaces of Pyomo write the log through an option of the solver
+
+Solver_Table = 'Results/Solver_Performance.csv'     # Record of the resolutions with each solver
+
+
+def Thread_Limit(solver, options, threads=None):
+    '''
+    This function adds the number of threads of the solver to its options.
+    :param solver: 'gurobi', 'highs', 'cbc' or 'glpk'.
+    :param options: Dictionary of the options of the solver.
+    :param threads: Number of threads, the default of the solver if None.
+    :return: Dictionary of the options of the solver with the threads.
+    '''
+    if threads is None or solver not in Thread_Options:
+        return options
+    return dict(options, **{Thread_Options[solver]: threads})
+
+
+def Solver_Options(solver, threads=None):
+    '''
+    This function returns the options of a solver as a string 'Name=value Name=value', for the solver APIs.
+    :param solver: 'gurobi', 'highs', 'cbc' or 'glpk'.
+    :param threads: Number of threads of the solver, the default of the solver if None.
+    '''
+    return ' '.join(name+'='+str(value) for name, value in Thread_Limit(solver, Solver_Profiles[solver]['options'], threads).items())
+
+
+def Solver_Iterations(solver, logfile):
+    '''
+    This function reads the number of iterations from the log of a solver, with the pattern of its profile (the
+    alternatives of a pattern each have their own group).
+    :param solver: 'gurobi', 'highs', 'cbc' or 'glpk'.
+    :param logfile: Path of the log of the solver.
+    :return: Number of iterations of the last resolution in the log, None if not found.
+    '''
+    try:
+        with open(logfile) as log:
+            iterations = [match.group(match.lastindex) for match in re.finditer(Solver_Profiles[solver]['iterations'], log.read(), re.MULTILINE)]
+    except OSError:
+        return None
+    return int(iterations[-1]) if iterations else None
+
+
+def Results_Iterations(results):
+    '''
+    This function reads the number of iterations from the results of a solver, for the logs without them.
+    :param results: Results of the solver, as returned by the solve of Pyomo.
+    :return: Number of iterations, None if the interface of the solver does not report them.
+    '''
+    try:
+        iterations = results.solver.statistics.black_box.number_of_iterations
+    except AttributeError:
+        return None
+    return int(iterations) if isinstance(iterations, (int, float)) else None
+
+
+def Solver_Record(solver, wall_time, iterations, objective, status, table=Solver_Table):
+    '''
+    This function adds the performance of a resolution to the table of the solvers.
+    :param table: Path of the csv file of the table, None to skip the record.
+    :return: The row added to the table.
+    '''
+    row = pd.DataFrame([[time.strftime('%Y-%m-%d %H:%M:%S'), solver, round(wall_time,2), iterations, objective, status]],
+                       columns=['Date', 'Solver', 'Wall time [s]', 'Iterations', 'Objective [USD]', 'Status'])
+    if table is not None:
+        os.makedirs(os.path.dirname(table) or '.', exist_ok=True)
+        row.to_csv(table, mode='a', header=not os.path.exists(table), index=False)
+    return row
+
+
+Warm_Periods = 30*1440     # Largest number of periods optimized for which the sweeps are warm started
+
+
+def Persistent_Solver(solver, warm=True, periods=None):
+    '''
+    This function creates the persistent interface of a solver, which keeps the model of the solver between two
+    resolutions of the same instance and updates only the coefficients of the mutable parameters changed.
+    The next resolutions start from the basis of the previous one (warm) or are solved again from scratch with the
+    profile of the solver (cold). With HiGHS the warm dual simplex is faster on short horizons (1.3 s against 7.6 s
+    per point on two days of configuration b) but slower on the year-long model at the minute (72.9 s against 29 s),
+    where it needs too many iterations: the sweeps are warm unless the model has more than Warm_Periods periods.
+    :param solver: 'gurobi' or 'highs'.
+    :param warm: Start the next resolutions from the basis of the previous one, if the model is not too big.
+    :param periods: Number of periods optimized, the sweep is cold above Warm_Periods (None to skip the check).
+    :return: The persistent solver and the options of the first and of the next resolutions.
+    '''
+    from pyomo.environ import SolverFactory
+
+    if solver not in Sweep_Profiles:
+        raise ValueError('Solvers: no persistent interface for the solver ' + str(solver) + ', choose among ' + ', '.join(Sweep_Profiles))
+    if warm and periods is not None and periods > Warm_Periods:
+        print('Solvers:', periods, 'periods optimized, more than', Warm_Periods, '- each point of the sweep solved from scratch')
+        warm = False
+    if not warm:
+        return SolverFactory(Sweep_Profiles[solver]['factory']), [Solver_Profiles[solver]['options']]*2
+    return SolverFactory(Sweep_Profiles[solver]['factory']), Sweep_Profiles[solver]['options']
+
+
+def Solve_Instance(instance, solver='gurobi', tee=True, table=Solver_Table, opt=None, options=None, threads=None, profiler=None, telemetry=Telemetry_Log):
+    '''
+    This function solves a Pyomo instance with the profile of the given solver and records its performance.
+    :param instance: Pyomo instance as created in Model_Resolution.
+    :param solver: 'gurobi', 'highs', 'cbc' or 'glpk'.
+    :param tee: Print the solver log.
+    :param table: Path of the csv file of the table of the solvers, None to skip the record.
+    :param opt: Solver already created (e.g. by Persistent_Solver), a new one with the profile of the solver if None.
+    :param options: Options of the solver, the ones of the profile if None.
+    :param threads: Number of threads of the solver, the default of the solver if None.
+    :param profiler: Build_Profiler (see Model_Profiler) that records the time to write, solve and load back the model, None to skip it.
+    :param telemetry: Path of the telemetry file where the log of the solver is recorded (see Solver_Telemetry), None to skip it.
+    :return: The results of the solver and the row of its performance.
+    '''
+    from pyomo.environ import SolverFactory, value
+    from pyomo.contrib.appsi.base import PersistentSolver
+
+    if solver not in Solver_Profiles:
+        raise ValueError('Solvers: solver ' + str(solver) + ' not available, choose among ' + ', '.join(Solver_Profiles))
+    profile = Solver_Profiles[solver]
+    if opt is None:
+        opt = SolverFactory(profile['factory'])
+    if options is None:
+        options = profile['options']
+    options = Thread_Limit(solver, options, threads)
+    if profiler is not None:
+        opt = profiler.Solver_Phases(opt)
+    logfd, logfile = tempfile.mkstemp(suffix='.log')
+    os.close(logfd)
+
+    start = time.time()
+    try:
+        if isinstance(opt, PersistentSolver):
+            results = opt.solve(instance, tee=tee, options=dict(options, **{Log_Options[solver]: logfile}))
+        else:
+            results = opt.solve(instance, tee=tee, options=options, logfile=logfile)
+        wall_time = time.time()-start
+        iterations = Solver_Iterations(solver, logfile)
+        with open(logfile) as log:
+            text = log.read()
+    finally:
+        os.remove(logfile)
+
+    "Loading solution into instance"
+    start = time.time()
+    if len(results.solution) > 0:
+        instance.solutions.load_from(results)
+    if profiler is not None:
+        profiler.Solver_Time(load=time.time()-start)
+
+    if iterations is None:
+        iterations = Results_Iterations(results)
+    status = str(results.solver.termination_condition)
+    objective = value(instance.ObjectiveFuntion)
+    row = Solver_Record(solver, wall_time, iterations, objective, status, table)
+    print('Solvers:', solver, '-', status, 'in', round(wall_time,1), 's,', iterations, 'iterations')
+    if telemetry is not None:
+        Save_Telemetry(Telemetry_Record(solver, options, text, wall_time, objective, status), telemetry)
+    return results, row
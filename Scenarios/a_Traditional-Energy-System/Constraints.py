@@ -51,28 +51,16 @@ def Variable_Costs(model,s):
     return model.Variable_Costs[s] == model.Scenario_Lost_Load_Cost_EE[s] + model.Total_Diesel_Cost[s] + sum(model.Scenario_Lost_Load_Cost_Th[s,c] + model.Total_NG_Cost[s,c] for c in model.classes)
                                                                                       
 def Scenario_Lost_Load_Cost_EE(model,s):
-    foo=[]
-    for f in range(1,model.Periods+1):
-        foo.append((s,f))
-    return  model.Scenario_Lost_Load_Cost_EE[s] == sum(((sum(model.Lost_Load_EE[s,t]*model.EE_Value_Of_Lost_Load/60 for s,t in foo))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years) 
+    return  model.Scenario_Lost_Load_Cost_EE[s] == sum(model.Lost_Load_EE[s,t]*model.Period_Weight[t] for t in model.periods)*model.EE_Value_Of_Lost_Load*model.Delta_Time*model.Discount_Factor
 
 def Total_Diesel_Cost(model,s):
-    foo=[]
-    for f in range(1,model.Periods+1):
-        foo.append((s,f))
-    return model.Total_Diesel_Cost[s] == sum(((sum(model.Diesel_Consumption[s,t]*model.Diesel_Unitary_Cost for s,t in foo))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years) 
+    return model.Total_Diesel_Cost[s] == sum(model.Diesel_Consumption[s,t]*model.Period_Weight[t] for t in model.periods)*model.Diesel_Unitary_Cost*model.Discount_Factor
     
 def Scenario_Lost_Load_Cost_Th(model,s,c):
-    foo=[] 
-    for f in range(1,model.Periods+1):
-        foo.append((s,f))
-    return  model.Scenario_Lost_Load_Cost_Th[s,c] == sum(((sum(model.Lost_Load_Th[s,c,t]*model.Th_Value_Of_Lost_Load/60 for s,t in foo))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years) 
+    return  model.Scenario_Lost_Load_Cost_Th[s,c] == sum(model.Lost_Load_Th[s,c,t]*model.Period_Weight[t] for t in model.periods)*model.Th_Value_Of_Lost_Load*model.Delta_Time*model.Discount_Factor
        
 def Total_NG_Cost(model,s,c):
-    foo=[] 
-    for f in range(1,model.Periods+1):
-        foo.append((s,f))
-    return  model.Total_NG_Cost[s,c] == sum(((sum(model.NG_Consumption[s,c,t]*model.NG_Unitary_Cost for s,t in foo))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years)
+    return  model.Total_NG_Cost[s,c] == sum(model.NG_Consumption[s,c,t]*model.Period_Weight[t] for t in model.periods)*model.NG_Unitary_Cost*model.Discount_Factor
 
 
 
@@ -85,12 +73,15 @@ def Electric_Energy_Balance(model,s,t):
 def Maximum_Generator_Energy(model,s,t):
     return model.Generator_Energy_Production[s,t] <= model.Generator_Nominal_Capacity
 
-def Diesel_Consumption(model,s,t): 
-    return model.Diesel_Consumption[s,t] == model.Generator_Energy_Production[s,t]/model.Generator_Efficiency/model.Lower_Heating_Value/60
+def Diesel_Consumption_Expression(model,s,t):
+    return model.Generator_Energy_Production[s,t]/model.Generator_Efficiency/model.Lower_Heating_Value*model.Delta_Time
+
+def Diesel_Consumption(model,s,t):
+    return model.Diesel_Consumption[s,t] == Diesel_Consumption_Expression(model,s,t)
 
 "Lost Load constraints"
 def Maximum_Lost_Load_EE(model,s):
-    return model.EE_Lost_Load_Tolerance*sum(model.Electric_Energy_Demand[s,t] for t in model.periods) >= sum(model.Lost_Load_EE[s,t] for t in model.periods)
+    return model.EE_Lost_Load_Tolerance*sum(model.Electric_Energy_Demand[s,t]*model.Period_Weight[t] for t in model.periods) >= sum(model.Lost_Load_EE[s,t]*model.Period_Weight[t] for t in model.periods)
 
 
 #%% Thermal energy generation system constraints
@@ -102,11 +93,14 @@ def Thermal_Energy_Balance(model,s,c,t):
 def Maximum_Boiler_Energy(model,s,c,t):   
     return model.Boiler_Energy_Production[s,c,t] <= model.Boiler_Nominal_Capacity[c]
 
+def NG_Consumption_Expression(model,s,c,t):
+    return model.Boiler_Energy_Production[s,c,t]/model.Boiler_Efficiency/model.Lower_Heating_Value_NG*model.Delta_Time
+
 def NG_Consumption(model,s,c,t):
-    return model.NG_Consumption[s,c,t] == model.Boiler_Energy_Production[s,c,t]/model.Boiler_Efficiency/model.Lower_Heating_Value_NG/60
+    return model.NG_Consumption[s,c,t] == NG_Consumption_Expression(model,s,c,t)
 
 "Lost load constraints"
 def Maximum_Lost_Load_Th(model,s,c):
-    return model.Th_Lost_Load_Tolerance*sum(model.Thermal_Energy_Demand[s,c,t] for t in model.periods) >= sum(model.Lost_Load_Th[s,c,t] for t in model.periods)
+    return model.Th_Lost_Load_Tolerance*sum(model.Thermal_Energy_Demand[s,c,t]*model.Period_Weight[t] for t in model.periods) >= sum(model.Lost_Load_Th[s,c,t]*model.Period_Weight[t] for t in model.periods)
 
 
@@ -6,30 +6,22 @@ Created on Sat Jul  4 12:47:22 2020
 """
 
 
-import pandas as pd
-import numpy as np
+import os
+import sys
 
-EE_demand = pd.DataFrame()
-TH_demand = pd.DataFrame()
+Inputs_Path = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(Inputs_Path, '..', '..'))    # Modules shared by the configurations, in the Scenarios folder
+from Input_Store import Assemble_Profile
 
 min_december = 1440*31
- 
-#%% Concatenating from December to November 
-for i in range(1,5):
-    EE_demand = pd.concat([EE_demand, pd.read_csv("RAMP/output_file_"+str(i)+".csv",header=0,index_col=0)], axis=0, ignore_index=True)   
-for i in range(5,9):
-    TH_demand = pd.concat([TH_demand, pd.read_csv("RAMP/output_file_"+str(i)+".csv",header=0,index_col=0)], axis=1, ignore_index=True)
-   
-#%% Appending December as last month and dropping from first position  
-EE_demand = pd.concat([EE_demand, EE_demand.iloc[0:min_december,:]], axis=0, ignore_index=True)
-EE_demand = EE_demand.drop(EE_demand.index[0:min_december])
-TH_demand = pd.concat([TH_demand, TH_demand.iloc[0:min_december,:]], axis=0, ignore_index=True)
-TH_demand = TH_demand.drop(TH_demand.index[0:min_december])
 
-#%% Reindexing from 1 to 525600 
-EE_demand.index = np.arange(1,EE_demand.shape[0]+1)
-TH_demand.index = np.arange(1,TH_demand.shape[0]+1)
+Profiles = {'Electric_Demand.csv': ([os.path.join(Inputs_Path, 'RAMP', 'output_file_'+str(i)+'.csv') for i in range(1,5)], 0),
+            'Thermal_Demand.csv':  ([os.path.join(Inputs_Path, 'RAMP', 'output_file_'+str(i)+'.csv') for i in range(5,9)], 1)}
 
-#%% Exporting
-EE_demand.to_csv('Electric_Demand.csv')
-TH_demand.to_csv('Thermal_Demand.csv')
+#%% Streaming the RAMP profiles (from December to November) into the year, with December moved to the end
+for csvfile, (sources, axis) in Profiles.items():
+    missing = [os.path.basename(source) for source in sources if not os.path.exists(source)]
+    if missing:
+        print('loadHandle:', csvfile, 'not written, missing RAMP profiles', ', '.join(missing))
+        continue
+    Assemble_Profile(os.path.join(Inputs_Path, csvfile), sources, axis=axis, rotation=min_december)
@@ -13,16 +13,41 @@ Authors:
 """
 
 
-from pyomo.environ import  Param, RangeSet, NonNegativeReals, Var
+from pyomo.environ import  Param, RangeSet, NonNegativeReals, Var, Expression
 
-from Initialize import Initialize_years, Initialize_Electric_Energy_Demand, Initialize_Thermal_Energy_Demand, Initialize_RES_Energy # Import library with initialitation funtions for the parameters
+from Initialize import Initialize_Day_Periods, Initialize_Delta_Time, Initialize_Model_Periods, Initialize_Period_Weight, Initialize_years, Initialize_Discount_Factor, Initialize_Electric_Energy_Demand, Initialize_Thermal_Energy_Demand, Initialize_RES_Energy # Import library with initialitation funtions for the parameters
+from Constraints import RES_Energy_Production_Expression, Diesel_Consumption_Expression, NG_Consumption_Expression  # Definitions of the variables replaced by expressions in the compact formulation
 
 
-def Model_Creation(model):
+def Defined_Variable(compact, rule, *sets):
+    '''
+    This function declares a variable that is defined by an equality with other variables (e.g. the fuel consumption
+    from the energy production): a variable of the linear program with its equality constraint, or in the compact
+    formulation an expression of the other variables, computed after the resolution.
+    :param compact: Compact formulation.
+    :param rule: Rule of the expression that defines the variable, as in Constraints.
+    :param sets: Sets indexing the variable.
+    '''
+    if compact:
+        return Expression(*sets, rule=rule)
+    return Var(*sets, within=NonNegativeReals)
+
+
+def Model_Creation(model, compact=False):
+    '''
+    This function creates the instance for the resolution of the optimization in Pyomo.
+    :param model: Pyomo model as defined in the Micro-Grids library
+    :param compact: Compact formulation, with the variables defined by an equality with other variables (e.g. the
+                    fuel consumption) replaced by expressions.
+    '''
+    model.Compact = compact     # Read by Model_Instance, which does not add the equalities of the variables replaced
     
     "Time parameters"
-    model.Periods = Param(within=NonNegativeReals)  # Number of periods per year of analysis of the energy variables
+    model.Periods = Param(within=NonNegativeReals)  # Number of minutes per year of analysis of the energy variables
     model.Years = Param()                           # Number of years of the project
+    model.Representative_Days = Param(default=0)    # Number of representative days optimized in place of all the periods of the year (0 to optimize all of them)
+    model.Time_Resolution = Param(default=1)        # Time step of the model in minutes, the time series are resampled at this resolution
+    model.Day_Periods = Param(initialize=Initialize_Day_Periods) # Number of periods in a day
    
     "Configuration parameters"
     model.Scenarios = Param()                       # Number of scenarios
@@ -35,9 +60,11 @@ def Model_Creation(model):
     model.PlotEndDate = Param()                     # End date for the plot    
     model.PlotScenario = Param()                    # Scenario for the plot
     model.PlotResolution = Param()                  # Plot resolution in dpi
+    model.Solver = Param(default='gurobi')          # Solver of the optimization: 'gurobi', 'highs', 'cbc' or 'glpk'
         
     "SETS"
-    model.periods = RangeSet(1, model.Periods)      # Creation of a set from 1 to the number of periods in each year
+    model.Model_Periods = Param(initialize=Initialize_Model_Periods) # Number of periods optimized, all the periods of the year or the ones of the representative days
+    model.periods = RangeSet(1, model.Model_Periods) # Creation of a set from 1 to the number of periods optimized in each year
     model.years = RangeSet(1, model.Years)          # Creation of a set from 1 to the number of years of the project
     model.scenario = RangeSet(1, model.Scenarios)   # Creation of a set from 1 to the numbero scenarios to analized
     model.classes = RangeSet(1, model.Classes)      # Creation of a set from 1 to the number of classes of the thermal part
@@ -65,14 +92,14 @@ def Model_Creation(model):
     "Parameters of the diesel generator"
     model.Generator_Efficiency = Param()        # Generator electric efficiency in %
     model.Lower_Heating_Value  = Param()        # Lower heating value of the diesel in Wh/L
-    model.Diesel_Unitary_Cost  = Param(within=NonNegativeReals)        # Cost of diesel in USD/L
+    model.Diesel_Unitary_Cost  = Param(within=NonNegativeReals, mutable=True) # Cost of diesel in USD/L
     model.Generator_Inv_Specific_Cost = Param(within=NonNegativeReals) # Investment cost of the diesel generator in USD/W
     model.Generator_OM_Specific_Cost  = Param(within=NonNegativeReals) # % of the total investment spent in operation and management of diesel generator in each period
     
     "Parameters of the boilers"
     model.Boiler_Efficiency = Param()          # Boiler efficiency in %
     model.Lower_Heating_Value_NG = Param()     # Lower heating value of the natural gas in Wh/L
-    model.NG_Unitary_Cost = Param(within=NonNegativeReals)        # Cost of natural gas in USD/L
+    model.NG_Unitary_Cost = Param(within=NonNegativeReals, mutable=True)        # Cost of natural gas in USD/L
     model.Boiler_Inv_Specific_Cost = Param(within=NonNegativeReals) # Investment cost of the NG Boiler in USD/W
     model.Boiler_OM_Specific_Cost = Param (within=NonNegativeReals) # % of the total investment spent in operation and management of boiler in each period
     
@@ -86,17 +113,19 @@ def Model_Creation(model):
     model.Th_Value_Of_Lost_Load = Param(within=NonNegativeReals)       # Value of lost load in USD/Wh
     
     "Parameters of the project"
-    model.Delta_Time = Param(within=NonNegativeReals)                           # Time step in hours
+    model.Delta_Time = Param(within=NonNegativeReals, initialize=Initialize_Delta_Time) # Time step in hours
     model.Project_Years = Param(model.years, initialize= Initialize_years)      # Years of the project
-    model.Discount_Rate = Param()                                               # Discount rate of the project in %
+    model.Discount_Rate = Param(mutable=True)                                   # Discount rate of the project in %
+    model.Discount_Factor = Param(within=NonNegativeReals, initialize=Initialize_Discount_Factor, mutable=True) # Sum of the discount factors of the project years
     model.Scenario_Weight = Param(model.scenario, within=NonNegativeReals)      # Probability of occurrance of each scenario
+    model.Period_Weight = Param(model.periods, within=NonNegativeReals, initialize=Initialize_Period_Weight) # Number of days of the year represented by each period
 
     
     #%% System variables
 
     "Variables associated to the RES"
     model.RES_Units = Var(within=NonNegativeReals)                                            # Number of units of RES
-    model.RES_Energy_Production = Var(model.scenario,model.periods, within=NonNegativeReals)  # Total energy generated for the RES system in Wh
+    model.RES_Energy_Production = Defined_Variable(compact, RES_Energy_Production_Expression, model.scenario,model.periods)  # Total energy generated for the RES system in Wh
     model.RES_Investment_Cost = Var(within=NonNegativeReals)                                  # Total investment cost of the RES in USD    
     model.RES_OM_Cost = Var(within=NonNegativeReals)                                          # Total fixed OM cost of the RES in USD    
 
@@ -115,7 +144,7 @@ def Model_Creation(model):
     model.Generator_Nominal_Capacity = Var(within=NonNegativeReals)                          # Capacity of the diesel generator in Wh
     model.Generator_Investment_Cost = Var(within=NonNegativeReals)                           # Total investment cost of the diesel generator in USD    
     model.Generator_OM_Cost = Var(within=NonNegativeReals)                                   # Total fixed OM cost of the diesel generator in USD    
-    model.Diesel_Consumption = Var(model.scenario,model.periods, within=NonNegativeReals)    # Diesel consumed to produce electric energy in L
+    model.Diesel_Consumption = Defined_Variable(compact, Diesel_Consumption_Expression, model.scenario,model.periods)    # Diesel consumed to produce electric energy in L
     model.Generator_Energy_Production = Var(model.scenario, model.periods, within=NonNegativeReals)     # Total Energy production from the Diesel generator
     model.Total_Diesel_Cost = Var(model.scenario, within=NonNegativeReals)
     
@@ -123,7 +152,7 @@ def Model_Creation(model):
     model.Boiler_Nominal_Capacity = Var(model.classes, within=NonNegativeReals)                     # Capacity of the boiler in Wh
     model.Boiler_Investment_Cost = Var(model.classes, within=NonNegativeReals)                      # Total investment cost of the boiler in USD
     model.Boiler_OM_Cost = Var(model.classes, within=NonNegativeReals)                      # Total fixed OM cost of the boiler in USD
-    model.NG_Consumption = Var(model.scenario, model.classes, model.periods,within=NonNegativeReals) # Natural Gas consumed to produce thermal energy in Kg (considering Liquified Natural Gas)
+    model.NG_Consumption = Defined_Variable(compact, NG_Consumption_Expression, model.scenario, model.classes, model.periods) # Natural Gas consumed to produce thermal energy in Kg (considering Liquified Natural Gas)
     model.Boiler_Energy_Production = Var(model.scenario, model.classes, model.periods, within=NonNegativeReals) # Energy generated by the boiler 
     model.Total_NG_Cost = Var(model.scenario, model.classes, within=NonNegativeReals) 
     
@@ -141,4 +170,11 @@ def Model_Creation(model):
     model.Fixed_Costs = Var(within=NonNegativeReals)
     model.Variable_Costs = Var(model.scenario, within=NonNegativeReals)
     
+    if compact:
+        "The expressions are moved after the variables that define them, as the components are constructed in order"
+        for expression in list(model.component_objects(Expression, descend_into=False)):
+            name = expression.local_name
+            model.del_component(expression)
+            model.add_component(name, expression)
+    
     
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Alternative to Model_Creation and Model_Resolution: the same linear program is assembled directly as a sparse
+matrix with NumPy/SciPy and passed to the solver API, without building the Pyomo instance. The sparse matrix, the
+resolution and the parity check with the Pyomo backend are in Matrix_Backend, shared by the configurations.
+Usage: python Model_Matrix.py (parity check on one day)
+"""
+
+
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))    # Modules shared by the configurations, in the Scenarios folder
+import Initialize
+from Matrix_Backend import MatrixModel, Matrix_Check
+
+
+#%% Model
+def Matrix_Creation(data, profiles):
+    '''
+    This function builds the linear program of Model_Creation and Model_Resolution as a sparse matrix.
+    :param data: Dictionary of the parameters as returned by Read_Data.
+    :param profiles: Dictionary of the time series as returned by Load_Profiles.
+    :return: The MatrixModel of the energy system.
+    '''
+    nP, nS, nC, nY = profiles['Model_Periods'], data['Scenarios'], data['Classes'], data['Years']
+    Discount_Factor = sum(1/((1+data['Discount_Rate'])**y) for y in range(1,nY+1))
+    Scenario_Weight = np.array([data['Scenario_Weight'][s] for s in range(1,nS+1)])
+    W = profiles['Period_Weight']
+    Delta_Time = profiles['Delta_Time']
+    Previous = np.arange(nP)-1
+    Previous[::profiles['Day_Periods']] += profiles['Day_Periods']   # with representative days, the previous period of the first one of a day is the last one of the same day
+    EE_Demand = profiles['Electric_Energy_Demand']
+    Th_Demand = profiles['Thermal_Energy_Demand']
+
+    model = MatrixModel()
+
+    #%% System variables
+
+    "Variables associated to the RES"
+    RES_Units = model.Var('RES_Units')
+    RES_Energy_Production = model.Var('RES_Energy_Production', nS, nP)
+    RES_Investment_Cost = model.Var('RES_Investment_Cost')
+    RES_OM_Cost = model.Var('RES_OM_Cost')
+
+    "Variables associated to the battery bank"
+    BESS_Nominal_Capacity = model.Var('BESS_Nominal_Capacity')
+    BESS_Outflow = model.Var('BESS_Outflow', nS, nP)
+    BESS_Inflow = model.Var('BESS_Inflow', nS, nP)
+    BESS_State_of_Charge = model.Var('BESS_State_of_Charge', nS, nP)
+    Maximum_BESS_Charge_Power = model.Var('Maximum_BESS_Charge_Power')
+    Maximum_BESS_Discharge_Power = model.Var('Maximum_BESS_Discharge_Power')
+    BESS_Investment_Cost = model.Var('BESS_Investment_Cost')
+    BESS_OM_Cost = model.Var('BESS_OM_Cost')
+    BESS_Replacement_Cost = model.Var('BESS_Replacement_Cost')
+
+    "Variables associated to the diesel generator"
+    Generator_Nominal_Capacity = model.Var('Generator_Nominal_Capacity')
+    Generator_Investment_Cost = model.Var('Generator_Investment_Cost')
+    Generator_OM_Cost = model.Var('Generator_OM_Cost')
+    Diesel_Consumption = model.Var('Diesel_Consumption', nS, nP)
+    Generator_Energy_Production = model.Var('Generator_Energy_Production', nS, nP)
+    Total_Diesel_Cost = model.Var('Total_Diesel_Cost', nS)
+
+    "Variables associated to the boilers"
+    Boiler_Nominal_Capacity = model.Var('Boiler_Nominal_Capacity', nC)
+    Boiler_Investment_Cost = model.Var('Boiler_Investment_Cost', nC)
+    Boiler_OM_Cost = model.Var('Boiler_OM_Cost', nC)
+    NG_Consumption = model.Var('NG_Consumption', nS, nC, nP)
+    Boiler_Energy_Production = model.Var('Boiler_Energy_Production', nS, nC, nP)
+    Total_NG_Cost = model.Var('Total_NG_Cost', nS, nC)
+
+    "Varialbles associated to the energy balance"
+    Lost_Load_EE = model.Var('Lost_Load_EE', nS, nP)
+    Lost_Load_Th = model.Var('Lost_Load_Th', nS, nC, nP)
+    Electric_Curtailment = model.Var('Electric_Curtailment', nS, nP)
+    Scenario_Lost_Load_Cost_EE = model.Var('Scenario_Lost_Load_Cost_EE', nS)
+    Scenario_Lost_Load_Cost_Th = model.Var('Scenario_Lost_Load_Cost_Th', nS, nC)
+    Thermal_Energy_Curtailment = model.Var('Thermal_Energy_Curtailment', nS, nC, nP)
+
+    "Variables associated to the project"
+    Scenario_Net_Present_Cost = model.Var('Scenario_Net_Present_Cost', nS)
+    Total_Investment_Cost = model.Var('Total_Investment_Cost')
+    Fixed_Costs = model.Var('Fixed_Costs')
+    Variable_Costs = model.Var('Variable_Costs', nS)
+
+    #%% Economic constraints
+
+    "Objective function"
+    model.Objective([(Scenario_Weight, Scenario_Net_Present_Cost)])
+
+    model.Constraint('ScenarioNetPresentCost', (nS,), [(1, Scenario_Net_Present_Cost), (-1, Total_Investment_Cost), (-1, Fixed_Costs), (-1, Variable_Costs)], '==')
+
+    "Investment cost"
+    model.Constraint('TotalInvestmentCost', (), [(1, Total_Investment_Cost), (-1, RES_Investment_Cost), (-1, BESS_Investment_Cost), (-1, Generator_Investment_Cost), (-1, Boiler_Investment_Cost)], '==')
+    model.Constraint('RESInvestmentCost', (), [(1, RES_Investment_Cost), (-data['RES_Nominal_Capacity']*data['RES_Inv_Specific_Cost'], RES_Units)], '==')
+    model.Constraint('BESSInvestmentCost', (), [(1, BESS_Investment_Cost), (-data['BESS_Inv_Specific_Cost'], BESS_Nominal_Capacity)], '==')
+    model.Constraint('GeneratorInvestmentCost', (), [(1, Generator_Investment_Cost), (-data['Generator_Inv_Specific_Cost'], Generator_Nominal_Capacity)], '==')
+    model.Constraint('BoilerInvestmentCost', (nC,), [(1, Boiler_Investment_Cost), (-data['Boiler_Inv_Specific_Cost'], Boiler_Nominal_Capacity)], '==')
+
+    "Fixed costs"
+    model.Constraint('FixedCosts', (), [(1, Fixed_Costs), (-1, RES_OM_Cost), (-1, BESS_OM_Cost), (-1, Generator_OM_Cost), (-1, Boiler_OM_Cost)], '==')
+    model.Constraint('RESOMCost', (), [(1, RES_OM_Cost), (-data['RES_OM_Specific_Cost']*Discount_Factor, RES_Investment_Cost)], '==')
+    model.Constraint('BESSOMCost', (), [(1, BESS_OM_Cost), (-data['BESS_OM_Specific_Cost']*Discount_Factor, BESS_Investment_Cost)], '==')
+    model.Constraint('BESSReplacementCost', (), [(1, BESS_Replacement_Cost), (-1/((1+data['Discount_Rate'])**data['BESS_Replacement_Time']), BESS_Investment_Cost)], '==')
+    model.Constraint('GeneratorOMCost', (), [(1, Generator_OM_Cost), (-data['Generator_OM_Specific_Cost']*Discount_Factor, Generator_Investment_Cost)], '==')
+    model.Constraint('BoilerOMCost', (nC,), [(1, Boiler_OM_Cost), (-data['Boiler_OM_Specific_Cost']*Discount_Factor, Boiler_Investment_Cost)], '==')
+
+    "Variable costs"
+    model.Constraint('VariableCosts', (nS,), [(1, Variable_Costs), (-1, Scenario_Lost_Load_Cost_EE), (-1, Total_Diesel_Cost),
+                                              (-1, Scenario_Lost_Load_Cost_Th.T), (-1, Total_NG_Cost.T)], '==')
+    model.Constraint('ScenarioLostLoadCostEE', (nS,), [(1, Scenario_Lost_Load_Cost_EE), (-data['EE_Value_Of_Lost_Load']*Delta_Time*Discount_Factor*W[:,None], Lost_Load_EE.T)], '==')
+    model.Constraint('TotalDieselCost', (nS,), [(1, Total_Diesel_Cost), (-data['Diesel_Unitary_Cost']*Discount_Factor*W[:,None], Diesel_Consumption.T)], '==')
+    model.Constraint('ScenarioLostLoadCostTh', (nS,nC), [(1, Scenario_Lost_Load_Cost_Th), (-data['Th_Value_Of_Lost_Load']*Delta_Time*Discount_Factor*W[:,None,None], np.moveaxis(Lost_Load_Th, -1, 0))], '==')
+    model.Constraint('TotalNGCost', (nS,nC), [(1, Total_NG_Cost), (-data['NG_Unitary_Cost']*Discount_Factor*W[:,None,None], np.moveaxis(NG_Consumption, -1, 0))], '==')
+
+    #%% Electricity generation system constraints
+
+    model.Constraint('ElectricEnergyBalance', (nS,nP), [(1, RES_Energy_Production), (-1, BESS_Inflow), (1, BESS_Outflow), (1, Generator_Energy_Production), (1, Lost_Load_EE),
+                                                         (-1, Electric_Curtailment)], '==', EE_Demand)
+
+    "Renewable Energy Sources constraints"
+    model.Constraint('RESEnergyProduction', (nS,nP), [(1, RES_Energy_Production), (-profiles['RES_Unit_Energy_Production']*data['RES_Inverter_Efficiency'], RES_Units)], '==')
+
+    "Battery Energy Storage constraints"
+    if data.get('Representative_Days', 0) != 0:
+        BESS_Previous_Charge = [(-1, BESS_State_of_Charge[:,Previous])]
+    else:
+        BESS_Previous_Charge = [(-1, BESS_Nominal_Capacity, np.s_[:,:1]), (-1, BESS_State_of_Charge[:,:-1], np.s_[:,1:])]
+    BESS_Initial_Charge = np.zeros((nS,nP))
+    if 'BESS_Initial_Charge' in profiles:   # Window of a decomposed run, starting from the state of charge handed over by the previous window
+        BESS_Previous_Charge = [(-1, BESS_State_of_Charge[:,:-1], np.s_[:,1:])]
+        BESS_Initial_Charge[:,0] = profiles['BESS_Initial_Charge']
+    model.Constraint('BESSStateOfCharge', (nS,nP), [(1, BESS_State_of_Charge)] + BESS_Previous_Charge + [
+                                                     (Delta_Time/data['BESS_Discharge_Efficiency'], BESS_Outflow), (-Delta_Time*data['BESS_Charge_Efficiency'], BESS_Inflow)], '==', BESS_Initial_Charge)
+    model.Constraint('MaximumBESSCharge', (nS,nP), [(1, BESS_State_of_Charge), (-1, BESS_Nominal_Capacity)], '<=')
+    model.Constraint('MinimumBESSCharge', (nS,nP), [(1, BESS_State_of_Charge), (-data['BESS_Depth_of_Discharge'], BESS_Nominal_Capacity)], '>=')
+    model.Constraint('MaxPowerBESSCharge', (), [(1, Maximum_BESS_Charge_Power), (-1/data['BESS_Maximum_Charge_Time'], BESS_Nominal_Capacity)], '==')
+    model.Constraint('MaxPowerBESSDischarge', (), [(1, Maximum_BESS_Discharge_Power), (-1/data['BESS_Maximum_Discharge_Time'], BESS_Nominal_Capacity)], '==')
+    model.Constraint('MaxBESSInflow', (nS,nP), [(1, BESS_Inflow), (-1, Maximum_BESS_Charge_Power)], '<=')
+    model.Constraint('Max_BESS_Outflow', (nS,nP), [(1, BESS_Outflow), (-1, Maximum_BESS_Discharge_Power)], '<=')
+
+    "Diesel generator constraints"
+    model.Constraint('MaximumGeneratorEnergy', (nS,nP), [(1, Generator_Energy_Production), (-1, Generator_Nominal_Capacity)], '<=')
+    model.Constraint('DieselConsumption', (nS,nP), [(1, Diesel_Consumption), (-1/data['Generator_Efficiency']/data['Lower_Heating_Value']*Delta_Time, Generator_Energy_Production)], '==')
+
+    "Lost Load constraints"
+    model.Constraint('MaximumLostLoadEE', (nS,), [(W[:,None], Lost_Load_EE.T)], '<=', data['EE_Lost_Load_Tolerance']*EE_Demand.dot(W))
+
+    #%% Thermal energy generation system constraints
+
+    model.Constraint('ThermalEnergyBalance', (nS,nC,nP), [(1, Boiler_Energy_Production), (-1, Thermal_Energy_Curtailment), (1, Lost_Load_Th)], '==', Th_Demand)
+
+    "Boiler constraints"
+    model.Constraint('MaximumBoilerEnergy', (nS,nC,nP), [(1, Boiler_Energy_Production), (-1, Boiler_Nominal_Capacity[:,None])], '<=')
+    model.Constraint('NGConsumption', (nS,nC,nP), [(1, NG_Consumption), (-1/data['Boiler_Efficiency']/data['Lower_Heating_Value_NG']*Delta_Time, Boiler_Energy_Production)], '==')
+
+    "Lost load constraints"
+    model.Constraint('MaximumLostLoadTh', (nS,nC), [(W[:,None,None], np.moveaxis(Lost_Load_Th, -1, 0))], '<=', data['Th_Lost_Load_Tolerance']*Th_Demand.dot(W))
+
+    return model
+
+
+if __name__ == '__main__':
+    Matrix_Check()
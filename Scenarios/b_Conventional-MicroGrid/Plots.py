@@ -12,11 +12,15 @@ Authors:
                         San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
 """
 
+import os
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import pylab
 import itertools
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))    # Modules shared by the configurations, in the Scenarios folder
+from Input_Store import Load_Frame
 
 import warnings
 warnings.filterwarnings("ignore")
@@ -25,13 +29,12 @@ warnings.filterwarnings("ignore")
 #%% Electric load
 def ElectricLoadCurves(instance):
 
-    Electric_Energy_Demand = pd.read_csv('Inputs/Electric_Demand.csv', sep=';', index_col=0) # Import electricity demand
-    Electric_Energy_Demand = Electric_Energy_Demand.round(3)
+    Electric_Energy_Demand = Load_Frame('Inputs/Electric_Demand.csv') # Import electricity demand
 
     StartDate = instance.StartDate.extract_values()[None]    
     PlotResolution = instance.PlotResolution.extract_values()[None]    
     
-    Electric_Energy_Demand.index = pd.DatetimeIndex(start=StartDate, periods=525600, freq='1min')
+    Electric_Energy_Demand.index = pd.date_range(start=StartDate, periods=len(Electric_Energy_Demand), freq='1min')
     
     StartDatePlot = ['12/21/2017 00:00:00','03/21/2017 00:00:00','06/21/2017 00:00:00','09/23/2017 00:00:00'] # MM/DD/YY
     EndDatePlot   = ['12/21/2017 23:59:59','03/21/2017 23:59:59','06/21/2017 23:59:59','09/23/2017 23:59:59']
@@ -72,13 +75,12 @@ def ElectricLoadCurves(instance):
 #%% Thermal loads
 def ThermalLoadCurves(instance):
 
-    Thermal_Energy_Demand = pd.read_csv('Inputs/Thermal_Demand.csv', sep=';',  index_col=0) # Import thermal energy demand
-    Thermal_Energy_Demand = Thermal_Energy_Demand.round(3)
+    Thermal_Energy_Demand = Load_Frame('Inputs/Thermal_Demand.csv') # Import thermal energy demand
     
     StartDate = instance.StartDate.extract_values()[None]    
     PlotResolution = instance.PlotResolution.extract_values()[None]    
 
-    Thermal_Energy_Demand.index = pd.DatetimeIndex(start=StartDate, periods=525600, freq='1min')
+    Thermal_Energy_Demand.index = pd.date_range(start=StartDate, periods=len(Thermal_Energy_Demand), freq='1min')
     
     StartDatePlot = ['12/23/2017 00:00:00','03/23/2017 00:00:00','06/23/2017 00:00:00','09/23/2017 00:00:00'] # MM/DD/YY
     EndDatePlot   = ['12/23/2017 23:59:59','03/23/2017 23:59:59','06/23/2017 23:59:59','09/23/2017 23:59:59']
@@ -146,6 +148,7 @@ def ElectricDispatch(instance,TimeSeries):
     PlotStartDate = instance.PlotStartDate.extract_values()[None]    
     PlotEndDate   = instance.PlotEndDate.extract_values()[None]    
     PlotResolution = instance.PlotResolution.extract_values()[None]    
+    DayPeriods = instance.Day_Periods.extract_values()[None]
     BESSNominalCapacity = instance.BESS_Nominal_Capacity.get_values()[None]
     
     "Series preparation"
@@ -202,12 +205,12 @@ def ElectricDispatch(instance,TimeSeries):
     ax2.set_ylabel('State of Charge (%)', fontsize=14)
 
     "x axis"
-    nDays = int(len(x_Plot)/1440)    
+    nDays = int(len(x_Plot)/DayPeriods)    
     xticks_position = []
     ticks = []
     for i in range(1,nDays+1):
         ticks = [d*6 for d in range(nDays*4+1)]
-        xticks_position = [d*6*60 for d in range(nDays*4+1)]
+        xticks_position = [d*DayPeriods//4 for d in range(nDays*4+1)]
             
     ax.set_xticks(xticks_position)
     ax.set_xticklabels(ticks, fontsize=14)    
@@ -243,6 +246,7 @@ def ThermalDispatch(instance,TimeSeries):
     PlotStartDate = instance.PlotStartDate.extract_values()[None]    
     PlotEndDate   = instance.PlotEndDate.extract_values()[None]    
     PlotResolution = instance.PlotResolution.extract_values()[None]    
+    DayPeriods = instance.Day_Periods.extract_values()[None]
     nC = instance.Classes.extract_values()[None]
     
     fig,axs = plt.subplots(2,2,figsize=(20,20))
@@ -287,12 +291,12 @@ def ThermalDispatch(instance,TimeSeries):
             axs[n_row[c-1],n_col[c-1]].set_xlabel('Time (Hours)', fontsize=14)
     
         "x axis"
-        nDays = int(len(x_Plot)/1440)    
+        nDays = int(len(x_Plot)/DayPeriods)    
         ticks_position = []
         ticks = []
         for i in range(1,nDays+1):
             ticks = [d*6 for d in range(nDays*4+1)]
-            ticks_position = [d*6*60 for d in range(nDays*4+1)]
+            ticks_position = [d*DayPeriods//4 for d in range(nDays*4+1)]
 
         axs[n_row[c-1],n_col[c-1]].set_xticks(ticks_position)
         axs[n_row[c-1],n_col[c-1]].set_xticklabels(ticks, fontsize=14)
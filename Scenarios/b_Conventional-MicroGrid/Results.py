@@ -15,90 +15,161 @@ Authors:
 import pandas as pd
 import numpy as np
 import os
-from pandas import ExcelWriter
-from win32com.client import Dispatch
+import sys
+from pyomo.environ import Var, value
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))    # Modules shared by the configurations, in the Scenarios folder
+from Results_Store import Write_TimeSeries, Write_Tables
 import time
 
 import warnings
 warnings.filterwarnings("ignore")
 
 
+#%% Extraction of the solution
+def Values_Array(component, *shape):
+    '''
+    This function returns the values of an indexed parameter or variable as a NumPy array, in the order of its index,
+    without building a DataFrame indexed by the tuples of the index.
+    :param component: Component of the Pyomo instance, or of the Solution of Model_Matrix.
+    :param shape: Size of each dimension of the index, e.g. nS, nC, nP.
+    :return: NumPy array with the given shape (NaN for the variables without a value).
+    '''
+    array = getattr(component, 'array', None)   # The solution of Model_Matrix keeps the values of the solver in arrays
+    if array is None:
+        index = component.index_set()   # Ordered index, with the elements of the parameters left to their default
+        if component.ctype is Var:
+            values = (component[i].value for i in index)
+        else:   # Parameters, and the variables replaced by expressions in the compact formulation, computed from the solution
+            values = (value(component[i]) for i in index)
+        array = np.fromiter((np.nan if v is None else v for v in values), dtype=float, count=int(np.prod(shape)))
+    return array.reshape(shape)
+
+
+#%% Excel report
+def Cell_Width(value):
+    '''
+    This function returns the number of characters shown by Excel for the value of a cell (General format, which
+    shows at most 11 characters of a number).
+    '''
+    if value is None:
+        return 0
+    if isinstance(value, (float, np.floating)):
+        return min(len('{:.10g}'.format(value)), 11)
+    return len(str(value))
+
+
+def Excel_Report(tables, path):
+    '''
+    This function writes DataFrames in the sheets of an Excel file with a write-only workbook, which streams the rows
+    to the file, and sets the width of each column from its longest cell as the AutoFit of Excel would do.
+    The labels of the index repeated from the row above are left empty, as in the merged cells of pandas.
+    :param tables: Dictionary {sheet name: DataFrame}.
+    :param path: Path of the Excel file.
+    '''
+    workbook = Workbook(write_only=True)
+    for name, table in tables.items():
+        labels = [list(table.index.get_level_values(l)) for l in range(table.index.nlevels)]
+        rows = [['' if n is None else n for n in table.index.names] + [str(c) for c in table.columns]]
+        for r, values in enumerate(table.values.tolist()):
+            row, repeated = [], r > 0
+            for level in labels:
+                repeated = repeated and level[r] == level[r-1]
+                row.append(None if repeated else level[r])
+            rows.append(row + [None if isinstance(v, float) and np.isnan(v) else v for v in values])
+
+        sheet = workbook.create_sheet(name)
+        for j, width in enumerate(max(Cell_Width(row[j]) for row in rows) for j in range(len(rows[0]))):
+            sheet.column_dimensions[get_column_letter(j+1)].width = width + 2
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+
 #%% Energy balances
-def TimeSeries(instance):
+def TimeSeries(instance, csv=False):
+    '''
+    This function extracts the time series of the energy balances from the instance and writes them in the store of the results.
+    :param csv: Export also the csv files of each scenario and class, next to the store of the results.
+    '''
     
     nS = int(instance.Scenarios.extract_values()[None])
-    nP = int(instance.Periods.extract_values()[None])
+    nP = int(instance.Model_Periods.extract_values()[None])
     nY = int(instance.Years.extract_values()[None])
     nC = int(instance.Classes.extract_values()[None])
 
     StartDate = instance.StartDate.extract_values()[None]
-    dateInd = pd.DatetimeIndex(start=StartDate, periods=nP, freq='1min')
-
-    "Electricity balance terms"
-    EE_Demand      = pd.DataFrame.from_dict(instance.Electric_Energy_Demand.extract_values(), orient='index')
-    EE_Lost_Load   = pd.DataFrame.from_dict(instance.Lost_Load_EE.get_values(), orient='index')
-    EE_Curtailment = pd.DataFrame.from_dict(instance.Electric_Curtailment.get_values(), orient='index')
-    EE_RES         = pd.DataFrame.from_dict(instance.RES_Energy_Production.get_values(), orient='index')
-    EE_BESS_Out    = pd.DataFrame.from_dict(instance.BESS_Outflow.get_values(), orient='index')
-    EE_BESS_In     = pd.DataFrame.from_dict(instance.BESS_Inflow.get_values(), orient='index')
-    EE_Gen_Prod    = pd.DataFrame.from_dict(instance.Generator_Energy_Production.get_values(), orient='index')
+    Time_Resolution = instance.Time_Resolution.extract_values()[None]
+    dateInd = pd.date_range(start=StartDate, periods=nP, freq=str(Time_Resolution)+'min')
+
+    "Electricity balance terms, arrays (scenarios, periods)"
+    EE_Demand      = Values_Array(instance.Electric_Energy_Demand, nS, nP)
+    EE_Lost_Load   = Values_Array(instance.Lost_Load_EE, nS, nP)
+    EE_Curtailment = Values_Array(instance.Electric_Curtailment, nS, nP)
+    EE_RES         = Values_Array(instance.RES_Energy_Production, nS, nP)
+    EE_BESS_Out    = Values_Array(instance.BESS_Outflow, nS, nP)
+    EE_BESS_In     = Values_Array(instance.BESS_Inflow, nS, nP)
+    EE_Gen_Prod    = Values_Array(instance.Generator_Energy_Production, nS, nP)
     # Additional useful terms
-    Diesel_Cons    = pd.DataFrame.from_dict(instance.Diesel_Consumption.get_values(), orient='index')
-    BESS_SOC       = pd.DataFrame.from_dict(instance.BESS_State_of_Charge.get_values(), orient='index')
-    
-    "Thermal energy balance terms"
-    Th_Demand       = pd.DataFrame.from_dict(instance.Thermal_Energy_Demand.extract_values(), orient='index')
-    Th_Lost_Load    = pd.DataFrame.from_dict(instance.Lost_Load_Th.get_values(), orient='index')
-    Th_Curtailment  = pd.DataFrame.from_dict(instance.Thermal_Energy_Curtailment.extract_values(), orient='index')
-    Th_Boiler_Prod  = pd.DataFrame.from_dict(instance.Boiler_Energy_Production.extract_values(), orient='index')
+    Diesel_Cons    = Values_Array(instance.Diesel_Consumption, nS, nP)
+    BESS_SOC       = Values_Array(instance.BESS_State_of_Charge, nS, nP)
+    
+    "Thermal energy balance terms, arrays (scenarios, classes, periods)"
+    Th_Demand       = Values_Array(instance.Thermal_Energy_Demand, nS, nC, nP)
+    Th_Lost_Load    = Values_Array(instance.Lost_Load_Th, nS, nC, nP)
+    Th_Curtailment  = Values_Array(instance.Thermal_Energy_Curtailment, nS, nC, nP)
+    Th_Boiler_Prod  = Values_Array(instance.Boiler_Energy_Production, nS, nC, nP)
     # Additional useful terms
-    NG_Cons         = pd.DataFrame.from_dict(instance.NG_Consumption.get_values(), orient='index')
+    NG_Cons         = Values_Array(instance.NG_Consumption, nS, nC, nP)
 
     "Preparing for export"
     EE_TimeSeries = {}
     Th_TimeSeries = {}
     
     for s in range(nS):
-       EE_TimeSeries[s] = pd.concat([EE_Demand.iloc[s*nP:(s*nP+nP),:], EE_Lost_Load.iloc[s*nP:(s*nP+nP),:], EE_Curtailment.iloc[s*nP:(s*nP+nP),:],  EE_RES.iloc[s*nP:(s*nP+nP),:],  EE_BESS_Out.iloc[s*nP:(s*nP+nP),:], EE_BESS_In.iloc[s*nP:(s*nP+nP),:], EE_Gen_Prod.iloc[s*nP:(s*nP+nP),:], Diesel_Cons.iloc[s*nP:(s*nP+nP),:], BESS_SOC.iloc[s*nP:(s*nP+nP),:]], axis=1)
-       EE_TimeSeries[s].columns = ['Demand','Lost Load', 'Curtailment', 'RES production', 'BESS outflow', 'BESS inflow', 'Genset production', 'Diesel consumption', 'BESS state of charge']
-       EE_TimeSeries[s].index = dateInd
-       EE_TimeSeries['Sc'+str(s+1)] = EE_TimeSeries.pop(s)
-       EE_path = 'Results/TimeSeries/Sc'+str(s+1)
-       if not os.path.exists(EE_path):
-           os.makedirs(EE_path)
-       EE_TimeSeries['Sc'+str(s+1)].to_csv(EE_path+'/EE_TimeSeries.csv')
+       EE_TimeSeries['Sc'+str(s+1)] = pd.DataFrame(np.column_stack([EE_Demand[s], EE_Lost_Load[s], EE_Curtailment[s], EE_RES[s], EE_BESS_Out[s], EE_BESS_In[s], EE_Gen_Prod[s], Diesel_Cons[s], BESS_SOC[s]]), index=dateInd,
+                                                   columns=['Demand','Lost Load', 'Curtailment', 'RES production', 'BESS outflow', 'BESS inflow', 'Genset production', 'Diesel consumption', 'BESS state of charge'])
        
        Th_TimeSeries[s] = {}
        
        for c in range(nC):
-           Th_TimeSeries[s][c] = pd.concat([Th_Demand.iloc[(s*c*nP+c*nP):(s*c*nP+c*nP+nP),:], Th_Lost_Load.iloc[(s*c*nP+c*nP):(s*c*nP+c*nP+nP),:], Th_Boiler_Prod.iloc[(s*c*nP+c*nP):(s*c*nP+c*nP+nP),:], Th_Curtailment.iloc[(s*c*nP+c*nP):(s*c*nP+c*nP+nP),:], NG_Cons.iloc[(s*c*nP+c*nP):(s*c*nP+c*nP+nP),:]], axis=1)
-           Th_TimeSeries[s][c].columns = ['Demand','Lost Load', 'Boiler production', 'Curtailment', 'NG consumption']
-           Th_TimeSeries[s][c].index = dateInd
-           Th_TimeSeries[s]['Class'+str(c+1)] = Th_TimeSeries[s].pop(c)
+           Th_TimeSeries[s]['Class'+str(c+1)] = pd.DataFrame(np.column_stack([Th_Demand[s,c], Th_Lost_Load[s,c], Th_Boiler_Prod[s,c], Th_Curtailment[s,c], NG_Cons[s,c]]), index=dateInd,
+                                                             columns=['Demand','Lost Load', 'Boiler production', 'Curtailment', 'NG consumption'])
            
        Th_TimeSeries['Sc'+str(s+1)] = Th_TimeSeries.pop(s)
-   
-       for c in range(nC):
-           Th_path = 'Results/TimeSeries/Sc'+str(s+1)
-           if not os.path.exists(EE_path):
-               os.makedirs(EE_path)
-           Th_TimeSeries['Sc'+str(s+1)]['Class'+str(c+1)].to_csv(Th_path+'/Th_TimeSeries_Class'+str(c+1)+'.csv')
-                                                                  
+
     TimeSeries = {'EE': EE_TimeSeries,
                   'Th': Th_TimeSeries}
+
+    "Export"
+    Write_TimeSeries(TimeSeries, instance.Day_Periods.extract_values()[None])
+    if csv:
+        for s in EE_TimeSeries:
+            path = 'Results/TimeSeries/'+s
+            os.makedirs(path, exist_ok=True)
+            EE_TimeSeries[s].to_csv(path+'/EE_TimeSeries.csv')
+            for c in Th_TimeSeries[s]:
+                Th_TimeSeries[s][c].to_csv(path+'/Th_TimeSeries_'+c+'.csv')
     
     return(TimeSeries)
 
 
 #%% Energy System Configuration
-def EnergySystemInfo(instance):
+def EnergySystemInfo(instance, xlsx=False):
+    '''
+    This function computes the size, the costs and the indicators of the energy system and writes them in the store of the results.
+    :param xlsx: Export also EnergySystemSize.xlsx, next to the store of the results.
+    '''
         
     "System size"
     nS = int(instance.Scenarios.extract_values()[None])
-    nP = int(instance.Periods.extract_values()[None])
+    nP = int(instance.Model_Periods.extract_values()[None])
     nY = int(instance.Years.extract_values()[None])
     nC = int(instance.Classes.extract_values()[None])
     dr = instance.Discount_Rate.extract_values()[None]
+    dt = instance.Delta_Time.extract_values()[None]      # Time step in hours
+    Weight = Values_Array(instance.Period_Weight, nP)     # Days of the year represented by each period
 
     # Electricity system components
     RES_Capacity = pd.DataFrame(['RES', 'kW', instance.RES_Units.get_values()[None]*instance.RES_Nominal_Capacity.extract_values()[None]]).T.set_index([0,1])
@@ -183,15 +254,11 @@ def EnergySystemInfo(instance):
         Total_Diesel_Cost = pd.concat([Total_Diesel_Cost, pd.DataFrame([instance.Total_Diesel_Cost.extract_values()[s]/1e6])], axis=0)
         EE_LL_Cost = pd.concat([EE_LL_Cost, pd.DataFrame([instance.Scenario_Lost_Load_Cost_EE.extract_values()[s]/1e6])], axis=0)
         
-        for c in range(1,nC+1):
-            Total_NG_Cost = pd.concat([Total_NG_Cost, pd.DataFrame([instance.Total_NG_Cost.get_values()[(s,c)]/1e6])], axis=1)
-            Th_LL_Cost = pd.concat([Th_LL_Cost, pd.DataFrame([instance.Scenario_Lost_Load_Cost_Th.get_values()[(s,c)]/1e6])], axis=1)
-            
-        Total_NG_Cost = pd.concat([Total_NG_Cost, pd.DataFrame([Total_NG_Cost.sum(1).values[0]])], axis=1)
-        Total_NG_Cost.columns = ['Class'+str(c+1) for c in range(nC)]+['Total']
-
-        Th_LL_Cost = pd.concat([Th_LL_Cost, pd.DataFrame([Th_LL_Cost.sum(1).values[0]])], axis=1)
-        Th_LL_Cost.columns = ['Class'+str(c+1) for c in range(nC)]+['Total']
+        NG_Cost = pd.DataFrame([[instance.Total_NG_Cost.get_values()[(s,c)]/1e6 for c in range(1,nC+1)]], columns=['Class'+str(c) for c in range(1,nC+1)])
+        Total_NG_Cost = pd.concat([Total_NG_Cost, NG_Cost.assign(Total=NG_Cost.sum(1))], axis=0)
+
+        Th_LL = pd.DataFrame([[instance.Scenario_Lost_Load_Cost_Th.get_values()[(s,c)]/1e6 for c in range(1,nC+1)]], columns=['Class'+str(c) for c in range(1,nC+1)])
+        Th_LL_Cost = pd.concat([Th_LL_Cost, Th_LL.assign(Total=Th_LL.sum(1))], axis=0)
     
     Total_Diesel_Cost.index = pd.MultiIndex.from_arrays(Total_Diesel_Cost_index)
     Total_Diesel_Cost.columns = ['Total']
@@ -223,9 +290,9 @@ def EnergySystemInfo(instance):
     "Energy Indicators"
     
     "TPES [MWh]"
-    EE_RES_Prod = pd.DataFrame.from_dict(instance.RES_Energy_Production.get_values(), orient='index').sum(0).to_frame()/1e3/60
-    EE_Gen_Prod = pd.DataFrame.from_dict(instance.Generator_Energy_Production.get_values(), orient='index').sum(0).to_frame()/1e3/60
-    Th_Boiler_Prod  = pd.DataFrame.from_dict(instance.Boiler_Energy_Production.extract_values(), orient='index').sum(0).to_frame()/1e3/60
+    EE_RES_Prod = pd.DataFrame([Values_Array(instance.RES_Energy_Production, nS, nP).dot(Weight).sum()*dt/1e3])
+    EE_Gen_Prod = pd.DataFrame([Values_Array(instance.Generator_Energy_Production, nS, nP).dot(Weight).sum()*dt/1e3])
+    Th_Boiler_Prod  = pd.DataFrame([Values_Array(instance.Boiler_Energy_Production, nS, nC, nP).dot(Weight).sum()*dt/1e3])
     
     eta_Generator = instance.Generator_Efficiency.extract_values()[None]
     eta_Boiler = instance.Boiler_Efficiency.extract_values()[None]
@@ -246,8 +313,8 @@ def EnergySystemInfo(instance):
     TPES.columns = ['Total', 'Electric', 'Thermal']
     
     "LCOE [USD/kWh]"
-    EE_Demand = pd.DataFrame.from_dict(instance.Electric_Energy_Demand.extract_values(), orient='index').sum(0).to_frame()/1e3/60  #[MWh]
-    Th_Demand = pd.DataFrame.from_dict(instance.Thermal_Energy_Demand.extract_values(), orient='index').sum(0).to_frame()/1e3/60   #[MWh]
+    EE_Demand = pd.DataFrame([Values_Array(instance.Electric_Energy_Demand, nS, nP).dot(Weight).sum()*dt/1e3])  #[MWh]
+    Th_Demand = pd.DataFrame([Values_Array(instance.Thermal_Energy_Demand, nS, nC, nP).dot(Weight).sum()*dt/1e3])   #[MWh]
     Net_Present_Demand = sum((EE_Demand+Th_Demand)/(1+dr)**i for i in range(1,(nY+1)))    #[MWh]
     LCOE = pd.DataFrame([NPC.iloc[0,0]/Net_Present_Demand.iloc[0,0]*1e3])    #[USD/kWh]
     LCOE.index = pd.MultiIndex.from_arrays([['Levelized Cost of Energy '],['USD/kWh']])
@@ -266,25 +333,9 @@ def EnergySystemInfo(instance):
     
     
     "Export"
-    ESs_path = 'Results'
-    if not os.path.exists(ESs_path):
-        os.makedirs(ESs_path)
-    
-    ESsFile = ExcelWriter(ESs_path+'/EnergySystemSize.xlsx')
-    EnergySystemSize.to_excel(ESsFile, sheet_name='Size')   
-    EnergySystemCost.to_excel(ESsFile, sheet_name='Cost')  
-    EnergyIndicators.to_excel(ESsFile, sheet_name='Indicators')
-    
-    ESsFile.save()
-    
-    excel = Dispatch('Excel.Application')   
-    cwd = os.getcwd()
-    ESsFile = excel.Workbooks.Open(cwd+'/'+ESs_path+'/EnergySystemSize.xlsx')
-    for y in range(1,4):
-        excel.Worksheets(y).Activate()
-        excel.ActiveSheet.Columns.AutoFit()
-    ESsFile.Save()
-    ESsFile.Close()
+    Write_Tables({'Size': EnergySystemSize, 'Cost': EnergySystemCost, 'Indicators': EnergyIndicators})
+    if xlsx:
+        Excel_Report({'Size': EnergySystemSize, 'Cost': EnergySystemCost, 'Indicators': EnergyIndicators}, 'Results/EnergySystemSize.xlsx')
 
 
     return(EnergySystemSize, EnergySystemCost, EnergyIndicators)
@@ -13,8 +13,17 @@ Authors:
 """
 
 
-from pyomo.opt import SolverFactory
-from pyomo.environ import Objective, minimize, Constraint
+import os
+import sys
+import time
+import pandas as pd
+from pyomo.environ import AbstractModel, Objective, minimize, Constraint, Expression, Param, Var, value
+
+from Model_Creation import Model_Creation
+from Initialize import Data_File, Initialize_Discount_Factor
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))    # Modules shared by the configurations, in the Scenarios folder
+from Solvers import Solver_Profiles, Solver_Table, Persistent_Solver, Solve_Instance
+from Model_Profiler import Build_Profiler
 
 
 from Constraints import Net_Present_Cost,Scenario_Net_Present_Cost,Total_Investment_Cost,Generator_Investment_Cost,\
@@ -25,7 +34,14 @@ from Constraints import Net_Present_Cost,Scenario_Net_Present_Cost,Total_Investm
     Max_Power_BESS_Charge,Max_Power_BESS_Discharge,Max_BESS_Inflow,Min_BESS_Outflow,Electric_Resistance_Energy_Production,Tot_Electric_Resistance_Energy_Production
         
 
-def Model_Resolution(model,datapath="Inputs/data.dat"):   
+def Model_Instance(model,datapath="Inputs/data.dat",profiler=None):
+    '''
+    This function attaches the objective function and the constraints to the model and creates the instance.
+    :param model: Pyomo model as defined in the Model_Creation script.
+    :param datapath: Path of the dat file with the parameters of the project.
+    :param profiler: Build_Profiler that records the construction of each component, None to skip it.
+    :return: The instance of the model, ready to be solved.
+    '''
     
     "Objective function"
     model.ObjectiveFuntion = Objective(rule=Net_Present_Cost, sense=minimize)  
@@ -54,8 +70,6 @@ def Model_Resolution(model,datapath="Inputs/data.dat"):
     "Electricity generation system constraints" 
     model.ElectricEnergyBalance = Constraint(model.scenario,model.periods, rule=Electric_Energy_Balance)    
     
-    model.RESEnergyProduction = Constraint(model.scenario,model.periods, rule=RES_Energy_Production)    
-
     model.BESSStateOfCharge = Constraint(model.scenario,model.periods, rule=BESS_State_of_Charge)    
     model.MaximumBESSCharge = Constraint(model.scenario,model.periods, rule=Maximum_BESS_Charge)    
     model.MinimumBESSCharge = Constraint(model.scenario,model.periods, rule=Minimum_BESS_Charge)    
@@ -65,34 +79,217 @@ def Model_Resolution(model,datapath="Inputs/data.dat"):
     model.MinBESSOutflow = Constraint(model.scenario,model.periods, rule=Min_BESS_Outflow)    
 
     model.MaximumGeneratorEnergy = Constraint(model.scenario,model.periods, rule=Maximum_Generator_Energy)    
-    model.DieselConsumption = Constraint(model.scenario,model.periods, rule=Diesel_Consumption)    
     model.MaximumLostLoadEE = Constraint(model.scenario, rule=Maximum_Lost_Load_EE)    
 
     "Thermal energy generation system constraints" 
     model.ThermalEnergyBalance = Constraint(model.scenario,model.classes,model.periods, rule=Thermal_Energy_Balance)    
     model.MaximumElectricResistanceEnergy = Constraint(model.scenario,model.classes,model.periods, rule=Maximum_Electric_Resistance_Energy)    
-    model.ElectricResistanceEnergyProduction = Constraint(model.scenario,model.classes,model.periods, rule=Electric_Resistance_Energy_Production)           
-    model.TotElectricResistanceEnergyProduction = Constraint(model.scenario,model.periods, rule=Tot_Electric_Resistance_Energy_Production)           
     model.MaximumLostLoadTh = Constraint(model.scenario,model.classes, rule=Maximum_Lost_Load_Th)    
+
+    "Variables defined by an equality with other variables, replaced by expressions in the compact formulation"
+    if not model.Compact:
+        model.RESEnergyProduction = Constraint(model.scenario,model.periods, rule=RES_Energy_Production)
+        model.DieselConsumption = Constraint(model.scenario,model.periods, rule=Diesel_Consumption)
+        model.ElectricResistanceEnergyProduction = Constraint(model.scenario,model.classes,model.periods, rule=Electric_Resistance_Energy_Production)
+        model.TotElectricResistanceEnergyProduction = Constraint(model.scenario,model.periods, rule=Tot_Electric_Resistance_Energy_Production)
     
     print('Model_Resolution: Constraints imported')
     
     "Load parameters"
-    instance = model.create_instance(datapath)
-    print('Model_Resolution: Instance created')
+    start = time.time()
+    if profiler is None:
+        instance = model.create_instance(datapath)
+    else:
+        with profiler.Construction():
+            instance = model.create_instance(datapath)
+    print('Model_Resolution: Instance created in', round(time.time()-start,1), 's')
+    
+    return instance
+
+
+def Model_Resolution(model,datapath="Inputs/data.dat",solver=None,threads=None,profile=False,tee=False):   
+    
+    profiler = Build_Profiler() if profile else None   # Profile of the construction of the components and of the solver (see Model_Profiler)
+    instance = Model_Instance(model,datapath,profiler)
     
     "Solver use during the optimization"
-    opt = SolverFactory('gurobi')    
-    opt.set_options('Method=2 Crossover=0 BarConvTol=1e-4 OptimalityTol=1e-4 FeasibilityTol=1e-4 IterationLimit=1000')
+    if solver is None:
+        solver = instance.Solver.value      # Solver chosen in the dat file
     print('Model_Resolution: Solver called')
     
     "Solving a model instance"
-    results = opt.solve(instance, tee=True) 
+    Solve_Instance(instance, solver, tee=tee, threads=threads, profiler=profiler)   # Loads the solution into the instance and records the performance and the telemetry of the solver
     print('Model_Resolution: instance solved')
-
-    "Loading solution into instance"
-    instance.solutions.load_from(results)
+    
+    if profiler is not None:
+        profiler.Report(instance)
     
     return instance
 
-    
\ No newline at end of file
+
+Reference_Values = {'Representative_Days': 0,    # All the periods of the year
+                    'Time_Resolution': 1}        # Native resolution of the time series in minutes
+
+
+def Approximation_Error(datapath="Inputs/data.dat", **values):
+    '''
+    This function solves the project with all the periods of the year at the native resolution of the time series,
+    and with some of the parameters that reduce the size of the model changed, and reports the error on the net
+    present cost made by the reduced model.
+    :param datapath: Path of the dat file with the parameters of the project.
+    :param values: Value of the parameters of the reduced model (Representative_Days, Time_Resolution).
+    :return: Relative error of the net present cost obtained with the reduced model.
+    '''
+    NPC = []
+    for variant in [{name: Reference_Values[name] for name in values}, values]:
+        path = Data_File(datapath, **variant)
+        try:
+            model = AbstractModel()
+            Model_Creation(model)
+            NPC.append(Model_Resolution(model, path).ObjectiveFuntion.expr())
+        finally:
+            os.remove(path)
+    error = (NPC[1]-NPC[0])/NPC[0]
+    print('Model_Resolution: NPC of the complete model', round(NPC[0]), 'USD, with', ', '.join(name+' '+str(value) for name,value in values.items()), round(NPC[1]), 'USD, error', round(100*error,2), '%')
+    return error
+
+
+def Representative_Days_Error(days, datapath="Inputs/data.dat"):
+    '''
+    This function reports the error on the net present cost made by optimizing the representative days only.
+    :param days: Number of representative days.
+    :param datapath: Path of the dat file with the parameters of the project.
+    :return: Relative error of the net present cost obtained with the representative days.
+    '''
+    return Approximation_Error(datapath, Representative_Days=days)
+
+
+def Time_Resolution_Error(resolution, datapath="Inputs/data.dat"):
+    '''
+    This function reports the error on the net present cost made by optimizing the project at a coarser time resolution.
+    :param resolution: Time resolution in minutes (5, 15 or 60).
+    :param datapath: Path of the dat file with the parameters of the project.
+    :return: Relative error of the net present cost obtained at the given resolution.
+    '''
+    return Approximation_Error(datapath, Time_Resolution=resolution)
+
+
+def Model_Size(instance):
+    '''
+    This function returns the size of the linear program of an instance, as sent to the solver.
+    :param instance: Pyomo instance as created by Model_Instance.
+    :return: Number of rows, columns and nonzeros of the matrix of the constraints.
+    '''
+    from pyomo.repn.standard_repn import generate_standard_repn
+    
+    rows, nonzeros, columns = 0, 0, set()
+    for constraint in instance.component_data_objects(Constraint, active=True):
+        repn = generate_standard_repn(constraint.body, quadratic=False)
+        rows += 1
+        nonzeros += len(repn.linear_vars)
+        columns.update(id(var) for var in repn.linear_vars)
+    return rows, len(columns), nonzeros
+
+
+def Compact_Check(datapath="Inputs/data.dat", solver=None):
+    '''
+    This function solves the project with the complete and the compact formulation (see Model_Creation) and compares
+    the size of the two linear programs, their time of creation and resolution, the net present cost and the values
+    of the variables replaced by expressions.
+    :param datapath: Path of the dat file with the parameters of the project.
+    :param solver: 'gurobi', 'highs', 'cbc' or 'glpk', the solver of the dat file if None.
+    :return: DataFrame with one row for each formulation.
+    '''
+    rows, instances = [], []
+    for compact in [False, True]:
+        model = AbstractModel()
+        Model_Creation(model, compact)
+        start = time.time()
+        instance = Model_Instance(model, datapath)
+        creation = time.time()-start
+        if solver is None:
+            solver = instance.Solver.value
+        performance = Solve_Instance(instance, solver, tee=False, table=None)[1]
+        size = Model_Size(instance)
+        rows.append({'Formulation': 'Compact' if compact else 'Complete', 'Rows': size[0], 'Columns': size[1], 'Nonzeros': size[2],
+                     'Creation time [s]': creation, 'Wall time [s]': performance['Wall time [s]'][0], 'NPC [USD]': value(instance.ObjectiveFuntion)})
+        instances.append(instance)
+    
+    difference = max(max(abs(value(expression[index])-instances[0].component(expression.name)[index].value) for index in expression)
+                     for expression in instances[1].component_objects(Expression))
+    rows = pd.DataFrame(rows).set_index('Formulation')
+    print(rows.to_string())
+    print('Model_Resolution: difference of the NPC', rows['NPC [USD]'].diff().iloc[-1], 'USD, largest difference of the variables replaced by expressions', difference)
+    return rows
+
+
+def Solver_Comparison(solvers=('gurobi','highs','cbc','glpk'), datapath="Inputs/data.dat"):
+    '''
+    This function solves the project with each of the solvers installed, with the same options, and returns the
+    wall time, the number of iterations and the objective function of each resolution (also added to Solver_Table).
+    :param solvers: Solvers to compare, the ones not installed are skipped.
+    :param datapath: Path of the dat file with the parameters of the project.
+    :return: DataFrame with one row for each solver.
+    '''
+    from pyomo.environ import SolverFactory
+    
+    rows = []
+    for solver in solvers:
+        if not SolverFactory(Solver_Profiles[solver]['factory']).available(exception_flag=False):
+            print('Model_Resolution: solver', solver, 'not installed, skipped')
+            continue
+        model = AbstractModel()
+        Model_Creation(model)
+        instance = Model_Instance(model, datapath)
+        rows.append(Solve_Instance(instance, solver, tee=False)[1])
+    print('Model_Resolution: performance of the solvers added to', Solver_Table)
+    return pd.concat(rows, ignore_index=True)
+
+
+Sweep_Table = 'Results/Parameter_Sweep.csv'     # Results of the points of the parameter sweeps
+
+
+def Parameter_Sweep(model, points, datapath="Inputs/data.dat", solver=None, table=Sweep_Table, warm=True):
+    '''
+    This function solves the project for a sequence of values of some mutable parameters (Diesel_Unitary_Cost,
+    NG_Unitary_Cost, Discount_Rate), creating the instance once: the parameters are changed in place and the
+    persistent interface of the solver updates only the coefficients affected. All the parameters swept are recorded
+    at each point, in the same columns, and the table is written again at each sweep.
+    :param model: Pyomo model as defined in the Model_Creation script.
+    :param points: List of dictionaries {parameter: value}, one for each point of the sweep.
+    :param datapath: Path of the dat file with the parameters of the project.
+    :param solver: 'gurobi' or 'highs', the solver of the dat file if None.
+    :param table: Path of the csv file where the results of each point are added as soon as it is solved, None to skip the record.
+    :param warm: Solve each point from the basis of the previous one, unless the model is too big (see Persistent_Solver),
+                 from scratch otherwise.
+    :return: Generator of the results of each point, as a DataFrame with one row: parameters, net present cost,
+             size of the components, wall time and iterations of the solver.
+    '''
+    instance = Model_Instance(model, datapath)
+    if solver is None:
+        solver = instance.Solver.value
+    opt, options = Persistent_Solver(solver, warm, instance.Model_Periods.value)
+    points = list(points)
+    parameters = list(dict.fromkeys(name for values in points for name in values))   # Parameters swept, in the order they first appear
+    sizes = [var for var in instance.component_objects(Var) if 'Units' in var.name or 'Nominal_Capacity' in var.name]
+
+    for point, values in enumerate(points):
+        for name, parameter in values.items():
+            if not isinstance(instance.component(name), Param) or not instance.component(name).mutable:
+                raise ValueError('Model_Resolution: ' + name + ' is not a mutable parameter of the model')
+            instance.component(name).set_value(parameter)
+        if 'Discount_Rate' in values:
+            instance.Discount_Factor.set_value(Initialize_Discount_Factor(instance))
+
+        performance = Solve_Instance(instance, solver, tee=False, table=None, opt=opt, options=options[min(point,1)])[1]
+        row = {name: instance.component(name).value for name in parameters}     # Parameters not given keep the value of the previous point
+        row['NPC [USD]'] = value(instance.ObjectiveFuntion)
+        for var in sizes:
+            for index, size in var.extract_values().items():
+                row[var.name if index is None else var.name+'['+str(index)+']'] = size
+        row = pd.DataFrame([row]).assign(**{'Wall time [s]': performance['Wall time [s]'].values, 'Iterations': performance['Iterations'].values})
+        if table is not None:
+            os.makedirs(os.path.dirname(table), exist_ok=True)
+            row.to_csv(table, mode='a' if point else 'w', header=not point, index=False)
+        print('Model_Resolution: sweep point', point+1, values, '- NPC', round(row['NPC [USD]'][0]), 'USD')
+        yield row
@@ -12,11 +12,16 @@ Authors:
                         San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
 """
 
+import os
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import pylab
 import itertools
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))    # Modules shared by the configurations, in the Scenarios folder
+from Results_Store import Read_TimeSeries, Read_Table
+from Input_Store import Load_Frame
     
 import warnings
 warnings.filterwarnings("ignore")
@@ -25,10 +30,9 @@ warnings.filterwarnings("ignore")
 #%% Electric load
 def ElectricLoadCurves(StartDate,PlotResolution):
 
-    Electric_Energy_Demand = pd.read_csv('Inputs/Electric_Demand.csv', sep=';', index_col=0) # Import electricity demand
-    Electric_Energy_Demand = Electric_Energy_Demand.round(3)
+    Electric_Energy_Demand = Load_Frame('Inputs/Electric_Demand.csv') # Import electricity demand
     
-    Electric_Energy_Demand.index = pd.DatetimeIndex(start=StartDate, periods=525600, freq='1min')
+    Electric_Energy_Demand.index = pd.date_range(start=StartDate, periods=len(Electric_Energy_Demand), freq='1min')
     
     StartDatePlot = ['12/21/2017 00:00:00','03/21/2017 00:00:00','06/21/2017 00:00:00','09/23/2017 00:00:00'] # MM/DD/YY
     EndDatePlot   = ['12/21/2017 23:59:59','03/21/2017 23:59:59','06/21/2017 23:59:59','09/23/2017 23:59:59']
@@ -69,10 +73,9 @@ def ElectricLoadCurves(StartDate,PlotResolution):
 #%% Thermal loads
 def ThermalLoadCurves(StartDate,PlotResolution):
 
-    Thermal_Energy_Demand = pd.read_csv('Inputs/Thermal_Demand.csv', sep=';',  index_col=0) # Import thermal energy demand
-    Thermal_Energy_Demand = Thermal_Energy_Demand.round(3)
+    Thermal_Energy_Demand = Load_Frame('Inputs/Thermal_Demand.csv') # Import thermal energy demand
     
-    Thermal_Energy_Demand.index = pd.DatetimeIndex(start=StartDate, periods=525600, freq='1min')
+    Thermal_Energy_Demand.index = pd.date_range(start=StartDate, periods=len(Thermal_Energy_Demand), freq='1min')
     
     StartDatePlot = ['12/23/2017 00:00:00','03/23/2017 00:00:00','06/23/2017 00:00:00','09/23/2017 00:00:00'] # MM/DD/YY
     EndDatePlot   = ['12/23/2017 23:59:59','03/23/2017 23:59:59','06/23/2017 23:59:59','09/23/2017 23:59:59']
@@ -139,20 +142,20 @@ def ElectricDispatch(nS,PlotScenario,PlotStartDate,PlotEndDate,PlotResolution):
     TimeSeries = {}
     TimeSeries['EE'] = {}
     for s in range(1,nS+1):
-        TimeSeries['EE']['Sc'+str(s)] = pd.read_csv('Results/TimeSeries/Sc'+str(s)+'/EE_TimeSeries.csv', index_col=[0])
+        TimeSeries['EE']['Sc'+str(s)] = Read_TimeSeries('EE', s, start=PlotStartDate, end=PlotEndDate)
     
     "Import params"
     idx = pd.IndexSlice
-    BESSNominalCapacity = pd.read_excel('Results/EnergySystemSize.xlsx','Size',index_col=[0,1]).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
+    BESSNominalCapacity = Read_Table('Size', ['Total']).loc[idx['Battery Storage System',:],'Total'].to_frame().iloc[0,0]
     
     "Series preparation"
-    y_RES         = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,4].values
-    y_BESS_out    = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,5].values
-    y_BESS_in     = -1*TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,6].values
-    y_Genset      = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,7].values
-    y_ElResCons   = -1*TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,3].values
-    y_LostLoad    = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,1].values
-    y_Curtailment = -1*TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,2].values
+    y_RES         = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[:,4].values
+    y_BESS_out    = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[:,5].values
+    y_BESS_in     = -1*TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[:,6].values
+    y_Genset      = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[:,7].values
+    y_ElResCons   = -1*TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[:,3].values
+    y_LostLoad    = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[:,1].values
+    y_Curtailment = -1*TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[:,2].values
     x_Plot = np.arange(len(y_Genset))
     
     deltaBESS_pos = y_BESS_out + y_BESS_in
@@ -170,8 +173,8 @@ def ElectricDispatch(nS,PlotScenario,PlotStartDate,PlotEndDate,PlotResolution):
                  y_LostLoad,
                  y_Curtailment]
 
-    y_Demand = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,0].values
-    y_BESS_SOC = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[PlotStartDate:PlotEndDate,-1].values/BESSNominalCapacity*100
+    y_Demand = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[:,0].values
+    y_BESS_SOC = TimeSeries['EE']['Sc'+str(PlotScenario)].iloc[:,-1].values/BESSNominalCapacity*100
     
     Colors = ['#ffbe0b',
               '#3a86ff',
@@ -243,7 +246,7 @@ def ThermalDispatch(nC,nS,PlotScenario,PlotStartDate,PlotEndDate,PlotResolution)
     for s in range(1,nS+1):
         TimeSeries['Th']['Sc'+str(s)] = {}
         for c in range(1,nC+1):
-            TimeSeries['Th']['Sc'+str(s)]['Class'+str(c)] = pd.read_csv('Results/TimeSeries/Sc'+str(s)+'/Th_TimeSeries_Class'+str(c)+'.csv', index_col=[0])
+            TimeSeries['Th']['Sc'+str(s)]['Class'+str(c)] = Read_TimeSeries('Th', s, c, start=PlotStartDate, end=PlotEndDate)
     
     fig,axs = plt.subplots(2,2,figsize=(20,20))
     subplot_rows = 2
@@ -254,15 +257,15 @@ def ThermalDispatch(nC,nS,PlotScenario,PlotStartDate,PlotEndDate,PlotResolution)
 
     for c in range(1,nC+1):
         "Series preparation"
-        y_ElResProd   = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c)].iloc[PlotStartDate:PlotEndDate,2].values
-        y_LostLoad    = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c)].iloc[PlotStartDate:PlotEndDate,1].values
-        y_Curtailment = -1*TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c)].iloc[PlotStartDate:PlotEndDate,3].values
+        y_ElResProd   = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c)].iloc[:,2].values
+        y_LostLoad    = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c)].iloc[:,1].values
+        y_Curtailment = -1*TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c)].iloc[:,3].values
         x_Plot = np.arange(len(y_ElResProd))
         y_Stacked = [y_ElResProd,
                      y_LostLoad,
                      y_Curtailment]
     
-        y_Demand = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c)].iloc[PlotStartDate:PlotEndDate,0].values
+        y_Demand = TimeSeries['Th']['Sc'+str(PlotScenario)]['Class'+str(c)].iloc[:,0].values
     
         Colors = ['#aacc00',
                   '#f72585',
@@ -84,28 +84,16 @@ def Variable_Costs(model,s):
     return model.Variable_Costs[s] == model.Scenario_Lost_Load_Cost_EE[s] + model.Total_Diesel_Cost[s] + sum(model.Scenario_Lost_Load_Cost_Th[s,c] + model.Total_NG_Cost[s,c] for c in model.classes)
                                                                                       
 def Scenario_Lost_Load_Cost_EE(model,s):
-    foo=[]
-    for f in range(1,model.Periods+1):
-        foo.append((s,f))
-    return  model.Scenario_Lost_Load_Cost_EE[s] == sum(((sum(model.Lost_Load_EE[s,t]*model.EE_Value_Of_Lost_Load/60 for s,t in foo))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years) 
+    return  model.Scenario_Lost_Load_Cost_EE[s] == sum(model.Lost_Load_EE[s,t]*model.Period_Weight[t] for t in model.periods)*model.EE_Value_Of_Lost_Load*model.Delta_Time*model.Discount_Factor
 
 def Total_Diesel_Cost(model,s):
-    foo=[]
-    for f in range(1,model.Periods+1):
-        foo.append((s,f))
-    return model.Total_Diesel_Cost[s] == sum(((sum(model.Diesel_Consumption[s,t]*model.Diesel_Unitary_Cost for s,t in foo))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years) 
+    return model.Total_Diesel_Cost[s] == sum(model.Diesel_Consumption[s,t]*model.Period_Weight[t] for t in model.periods)*model.Diesel_Unitary_Cost*model.Discount_Factor
     
 def Scenario_Lost_Load_Cost_Th(model,s,c):
-    foo=[] 
-    for f in range(1,model.Periods+1):
-        foo.append((s,f))
-    return  model.Scenario_Lost_Load_Cost_Th[s,c] == sum(((sum(model.Lost_Load_Th[s,c,t]*model.Th_Value_Of_Lost_Load/60 for s,t in foo))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years) 
+    return  model.Scenario_Lost_Load_Cost_Th[s,c] == sum(model.Lost_Load_Th[s,c,t]*model.Period_Weight[t] for t in model.periods)*model.Th_Value_Of_Lost_Load*model.Delta_Time*model.Discount_Factor
 
 def Total_NG_Cost(model,s,c):
-    foo=[] 
-    for f in range(1,model.Periods+1):
-        foo.append((s,f))
-    return  model.Total_NG_Cost[s,c] == sum(((sum(model.NG_Consumption[s,c,t]*model.NG_Unitary_Cost for s,t in foo))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years)
+    return  model.Total_NG_Cost[s,c] == sum(model.NG_Consumption[s,c,t]*model.Period_Weight[t] for t in model.periods)*model.NG_Unitary_Cost*model.Discount_Factor
 
     
   
@@ -115,15 +103,20 @@ def Electric_Energy_Balance(model,s,t):
     return model.Electric_Energy_Demand[s,t] + sum(model.Electric_Resistance_Energy_Consumption[s,c,t] for c in model.classes) == model.RES_Energy_Production[s,t] - model.BESS_Inflow[s,t] + model.BESS_Outflow[s,t] + model.Generator_Energy_Production[s,t] + model.Lost_Load_EE[s,t] - model.Electric_Curtailment[s,t]
 
 "Renewable Energy Sources constraints"
+def RES_Energy_Production_Expression(model,s,t):
+    return model.RES_Unit_Energy_Production[s,t]*model.RES_Inverter_Efficiency*model.RES_Units
+
 def RES_Energy_Production(model,s,t):
-    return model.RES_Energy_Production[s,t] == model.RES_Unit_Energy_Production[s,t]*model.RES_Inverter_Efficiency*model.RES_Units
+    return model.RES_Energy_Production[s,t] == RES_Energy_Production_Expression(model,s,t)
 
 "Battery Energy Storage constraints"
 def BESS_State_of_Charge(model,s,t):
+    if model.Representative_Days.value != 0 and (t-1)%model.Day_Periods.value == 0:   # First period of a representative day, linked to the last one of the same day
+        return model.BESS_State_of_Charge[s,t] == model.BESS_State_of_Charge[s,t+model.Day_Periods.value-1] - model.BESS_Outflow[s,t]*model.Delta_Time/model.BESS_Discharge_Efficiency + model.BESS_Inflow[s,t]*model.Delta_Time*model.BESS_Charge_Efficiency
     if t==1:
-        return model.BESS_State_of_Charge[s,t] == model.BESS_Nominal_Capacity - model.BESS_Outflow[s,t]/60/model.BESS_Discharge_Efficiency + model.BESS_Inflow[s,t]/60*model.BESS_Charge_Efficiency
+        return model.BESS_State_of_Charge[s,t] == model.BESS_Nominal_Capacity - model.BESS_Outflow[s,t]*model.Delta_Time/model.BESS_Discharge_Efficiency + model.BESS_Inflow[s,t]*model.Delta_Time*model.BESS_Charge_Efficiency
     if t>1:  
-        return model.BESS_State_of_Charge[s,t] == model.BESS_State_of_Charge[s,t-1] - model.BESS_Outflow[s,t]/60/model.BESS_Discharge_Efficiency + model.BESS_Inflow[s,t]/60*model.BESS_Charge_Efficiency    
+        return model.BESS_State_of_Charge[s,t] == model.BESS_State_of_Charge[s,t-1] - model.BESS_Outflow[s,t]*model.Delta_Time/model.BESS_Discharge_Efficiency + model.BESS_Inflow[s,t]*model.Delta_Time*model.BESS_Charge_Efficiency    
 
 def Maximum_BESS_Charge(model,s,t):
     return model.BESS_State_of_Charge[s,t] <= model.BESS_Nominal_Capacity
@@ -147,12 +140,15 @@ def Min_BESS_Outflow(model,s,t):
 def Maximum_Generator_Energy(model,s,t):
     return model.Generator_Energy_Production[s,t] <= model.Generator_Nominal_Capacity
 
-def Diesel_Consumption(model,s,t): 
-    return model.Diesel_Consumption[s,t] == model.Generator_Energy_Production[s,t]/model.Generator_Efficiency/model.Lower_Heating_Value/60
+def Diesel_Consumption_Expression(model,s,t):
+    return model.Generator_Energy_Production[s,t]/model.Generator_Efficiency/model.Lower_Heating_Value*model.Delta_Time
+
+def Diesel_Consumption(model,s,t):
+    return model.Diesel_Consumption[s,t] == Diesel_Consumption_Expression(model,s,t)
 
 "Lost Load constraints"
 def Maximum_Lost_Load_EE(model,s):
-    return model.EE_Lost_Load_Tolerance >= (sum(model.Lost_Load_EE[s,t] for t in model.periods)/sum(model.Electric_Energy_Demand[s,t] for t in model.periods))
+    return model.EE_Lost_Load_Tolerance >= (sum(model.Lost_Load_EE[s,t]*model.Period_Weight[t] for t in model.periods)/sum(model.Electric_Energy_Demand[s,t]*model.Period_Weight[t] for t in model.periods))
 
 
 #%% Thermal energy generation system constraints
@@ -161,22 +157,30 @@ def Thermal_Energy_Balance(model,s,c,t):
      return  model.Thermal_Energy_Demand[s,c,t] == model.SC_Energy_Production[s,c,t] + model.Electric_Resistance_Energy_Production[s,c,t] - model.Tank_Inflow[s,c,t] + model.Tank_Outflow[s,c,t] +  model.Boiler_Energy_Production[s,c,t] - model.Thermal_Energy_Curtailment[s,c,t] + model.Lost_Load_Th[s,c,t]
 
 "Solar collector constraints"
+def SC_Energy_Production_Expression(model,s,c,t):
+    return model.SC_Unit_Energy_Production[s,c,t]*model.SC_Units[c]
+
 def SC_Energy_Production(model,s,c,t):
-    return model.SC_Energy_Production[s,c,t] == model.SC_Unit_Energy_Production[s,c,t]*model.SC_Units[c]
+    return model.SC_Energy_Production[s,c,t] == SC_Energy_Production_Expression(model,s,c,t)
 
 "Boiler constraints"
 def Maximum_Boiler_Energy(model,s,c,t):   
     return model.Boiler_Energy_Production[s,c,t] <= model.Boiler_Nominal_Capacity[c]
 
+def NG_Consumption_Expression(model,s,c,t):
+    return model.Boiler_Energy_Production[s,c,t]/model.Boiler_Efficiency/model.Lower_Heating_Value_NG*model.Delta_Time
+
 def NG_Consumption(model,s,c,t):
-    return model.NG_Consumption[s,c,t] == model.Boiler_Energy_Production[s,c,t]/model.Boiler_Efficiency/model.Lower_Heating_Value_NG/60
+    return model.NG_Consumption[s,c,t] == NG_Consumption_Expression(model,s,c,t)
 
 "Tank constraints"
 def Tank_State_of_Charge(model,s,c,t):
+    if model.Representative_Days.value != 0 and (t-1)%model.Day_Periods.value == 0:   # First period of a representative day, linked to the last one of the same day
+        return model.Tank_State_of_Charge[s,c,t] == model.Tank_State_of_Charge[s,c,t+model.Day_Periods.value-1]*model.Tank_Efficiency + model.SC_Energy_Production[s,c,t]*model.Delta_Time + model.Electric_Resistance_Energy_Production[s,c,t]*model.Electric_Resistance_Efficiency*model.Delta_Time- model.Tank_Outflow[s,c,t]*model.Delta_Time
     if t==1:
-        return model.Tank_State_of_Charge[s,c,t] == model.Tank_Nominal_Capacity[c] + model.SC_Energy_Production[s,c,t]/60 + model.Electric_Resistance_Energy_Production[s,c,t]*model.Electric_Resistance_Efficiency/60- model.Tank_Outflow[s,c,t]/60
+        return model.Tank_State_of_Charge[s,c,t] == model.Tank_Nominal_Capacity[c] + model.SC_Energy_Production[s,c,t]*model.Delta_Time + model.Electric_Resistance_Energy_Production[s,c,t]*model.Electric_Resistance_Efficiency*model.Delta_Time- model.Tank_Outflow[s,c,t]*model.Delta_Time
     if t>1:  
-        return model.Tank_State_of_Charge[s,c,t] == model.Tank_State_of_Charge[s,c,t-1]*model.Tank_Efficiency + model.SC_Energy_Production[s,c,t]/60 + model.Electric_Resistance_Energy_Production[s,c,t]*model.Electric_Resistance_Efficiency/60- model.Tank_Outflow[s,c,t]/60
+        return model.Tank_State_of_Charge[s,c,t] == model.Tank_State_of_Charge[s,c,t-1]*model.Tank_Efficiency + model.SC_Energy_Production[s,c,t]*model.Delta_Time + model.Electric_Resistance_Energy_Production[s,c,t]*model.Electric_Resistance_Efficiency*model.Delta_Time- model.Tank_Outflow[s,c,t]*model.Delta_Time
 
 def Maximum_Tank_Charge(model,s,c,t):
     return model.Tank_State_of_Charge[s,c,t] <= model.Tank_Nominal_Capacity[c]
@@ -194,12 +198,18 @@ def Min_Tank_Outflow(model,s,c,t):
 def Maximum_Electric_Resistance_Energy(model,s,c,t):
     return model.Electric_Resistance_Energy_Production[s,c,t] <= model.Electric_Resistance_Nominal_Power[c]
 
+def Electric_Resistance_Energy_Production_Expression(model,s,c,t):
+    return model.Electric_Resistance_Energy_Consumption[s,c,t]*model.Electric_Resistance_Efficiency
+
 def Electric_Resistance_Energy_Production(model,s,c,t):
-    return model.Electric_Resistance_Energy_Production[s,c,t] == model.Electric_Resistance_Energy_Consumption[s,c,t]*model.Electric_Resistance_Efficiency
+    return model.Electric_Resistance_Energy_Production[s,c,t] == Electric_Resistance_Energy_Production_Expression(model,s,c,t)
+
+def Tot_Electric_Resistance_Energy_Production_Expression(model,s,t):
+    return sum(model.Electric_Resistance_Energy_Production[s,c,t] for c in model.classes)
 
 def Tot_Electric_Resistance_Energy_Production(model,s,t):
-    return model.Tot_Electric_Resistance_Energy_Production[s,t] == sum(model.Electric_Resistance_Energy_Production[s,c,t] for c in model.classes)
+    return model.Tot_Electric_Resistance_Energy_Production[s,t] == Tot_Electric_Resistance_Energy_Production_Expression(model,s,t)
     
 "Lost load constraints"
 def Maximum_Lost_Load_Th(model,s,c):
-    return model.Th_Lost_Load_Tolerance*sum(model.Thermal_Energy_Demand[s,c,t] for t in model.periods) >= sum(model.Lost_Load_Th[s,c,t] for t in model.periods)
+    return model.Th_Lost_Load_Tolerance*sum(model.Thermal_Energy_Demand[s,c,t]*model.Period_Weight[t] for t in model.periods) >= sum(model.Lost_Load_Th[s,c,t]*model.Period_Weight[t] for t in model.periods)
@@ -13,7 +13,15 @@ Authors:
 """
 
 
+import os
+import sys
+import numpy as np
 import pandas as pd
+from itertools import repeat
+from functools import lru_cache
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))    # Modules shared by the configurations, in the Scenarios folder
+from Input_Store import Load_Profile, Data_File
 
 
 #%%
@@ -26,59 +34,264 @@ def Initialize_years(model,i):
     return i
 
 
-#%% Electricity demand
-Electric_Energy_Demand = pd.read_csv('Inputs/Electric_Demand.csv', sep=';', index_col=0) # Import electricity demand
-Electric_Energy_Demand = Electric_Energy_Demand.round(3)
+#%%
+def Initialize_Discount_Factor(model):
+    '''
+    This function returns the sum of the discount factors of all the years of the project, so that the yearly 
+    variable costs are brought to their present value with a single coefficient.
+    :param model: Pyomo model as defined in the Model_Creation script.
+    :return: The sum over the years y of 1/(1+Discount_Rate)^y.
+    '''
+    return sum(1/((1+model.Discount_Rate.value)**model.Project_Years[y]) for y in model.years)
+
+
+#%% Time resolution
+Day_Minutes = 1440   # Number of minutes in a day, the time series read from the csv files have one row per minute
+
+def Day_Periods(resolution):
+    '''
+    This function returns the number of periods in a day at the time resolution of the model.
+    :param resolution: Time resolution of the model in minutes.
+    :return: Number of periods in a day.
+    '''
+    if Day_Minutes % resolution != 0:
+        raise ValueError('Initialize: the time resolution must be a divisor of the 1440 minutes of a day')
+    return Day_Minutes//resolution
+
+
+def Initialize_Day_Periods(model):
+    '''
+    This function returns the number of periods in a day.
+    :param model: Pyomo model as defined in the Model_Creation script.
+    :return: 1440 divided by the time resolution in minutes.
+    '''
+    return Day_Periods(model.Time_Resolution.value)
+
+
+def Initialize_Delta_Time(model):
+    '''
+    This function returns the duration of each period of the model, the factor that converts the power of a period into energy.
+    :param model: Pyomo model as defined in the Model_Creation script.
+    :return: The time resolution in hours.
+    '''
+    return model.Time_Resolution.value/60
+
+
+def Resample(profile, resolution):
+    '''
+    This function resamples a time series read from a csv file at the time resolution of the model, averaging
+    the power of the minutes of each period so that the energy of the time series is the same.
+    :param profile: NumPy array with one row for each minute.
+    :param resolution: Time resolution of the model in minutes.
+    :return: NumPy array with one row for each period.
+    '''
+    if resolution == 1:
+        return profile
+    nP = profile.shape[0]//resolution
+    return profile[:nP*resolution].reshape(nP, resolution, -1).mean(1)
+
+
+#%% Time series
 
-def Initialize_Electric_Energy_Demand(model,i,t):
+def Profile_Dictionary(profile, periods, scenarios, classes=None):
     '''
-    This function returns the value of the energy demand from a system for each period of analysis from a excel file.
+    This function turns a time series read from a csv file into the dictionary used to initialize a Pyomo parameter,
+    so that every value is looked up once in a NumPy array instead of calling a rule for each index.
+    :param profile: NumPy array with one row for each period and one column for each scenario (or scenario and class).
+    :param periods: Set of the periods of analysis.
+    :param scenarios: Set of the scenarios.
+    :param classes: Set of the classes of users, None for the parameters not indexed by class.
+    :return: Dictionary {(s,t): value} or {(s,c,t): value}.
+    '''
+    nP = len(periods)
+    values = {}
+    for s in scenarios:
+        if classes is None:
+            values.update(zip(zip(repeat(s), range(1,nP+1)), profile[:nP,s-1].tolist()))
+        else:
+            for c in classes:
+                column = s*c
+                values.update(zip(zip(repeat(s), repeat(c), range(1,nP+1)), profile[:nP,column-1].tolist()))
+    return values
+
+
+def Profile_Array(profile, nP, nS, nC=None):
+    '''
+    This function turns a time series read from a csv file into an array with the same indexing of the Pyomo
+    parameter it initializes, for the model built directly as sparse matrices.
+    :param profile: NumPy array with one row for each period and one column for each scenario (or scenario and class).
+    :param nP: Number of periods.
+    :param nS: Number of scenarios.
+    :param nC: Number of classes of users, None for the parameters not indexed by class.
+    :return: Array of shape (nS,nP) or (nS,nC,nP).
+    '''
+    if nC is None:
+        return profile[:nP,:nS].T
+    columns = [s*c-1 for s in range(1,nS+1) for c in range(1,nC+1)]
+    return profile[:nP,columns].T.reshape(nS,nC,nP)
+
+
+#%% Input time series
+Input_Files = {'Electric_Energy_Demand': 'Inputs/Electric_Demand.csv',
+               'Thermal_Energy_Demand':  'Inputs/Thermal_Demand.csv',
+               'RES_Energy_Output':      'Inputs/RES_Energy_Output.csv',
+               'SC_Energy_Output':       'Inputs/SC_Energy_Output.csv'}   # Time series read from the csv files, with one row per minute
+
+
+@lru_cache()
+def Input_Profile(name):
+    '''
+    This function reads a time series the first time it is used, so that the input files are not read when the
+    model is not built (e.g. when it is taken from Model_Cache). The values are memory-mapped from the binary copy
+    of the csv file (see Input_Store), converted again when the csv file changes.
+    :param name: Name of the time series in Input_Files.
+    :return: Read-only NumPy array with one row for each minute and one column for each scenario (or scenario and class).
+    '''
+    return Load_Profile(Input_Files[name])
+
+
+#%% Electricity demand
+def Initialize_Electric_Energy_Demand(model):
+    '''
+    This function returns the value of the energy demand from a system for each period of analysis from a csv file.
     :param model: Pyomo model as defined in the Model_Creation script.    
-    :return: The energy demand for the period t.         
+    :return: The energy demand for each scenario and period.
     '''
-    return float(Electric_Energy_Demand.iloc[t-1,i-1])
+    return Profile_Dictionary(Model_Profile(model, Input_Profile('Electric_Energy_Demand')), model.periods, model.scenario)
 
 
 #%% Thermal energy demand
-Thermal_Energy_Demand = pd.read_csv('Inputs/Thermal_Demand.csv', sep=';',  index_col=0) # Import thermal energy demand
-Thermal_Energy_Demand = Thermal_Energy_Demand.round(3)
-
-def Initialize_Thermal_Energy_Demand(model,i,c,t):
+def Initialize_Thermal_Energy_Demand(model):
     '''
-    This function returns the value of the thermal energy demand from a system for each period and classes of analysis from a excel file.
+    This function returns the value of the thermal energy demand from a system for each period and classes of analysis from a csv file.
     :param model: Pyomo model as defined in the Model_Creation script.
-    :return: The energy demand for the period t.     
+    :return: The thermal energy demand for each scenario, class and period.
     '''
-    column=i*c
-    return float(Thermal_Energy_Demand.iloc[t-1,column-1])
+    return Profile_Dictionary(Model_Profile(model, Input_Profile('Thermal_Energy_Demand')), model.periods, model.scenario, model.classes)
 
 
 #%% PV output
-RES_Energy_Output = pd.read_csv('Inputs/RES_Energy_Output.csv', sep=';', index_col=0)  # Import RES energy generation profile
-RES_Energy_Output = RES_Energy_Output.round(3)
-
-def Initialize_RES_Energy(model, i, t):
+def Initialize_RES_Energy(model):
     '''
     This function returns the value of the energy yield by one PV under the characteristics of the system 
-    analysis for each period of analysis from a excel file.
+    analysis for each period of analysis from a csv file.
     :param model: Pyomo model as defined in the Model_Creation script.
-    :return: The energy yield of one PV for the period t.
+    :return: The energy yield of one PV for each scenario and period.
     '''
-    return float(RES_Energy_Output.iloc[t-1,i-1])
+    return Profile_Dictionary(Model_Profile(model, Input_Profile('RES_Energy_Output')), model.periods, model.scenario)
 
 
 #%% Solar collector output
-SC_Energy_Output = pd.read_csv('Inputs/SC_Energy_Output.csv', sep=';', index_col=0)  # Import solar collector energy generation profile
-SC_Energy_Output = SC_Energy_Output.round(3)
+def Initialize_SC_Energy(model):
+    '''
+    This function returns the value of the energy yield by one solar collector for each period and classes of analysis from a csv file.
+    :param model: Pyomo model as defined in the Model_Creation script.
+    :return: The energy yield of one SC for each scenario, class and period.
+    '''
+    return Profile_Dictionary(Model_Profile(model, Input_Profile('SC_Energy_Output')), model.periods, model.scenario, model.classes)
+
+
+#%% Representative days
+def K_Medoids(distance, k):
+    '''
+    This function clusters a set of elements with the k-medoids algorithm, starting from a greedy choice of the medoids.
+    :param distance: Matrix of the distances between the elements.
+    :param k: Number of clusters.
+    :return: Index of the medoid of each cluster and cluster of each element.
+    '''
+    medoids = [int(distance.sum(1).argmin())]
+    while len(medoids) < k:
+        cost = np.minimum(distance[:,medoids].min(1), distance).sum(1)
+        cost[medoids] = np.inf
+        medoids.append(int(cost.argmin()))
+    medoids = np.array(medoids)
+    for iteration in range(100):
+        labels = distance[:,medoids].argmin(1)
+        new_medoids = medoids.copy()
+        for m in range(k):
+            members = np.flatnonzero(labels == m)
+            if members.size:
+                new_medoids[m] = members[distance[np.ix_(members,members)].sum(1).argmin()]
+        if (new_medoids == medoids).all():
+            break
+        medoids = new_medoids
+    return medoids, distance[:,medoids].argmin(1)
+
+
+@lru_cache()
+def Cluster_Days(nDays, nP, nS, nC, resolution=1):
+    '''
+    This function selects the representative days of the year, clustering the days by their demand and
+    renewable production profiles (each one scaled by its maximum value).
+    :param nDays: Number of representative days.
+    :param nP: Number of minutes of the year.
+    :param nS: Number of scenarios.
+    :param nC: Number of classes of users.
+    :param resolution: Time resolution of the model in minutes.
+    :return: Index of the representative days, in chronological order, and number of days of the year represented by each one.
+    '''
+    if nP % Day_Minutes != 0:
+        raise ValueError('Initialize: the number of periods is not a whole number of days')
+    nD, nT = nP//Day_Minutes, Day_Periods(resolution)
+    nP = nD*nT
+    profiles = [Profile_Array(Resample(Input_Profile('Electric_Energy_Demand'), resolution), nP, nS),
+                Profile_Array(Resample(Input_Profile('Thermal_Energy_Demand'), resolution), nP, nS, nC),
+                Profile_Array(Resample(Input_Profile('RES_Energy_Output'), resolution), nP, nS),
+                Profile_Array(Resample(Input_Profile('SC_Energy_Output'), resolution), nP, nS, nC)]
+    features = np.hstack([np.moveaxis(profile.reshape(-1,nD,nT), 1, 0).reshape(nD,-1)/max(abs(profile).max(), 1e-9) for profile in profiles])
+    square = (features**2).sum(1)
+    distance = np.sqrt(np.maximum(square[:,None] + square[None,:] - 2*features.dot(features.T), 0))
+    medoids, labels = K_Medoids(distance, min(nDays, nD))
+    order = np.argsort(medoids)
+    return medoids[order], np.bincount(labels, minlength=len(medoids))[order]
+
+
+def Representative_Days(model):
+    '''
+    This function returns the representative days of the project.
+    :param model: Pyomo model as defined in the Model_Creation script.
+    :return: Index of the representative days and number of days of the year represented by each one.
+    '''
+    return Cluster_Days(int(model.Representative_Days.value), int(model.Periods.value), int(model.Scenarios.value), int(model.Classes.value), int(model.Time_Resolution.value))
+
+
+def Model_Profile(model, profile):
+    '''
+    This function returns a time series read from a csv file, resampled at the time resolution of the model,
+    with the periods that are optimized: all of them, or the ones of the representative days one after the other.
+    :param model: Pyomo model as defined in the Model_Creation script.
+    :param profile: NumPy array with one row for each minute.
+    :return: NumPy array with one row for each period of the model.
+    '''
+    profile = Resample(profile, model.Time_Resolution.value)
+    if model.Representative_Days.value == 0:
+        return profile
+    days = Representative_Days(model)[0]
+    nT = model.Day_Periods.value
+    return profile[(days[:,None]*nT + np.arange(nT)).ravel()]
+
+
+def Initialize_Model_Periods(model):
+    '''
+    This function returns the number of periods optimized by the model.
+    :param model: Pyomo model as defined in the Model_Creation script.
+    :return: The periods of the year, or the periods of the representative days.
+    '''
+    if model.Representative_Days.value == 0:
+        return int(model.Periods.value)//model.Time_Resolution.value
+    return len(Representative_Days(model)[0])*model.Day_Periods.value
+
 
-def Initialize_SC_Energy(model,i,c,t):
+def Initialize_Period_Weight(model):
     '''
-    This function returns the value of the thermal energy demand from a system for each period and classes of analysis from a excel file.
+    This function returns the number of days of the year represented by each period of the model.
     :param model: Pyomo model as defined in the Model_Creation script.
-    :return: The energy demand for the period t.     
+    :return: 1 for all the periods, or the days in the cluster of each representative day.
     '''
-    column=i*c
-    return float(SC_Energy_Output.iloc[t-1,column-1])
+    if model.Representative_Days.value == 0:
+        return dict.fromkeys(model.periods, 1)
+    weights = Representative_Days(model)[1]
+    return dict(zip(model.periods, np.repeat(weights, model.Day_Periods.value).tolist()))
 
 
 #%%
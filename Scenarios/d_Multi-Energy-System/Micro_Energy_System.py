@@ -13,9 +13,33 @@ Authors:
 """
 
 import time
+import argparse
 start = time.time()
 
 plotMode = 'Off'
+modelBackend = 'Pyomo'   # 'Pyomo' (Model_Creation and Model_Resolution) or 'Matrix' (Model_Matrix, sparse matrix sent directly to the solver)
+solver = None            # 'gurobi', 'highs', 'cbc' or 'glpk' ('gurobi' or 'highs' with the Matrix backend), None for the solver of the dat file
+
+threads = None           # Threads of the solver, None for the default of the solver
+sidecarExport = False    # Export also the csv files of the time series and EnergySystemSize.xlsx next to the store of the results
+compactFormulation = False   # Variables defined by an equality (e.g. fuel consumption) replaced by expressions, computed after the resolution (Pyomo backend)
+profileBuild = False     # Time, size and memory of each component of the instance and time of the solver interface, in Results/Build_Profile.json (Pyomo backend)
+solverLog = False        # Print the log of the solver, always recorded in Results/Solver_Telemetry.jsonl (Pyomo backend)
+skipPlots = False        # Skip the plots after the resolution (runs of Run_Configurations)
+
+"Options from the command line: python Micro_Energy_System.py --plotMode Off --solver highs --threads 2"
+parser = argparse.ArgumentParser()
+parser.add_argument('--plotMode', default=plotMode)
+parser.add_argument('--modelBackend', default=modelBackend)
+parser.add_argument('--solver', default=solver)
+parser.add_argument('--threads', default=threads, type=int)
+parser.add_argument('--sidecarExport', action='store_true', default=sidecarExport)
+parser.add_argument('--compactFormulation', action='store_true', default=compactFormulation)
+parser.add_argument('--profileBuild', action='store_true', default=profileBuild)
+parser.add_argument('--solverLog', action='store_true', default=solverLog)
+parser.add_argument('--skipPlots', action='store_true', default=skipPlots)
+arguments = parser.parse_known_args()[0]
+plotMode, modelBackend, solver, threads, sidecarExport, compactFormulation, profileBuild, solverLog, skipPlots = arguments.plotMode, arguments.modelBackend, arguments.solver, arguments.threads, arguments.sidecarExport, arguments.compactFormulation, arguments.profileBuild, arguments.solverLog, arguments.skipPlots
 
 
 if plotMode != 'On':
@@ -26,21 +50,26 @@ if plotMode != 'On':
     from Model_Resolution import Model_Resolution
     from Plots import ElectricLoadCurves,ThermalLoadCurves,ElectricDispatch,ThermalDispatch
 
-    model = AbstractModel()  # Define type of optimization problem
-
     #%% Optimization model
-    Model_Creation(model)  # Creation of the Sets, parameters and variables.
-    instance = Model_Resolution(model)  # Resolution of the instance
+    if modelBackend == 'Matrix':
+        import Model_Matrix
+        from Matrix_Backend import Matrix_Resolution
+        instance = Matrix_Resolution(Model_Matrix, solver=solver, threads=threads)  # Creation and resolution of the model as a sparse matrix
+    else:
+        model = AbstractModel()  # Define type of optimization problem
+        Model_Creation(model, compactFormulation)  # Creation of the Sets, parameters and variables.
+        instance = Model_Resolution(model, solver=solver, threads=threads, profile=profileBuild, tee=solverLog)  # Resolution of the instance
     
     #%% Result export
-    TimeSeries = TimeSeries(instance)  # Extract the results of energy from the instance and save it in a excel file 
-    EnergySystemSize,EnergySystemCost,EnergyIndicators = EnergySystemInfo(instance)
+    TimeSeries = TimeSeries(instance, csv=sidecarExport)  # Extract the results of energy from the instance and save them in the store of the results
+    EnergySystemSize,EnergySystemCost,EnergyIndicators = EnergySystemInfo(instance, xlsx=sidecarExport)
     
     #%% Plot
-    ElectricLoadCurves(instance)
-    ThermalLoadCurves(instance)
-    ElectricDispatch(instance,TimeSeries)
-    ThermalDispatch(instance,TimeSeries)
+    if not skipPlots:
+        ElectricLoadCurves(instance)
+        ThermalLoadCurves(instance)
+        ElectricDispatch(instance,TimeSeries)
+        ThermalDispatch(instance,TimeSeries)
 
 else:
     import pandas as pd
@@ -12,20 +12,41 @@ Authors:
                         San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
 """
 
-from pyomo.environ import  Param, RangeSet, NonNegativeReals, Var
+from pyomo.environ import  Param, RangeSet, NonNegativeReals, Var, Expression
 
-from Initialize import Initialize_years, Initialize_Electric_Energy_Demand, Initialize_Thermal_Energy_Demand, Initialize_RES_Energy, Initialize_SC_Energy # Import library with initialitation funtions for the parameters
+from Initialize import Initialize_Day_Periods, Initialize_Delta_Time, Initialize_Model_Periods, Initialize_Period_Weight, Initialize_years, Initialize_Discount_Factor, Initialize_Electric_Energy_Demand, Initialize_Thermal_Energy_Demand, Initialize_RES_Energy, Initialize_SC_Energy # Import library with initialitation funtions for the parameters
+from Constraints import RES_Energy_Production_Expression, SC_Energy_Production_Expression, Diesel_Consumption_Expression, NG_Consumption_Expression, Electric_Resistance_Energy_Production_Expression, Tot_Electric_Resistance_Energy_Production_Expression  # Definitions of the variables replaced by expressions in the compact formulation
 
 
-def Model_Creation(model):
+def Defined_Variable(compact, rule, *sets):
+    '''
+    This function declares a variable that is defined by an equality with other variables (e.g. the fuel consumption
+    from the energy production): a variable of the linear program with its equality constraint, or in the compact
+    formulation an expression of the other variables, computed after the resolution.
+    :param compact: Compact formulation.
+    :param rule: Rule of the expression that defines the variable, as in Constraints.
+    :param sets: Sets indexing the variable.
+    '''
+    if compact:
+        return Expression(*sets, rule=rule)
+    return Var(*sets, within=NonNegativeReals)
+
+
+def Model_Creation(model, compact=False):
     '''
     This function creates the instance for the resolution of the optimization in Pyomo.
     :param model: Pyomo model as defined in the Micro-Grids library
+    :param compact: Compact formulation, with the variables defined by an equality with other variables (e.g. the
+                    fuel consumption) replaced by expressions.
     '''
+    model.Compact = compact     # Read by Model_Instance, which does not add the equalities of the variables replaced
     
     "Time parameters"
-    model.Periods = Param(within=NonNegativeReals)  # Number of periods per year of analysis of the energy variables
+    model.Periods = Param(within=NonNegativeReals)  # Number of minutes per year of analysis of the energy variables
     model.Years = Param()                           # Number of years of the project
+    model.Representative_Days = Param(default=0)    # Number of representative days optimized in place of all the periods of the year (0 to optimize all of them)
+    model.Time_Resolution = Param(default=1)        # Time step of the model in minutes, the time series are resampled at this resolution
+    model.Day_Periods = Param(initialize=Initialize_Day_Periods) # Number of periods in a day
    
     "Configuration parameters"
     model.Scenarios = Param()                       # Number of scenarios
@@ -38,9 +59,11 @@ def Model_Creation(model):
     model.PlotEndDate = Param()                     # End date for the plot    
     model.PlotScenario = Param()                    # Scenario for the plot
     model.PlotResolution = Param()                  # Plot resolution in dpi
+    model.Solver = Param(default='gurobi')          # Solver of the optimization: 'gurobi', 'highs', 'cbc' or 'glpk'
         
     "SETS"
-    model.periods = RangeSet(1, model.Periods)      # Creation of a set from 1 to the number of periods in each year
+    model.Model_Periods = Param(initialize=Initialize_Model_Periods) # Number of periods optimized, all the periods of the year or the ones of the representative days
+    model.periods = RangeSet(1, model.Model_Periods) # Creation of a set from 1 to the number of periods optimized in each year
     model.years = RangeSet(1, model.Years)          # Creation of a set from 1 to the number of years of the project
     model.scenario = RangeSet(1, model.Scenarios)   # Creation of a set from 1 to the numbero scenarios to analized
     model.classes = RangeSet(1, model.Classes)      # Creation of a set from 1 to the number of classes of the thermal part
@@ -81,14 +104,14 @@ def Model_Creation(model):
     "Parameters of the diesel generator"
     model.Generator_Efficiency = Param()        # Generator electric efficiency in %
     model.Lower_Heating_Value  = Param()        # Lower heating value of the diesel in kWh/L
-    model.Diesel_Unitary_Cost  = Param(within=NonNegativeReals)        # Cost of diesel in USD/L
+    model.Diesel_Unitary_Cost  = Param(within=NonNegativeReals, mutable=True) # Cost of diesel in USD/L
     model.Generator_Inv_Specific_Cost = Param(within=NonNegativeReals) # Investment cost of the diesel generator in USD/kW
     model.Generator_OM_Specific_Cost  = Param(within=NonNegativeReals) # % of the total investment spent in operation and management of diesel generator in each period
     
     "Parameters of the boilers"
     model.Boiler_Efficiency = Param()          # Boiler efficiency in %
     model.Lower_Heating_Value_NG = Param()     # Lower heating value of the natural gas in kWh/L
-    model.NG_Unitary_Cost = Param(within=NonNegativeReals)          # Cost of natural gas in USD/L
+    model.NG_Unitary_Cost = Param(within=NonNegativeReals, mutable=True) # Cost of natural gas in USD/L
     model.Boiler_Inv_Specific_Cost = Param(within=NonNegativeReals) # Investment cost of the NG Boiler in USD/kW
     model.Boiler_OM_Specific_Cost = Param (within=NonNegativeReals) # % of the total investment spent in operation and management of boiler in each period
 
@@ -107,23 +130,25 @@ def Model_Creation(model):
     model.Th_Value_Of_Lost_Load = Param(within=NonNegativeReals)       # Value of lost load in USD/kWh
     
     "Parameters of the project"
-    model.Delta_Time = Param(within=NonNegativeReals)                           # Time step in hours
+    model.Delta_Time = Param(within=NonNegativeReals, initialize=Initialize_Delta_Time) # Time step in hours
     model.Project_Years = Param(model.years, initialize= Initialize_years)      # Years of the project
-    model.Discount_Rate = Param()                                               # Discount rate of the project in %
+    model.Discount_Rate = Param(mutable=True)                                   # Discount rate of the project in %
+    model.Discount_Factor = Param(within=NonNegativeReals, initialize=Initialize_Discount_Factor, mutable=True) # Sum of the discount factors of the project years
     model.Scenario_Weight = Param(model.scenario, within=NonNegativeReals)      # Probability of occurrance of each scenario
+    model.Period_Weight = Param(model.periods, within=NonNegativeReals, initialize=Initialize_Period_Weight) # Number of days of the year represented by each period
     
 
     #%% System variables
 
     "Variables associated to the RES"
     model.RES_Units = Var(within=NonNegativeReals)                                            # Number of units of RES
-    model.RES_Energy_Production = Var(model.scenario,model.periods, within=NonNegativeReals)  # Total energy generated for the RES system in kWh
+    model.RES_Energy_Production = Defined_Variable(compact, RES_Energy_Production_Expression, model.scenario,model.periods)  # Total energy generated for the RES system in kWh
     model.RES_Investment_Cost = Var(within=NonNegativeReals)                                  # Total investment cost of the RES in USD    
     model.RES_OM_Cost = Var(within=NonNegativeReals)                                          # Total fixed OM cost of the RES in USD    
 
     "Variables associated to the solar collector"
     model.SC_Units = Var(model.classes, within=NonNegativeReals)                                            # Number of units of SC
-    model.SC_Energy_Production = Var(model.scenario, model.classes, model.periods, within=NonNegativeReals) # Total energy generated for the SC system in kWh
+    model.SC_Energy_Production = Defined_Variable(compact, SC_Energy_Production_Expression, model.scenario, model.classes, model.periods) # Total energy generated for the SC system in kWh
     model.SC_Investment_Cost = Var(model.classes, within=NonNegativeReals)                                  # Total investment cost of the SC in USD    
     model.SC_OM_Cost = Var(model.classes, within=NonNegativeReals)                                          # Total fixed OM cost of the SC in USD    
 
@@ -151,7 +176,7 @@ def Model_Creation(model):
     model.Generator_Nominal_Capacity = Var(within=NonNegativeReals)                           # Capacity of the diesel generator in kWh
     model.Generator_Investment_Cost = Var(within=NonNegativeReals)                            # Total investment cost of the diesel generator in USD    
     model.Generator_OM_Cost = Var(within=NonNegativeReals)                                    # Total fixed OM cost of the diesel generator in USD    
-    model.Diesel_Consumption = Var(model.scenario,model.periods, within=NonNegativeReals)     # Diesel consumed to produce electric energy in L
+    model.Diesel_Consumption = Defined_Variable(compact, Diesel_Consumption_Expression, model.scenario,model.periods)     # Diesel consumed to produce electric energy in L
     model.Generator_Energy_Production = Var(model.scenario, model.periods, within=NonNegativeReals)     # Total Energy production from the Diesel generator
     model.Total_Diesel_Cost = Var(model.scenario, within=NonNegativeReals)
     
@@ -159,7 +184,7 @@ def Model_Creation(model):
     model.Boiler_Nominal_Capacity = Var(model.classes, within=NonNegativeReals)                      # Capacity of the boiler in kWh
     model.Boiler_Investment_Cost = Var(model.classes, within=NonNegativeReals)                       # Total investment cost of the boiler in USD
     model.Boiler_OM_Cost = Var(model.classes, within=NonNegativeReals)                               # Total fixed OM cost of the boiler in USD
-    model.NG_Consumption = Var(model.scenario, model.classes, model.periods,within=NonNegativeReals) # Natural Gas consumed to produce thermal energy in Kg (considering Liquified Natural Gas)
+    model.NG_Consumption = Defined_Variable(compact, NG_Consumption_Expression, model.scenario, model.classes, model.periods) # Natural Gas consumed to produce thermal energy in Kg (considering Liquified Natural Gas)
     model.Boiler_Energy_Production = Var(model.scenario, model.classes, model.periods, within=NonNegativeReals) # Energy generated by the boiler 
     model.Total_NG_Cost = Var(model.scenario, model.classes, within=NonNegativeReals) 
 
@@ -168,8 +193,8 @@ def Model_Creation(model):
     model.Electric_Resistance_Investment_Cost = Var(model.classes, within=NonNegativeReals)  # Total investment cost of the electric resistance in USD
     model.Electric_Resistance_OM_Cost = Var(model.classes, within=NonNegativeReals)          # Total fixed OM cost of the electric resistance in USD
     model.Electric_Resistance_Energy_Consumption = Var(model.scenario, model.classes, model.periods, within=NonNegativeReals) # Energy consumed by the electric resistance in each class in Wh 
-    model.Electric_Resistance_Energy_Production = Var(model.scenario, model.classes, model.periods, within=NonNegativeReals)  # Energy generated by the electric resistance in each class in Wh 
-    model.Tot_Electric_Resistance_Energy_Production = Var(model.scenario, model.periods, within=NonNegativeReals)            # Total energy generated by the electric resistance in Wh 
+    model.Electric_Resistance_Energy_Production = Defined_Variable(compact, Electric_Resistance_Energy_Production_Expression, model.scenario, model.classes, model.periods)  # Energy generated by the electric resistance in each class in Wh 
+    model.Tot_Electric_Resistance_Energy_Production = Defined_Variable(compact, Tot_Electric_Resistance_Energy_Production_Expression, model.scenario, model.periods)            # Total energy generated by the electric resistance in Wh 
     
     "Varialbles associated to the energy balance"
     model.Lost_Load_EE = Var(model.scenario, model.periods, within=NonNegativeReals) # Energy not suply by the system kWh
@@ -185,3 +210,10 @@ def Model_Creation(model):
     model.Fixed_Costs = Var(within=NonNegativeReals)
     model.Variable_Costs = Var(model.scenario, within=NonNegativeReals)
     
+    if compact:
+        "The expressions are moved after the variables that define them, as the components are constructed in order"
+        for expression in list(model.component_objects(Expression, descend_into=False)):
+            name = expression.local_name
+            model.del_component(expression)
+            model.add_component(name, expression)
+    
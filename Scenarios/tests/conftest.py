@@ -0,0 +1,44 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Fixtures of the tests of the configurations: a synthetic case of one day (1440 periods) written by
+Benchmark.Write_Case, where some code runs in its own process with the folder of the case as working directory,
+since the configurations have modules with the same names.
+Usage: python -m pytest Scenarios/tests
+"""
+
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+Tests_Path = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(Tests_Path, '..'))    # Modules shared by the configurations, in the Scenarios folder
+from Benchmark import Scenarios_Path, Write_Case
+
+
+@pytest.fixture
+def run_in_case(tmp_path):
+    '''
+    This fixture returns a function that writes the case of a configuration in the temporary folder of the test and
+    runs some code on it, with the modules of the configuration, the shared ones and the ones of the tests on the path.
+    The code prints its result as json on its last line.
+    '''
+    def Run(configuration, code):
+        path = Write_Case(configuration, str(tmp_path), days=1, solver='highs')
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.join(Scenarios_Path, configuration), Scenarios_Path, Tests_Path]))
+        process = subprocess.run([sys.executable, '-c', code], cwd=path, env=environment, capture_output=True, text=True)
+        assert process.returncode == 0, process.stdout[-2000:] + process.stderr[-2000:]
+        return json.loads(process.stdout.strip().splitlines()[-1])
+    return Run
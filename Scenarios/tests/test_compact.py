@@ -0,0 +1,36 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Compact and complete formulation of each configuration (Model_Resolution.Compact_Check) on a synthetic case of one
+day (1440 periods) written by Benchmark.Write_Case: same net present cost within the tolerance, with fewer rows and
+columns in the compact linear program. Each check runs in its own process, with the folder of the case as working
+directory (see conftest), since the configurations have modules with the same names.
+Usage: python -m pytest Scenarios/tests
+"""
+
+import pytest
+
+from Benchmark import configurations
+
+
+Tolerance = 1e-4    # Maximum relative difference between the net present costs of the two formulations
+
+Check_Command = 'import json; from Model_Resolution import Compact_Check; print(json.dumps(Compact_Check(solver="highs").to_dict("index")))'
+
+
+@pytest.mark.parametrize('configuration', configurations)
+def test_compact(configuration, run_in_case):
+    rows = run_in_case(configuration, Check_Command)
+    complete, compact = rows['Complete'], rows['Compact']
+    assert compact['NPC [USD]'] == pytest.approx(complete['NPC [USD]'], rel=Tolerance)
+    assert compact['Rows'] < complete['Rows'] and compact['Columns'] < complete['Columns']
@@ -0,0 +1,45 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Round trip of the csv files through their binary copy (Input_Store.Load_Frame): the values, the columns and the
+index read back are the ones of the csv file, for an index of integers, of regular and irregular dates and of strings.
+Usage: python -m pytest Scenarios/tests
+"""
+
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))    # Modules shared by the configurations, in the Scenarios folder
+from Input_Store import Load_Frame
+
+
+Indexes = {'range':     pd.RangeIndex(1, 49),
+           'integers':  pd.Index(np.arange(0, 96, 2)),
+           'dates':     pd.date_range('2017-07-01 00:00:00', periods=48, freq='min'),
+           'irregular': pd.DatetimeIndex(pd.to_datetime('2017-07-01') + pd.to_timedelta(np.arange(48)**2, unit='min')),
+           'strings':   pd.Index(['Step ' + str(i) for i in range(48)])}
+
+
+@pytest.mark.parametrize('name', list(Indexes))
+def test_round_trip(name, tmp_path):
+    csvpath = str(tmp_path / 'Profile.csv')
+    profile = pd.DataFrame(np.random.default_rng(0).random((48, 2)).round(3)*1000, index=Indexes[name], columns=['1', '2'])
+    profile.to_csv(csvpath, sep=';')
+    frame = Load_Frame(csvpath)
+    np.testing.assert_array_equal(frame.values, profile.values)
+    assert list(frame.columns) == list(profile.columns)
+    assert frame.index.equals(profile.index)
+    assert Load_Frame(csvpath).index.equals(profile.index)     # Read again from the binary copy, up to date
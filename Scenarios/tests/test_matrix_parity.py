@@ -0,0 +1,33 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Parity of the Pyomo and the matrix backend of each configuration (Matrix_Check) on a synthetic case of one day
+(1440 periods) written by Benchmark.Write_Case: same number of variables and constraints, and same net present
+cost within the tolerance. Each check runs in its own process, with the folder of the case as working directory
+(see conftest), since the configurations have modules with the same names.
+Usage: python -m pytest Scenarios/tests
+"""
+
+import pytest
+
+from Benchmark import configurations
+
+
+Tolerance = 1e-4    # Maximum relative difference between the net present costs of the two backends
+
+Check_Command = 'import json; from Matrix_Backend import Matrix_Check; print(json.dumps(bool(Matrix_Check(periods=1440, solver="highs", tolerance=%g))))' % Tolerance
+
+
+@pytest.mark.parametrize('configuration', configurations)
+def test_matrix_parity(configuration, run_in_case):
+    assert run_in_case(configuration, Check_Command) is True
@@ -0,0 +1,85 @@
+"""
+Multi-Energy System (MESpy) model
+
+Modelling framework for optimization of hybrid electric and thermal small-scale energy systems sizing
+
+Authors:
+    Lorenzo Rinaldi   - Department of Energy, Politecnico di Milano, Milan, Italy
+    Stefano Pistolese - Department of Energy, Politecnico di Milano, Milan, Italy
+    Nicolò Stevanato  - Department of Energy, Politecnico di Milano, Milan, Italy
+                        Fondazione Eni Enrico Mattei, Milan, Italy
+    Sergio Balderrama - Department of Mechanical and Aerospace Engineering, University of Liège, Liège, Belgium
+                        San Simon University, Centro Universitario de Investigacion en Energia, Cochabamba, Bolivia
+
+Objective function of each configuration on a synthetic case of one day (1440 periods), written by
+Benchmark.Write_Case and solved with HiGHS, against the one of the original formulation of the constraints
+(the cost of the lost load and of the fuels as a sum over the periods repeated for each year of the project,
+as in the first version of Constraints): the same instance is solved again with the original constraints in
+place of the current ones. Each case runs in its own process, with the folder of the case as working directory
+(see conftest), since the configurations have modules with the same names.
+Usage: python -m pytest Scenarios/tests
+"""
+
+import json
+import pytest
+
+from Benchmark import configurations
+
+
+Tolerance = 1e-4    # Relative tolerance of the barrier of HiGHS in Solver_Profiles
+
+
+#%% Original formulation
+def Periods(model, s):
+    return [(s,f) for f in range(1, model.Periods.value+1)]
+
+def Scenario_Lost_Load_Cost_EE(model,s):
+    return  model.Scenario_Lost_Load_Cost_EE[s] == sum(((sum(model.Lost_Load_EE[s,t]*model.EE_Value_Of_Lost_Load/60 for s,t in Periods(model,s)))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years)
+
+def Total_Diesel_Cost(model,s):
+    return model.Total_Diesel_Cost[s] == sum(((sum(model.Diesel_Consumption[s,t]*model.Diesel_Unitary_Cost for s,t in Periods(model,s)))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years)
+
+def Scenario_Lost_Load_Cost_Th(model,s,c):
+    return  model.Scenario_Lost_Load_Cost_Th[s,c] == sum(((sum(model.Lost_Load_Th[s,c,t]*model.Th_Value_Of_Lost_Load/60 for s,t in Periods(model,s)))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years)
+
+def Total_NG_Cost(model,s,c):
+    return  model.Total_NG_Cost[s,c] == sum(((sum(model.NG_Consumption[s,c,t]*model.NG_Unitary_Cost for s,t in Periods(model,s)))/((1+model.Discount_Rate)**model.Project_Years[y])) for y in model.years)
+
+Original_Constraints = {'ScenarioLostLoadCostEE': Scenario_Lost_Load_Cost_EE,
+                        'TotalDieselCost':        Total_Diesel_Cost,
+                        'ScenarioLostLoadCostTh': Scenario_Lost_Load_Cost_Th,
+                        'TotalNGCost':            Total_NG_Cost}    # Constraints of the instance rewritten since the first version
+
+
+def Objectives(solver='highs'):
+    '''
+    This function solves the case in the working directory with the current constraints, then with the original
+    ones in their place, and prints the two objective functions and the status of the solver as json.
+    It runs in the process started by test_objective, with the modules of the configuration on the path.
+    '''
+    from pyomo.environ import AbstractModel, Constraint, value
+    from Model_Creation import Model_Creation
+    from Model_Resolution import Model_Instance
+    from Solvers import Solve_Instance
+
+    model = AbstractModel()
+    Model_Creation(model)
+    instance = Model_Instance(model)
+    result = {}
+    for formulation in ['Current', 'Original']:
+        if formulation == 'Original':
+            for name, rule in Original_Constraints.items():
+                if instance.component(name) is not None:
+                    indexes = instance.component(name).index_set().subsets()
+                    instance.del_component(name)
+                    instance.add_component(name, Constraint(*indexes, rule=rule))
+        performance = Solve_Instance(instance, solver, tee=False, table=None)[1]
+        result[formulation] = {'Objective [USD]': value(instance.ObjectiveFuntion), 'Status': performance['Status'][0]}
+    print(json.dumps(result))
+
+
+@pytest.mark.parametrize('configuration', configurations)
+def test_objective(configuration, run_in_case):
+    result = run_in_case(configuration, 'from test_objective import Objectives; Objectives()')
+    assert result['Current']['Status'] == 'optimal' and result['Original']['Status'] == 'optimal'
+    assert result['Current']['Objective [USD]'] == pytest.approx(result['Original']['Objective [USD]'], rel=Tolerance)